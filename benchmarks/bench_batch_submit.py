@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Batched share submission benchmark for mining_pool/pool_server.py
+
+Runs the getwork pool at share difficulty 1 (every nonce is a valid
+share) and submits shares over one kept-alive HTTP connection, the way
+python_miner's ShareSubmitter does: one /submitwork request per share
+for batch size 1, /submitwork/batch for larger sizes. Jobs are fetched
+before the clock starts, so only submission is timed. Reports accepted
+shares per second for each batch size.
+
+Usage: python3 benchmarks/bench_batch_submit.py [--shares 5000] [--batch-sizes 1,8,32,128,512]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'mining_pool'))
+sys.path.insert(0, BENCH_DIR)
+
+from aiohttp import web
+
+import pool_server
+from stratum_load import free_port
+
+ADDRESS = "RSDTbench000001"
+
+
+def start_pool(port: int) -> asyncio.AbstractEventLoop:
+    """Run the pool on its own event loop in a daemon thread"""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    async def serve():
+        app = pool_server.create_app(share_difficulty=1, max_jobs=10 ** 6)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, '127.0.0.1', port).start()
+        ready.set()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(serve())
+        loop.run_forever()
+
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return loop
+
+
+def submit(session: requests.Session, base: str, jobs, batch_size: int) -> int:
+    accepted = 0
+    if batch_size == 1:
+        for job_id in jobs:
+            reply = session.post(f"{base}/submitwork", json={
+                "address": ADDRESS, "job_id": job_id, "nonce": 1, "hash": "00"}).json()
+            accepted += reply.get("accepted", False)
+        return accepted
+    for start in range(0, len(jobs), batch_size):
+        shares = [[job_id, 1, "00"] for job_id in jobs[start:start + batch_size]]
+        reply = session.post(f"{base}/submitwork/batch",
+                             json={"address": ADDRESS, "shares": shares}).json()
+        accepted += reply["accepted"]
+    return accepted
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RSDT getwork pool batched submit benchmark')
+    parser.add_argument('--shares', type=int, default=5000, help='Shares per batch size')
+    parser.add_argument('--batch-sizes', default='1,8,32,128,512', help='Comma-separated batch sizes')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    port = free_port()
+    start_pool(port)
+    base = f"http://127.0.0.1:{port}"
+    session = requests.Session()
+
+    results = {}
+    baseline = None
+    for batch_size in (int(size) for size in args.batch_sizes.split(',')):
+        jobs = [session.post(f"{base}/getwork", json={"address": ADDRESS}).json()["job_id"]
+                for _ in range(args.shares)]
+        start = time.perf_counter()
+        accepted = submit(session, base, jobs, batch_size)
+        elapsed = time.perf_counter() - start
+        rate = accepted / elapsed
+        baseline = baseline or rate
+        results[batch_size] = {"accepted": accepted, "shares_per_sec": round(rate, 1),
+                               "speedup": round(rate / baseline, 2)}
+        print(f"batch {batch_size:4d}  {accepted:6d} accepted  {rate:10.1f} shares/s  "
+              f"x{rate / baseline:.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Block submit latency benchmark for rsdt_mining_pool.py
+
+Runs fake daemons at network difficulty 1, so every accepted share is a
+block candidate, and pushes shares through RSDTMiningPool.submit_share.
+Share-to-submit latency (share arrival to the first daemon accepting the
+block) is reported for:
+
+* cold: a new connection per block, the way mining_pool.py submits
+* warm: the pre-warmed dedicated connection to one daemon
+* parallel: pre-warmed connections to every daemon, first accept wins
+
+Usage: python3 benchmarks/bench_block_submit.py [--blocks 500] [--daemons 3]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, BENCH_DIR)
+
+import rsdt_mining_pool
+from rsdt_mining_pool import BlockSubmitter, RSDTMiningPool, ShareValidator
+
+from fake_daemon import FakeDaemon
+from stratum_load import free_port
+
+
+async def run_mode(pool: RSDTMiningPool, urls, blocks: int, cold: bool) -> dict:
+    template = await pool.get_block_template()
+    pool.current_block = template
+    submitter = BlockSubmitter(urls)
+    if not cold:
+        pool.block_submitter = submitter
+        await submitter.warm()
+
+    for nonce in range(blocks):
+        if cold:
+            pool.block_submitter = BlockSubmitter(urls)
+        job = pool.jobs.create(template, 1, 1, 1)
+        await pool.submit_share("RSDTbench000001", "w0", nonce, job, time.perf_counter())
+        await asyncio.gather(*pool.block_tasks)
+        if cold:
+            await pool.block_submitter.close()
+            submitter.share_to_submit.merge(pool.block_submitter.share_to_submit)
+            submitter.accepted += pool.block_submitter.accepted
+    await submitter.close()
+    return submitter.metrics()
+
+
+async def run(args) -> dict:
+    daemons = [FakeDaemon(block_interval=0, network_difficulty=1) for _ in range(args.daemons)]
+    ports = [free_port() for _ in daemons]
+    runners = [await daemon.start(port=port) for daemon, port in zip(daemons, ports)]
+    urls = [f"http://127.0.0.1:{port}" for port in ports]
+
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            config_file = os.path.join(workdir, 'pool_config.json')
+            with open(config_file, 'w') as f:
+                json.dump({"database": os.path.join(workdir, 'pool.db'), "daemon_url": urls[0]}, f)
+            pool = RSDTMiningPool(config_file)
+            pool.validator = ShareValidator(workers=0)
+            await pool.validator.start()
+            await pool.database.start()
+
+            for name, mode_urls, cold in (("cold", urls[:1], True),
+                                          ("warm", urls[:1], False),
+                                          ("parallel", urls, False)):
+                metrics = await run_mode(pool, mode_urls, args.blocks, cold)
+                latency = metrics["share_to_submit"]
+                results[name] = {"daemons": len(mode_urls), "accepted": metrics["accepted"],
+                                 "share_to_submit": latency}
+                print(f"{name:9s} {len(mode_urls)} daemon(s)  {metrics['accepted']:5d} accepted  "
+                      f"p50 {latency['p50_ms']:.3f} ms  p99 {latency['p99_ms']:.3f} ms  "
+                      f"max {latency['max_ms']:.3f} ms")
+
+            await pool.database.close()
+            await pool.validator.close()
+            await pool.rpc.close()
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+    results["daemon_blocks_submitted"] = [daemon.blocks_submitted for daemon in daemons]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RSDT pool block submit latency benchmark')
+    parser.add_argument('--blocks', type=int, default=500, help='Block candidates per mode')
+    parser.add_argument('--daemons', type=int, default=3, help='Fake daemons for the parallel mode')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    rsdt_mining_pool.logger.setLevel(logging.WARNING)
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Job broadcast soak benchmark for rsdt_mining_pool.py
+
+Connects N simulated miners (10k by default, spread over several client
+processes to stay within per-process file limits), logs them all in and
+then pushes a series of new jobs through RSDTMiningPool.broadcast_job.
+Reports the time to queue each broadcast, the time until every miner has
+received it, and how many deliberately slow miners (which stop reading
+after login) were disconnected by the send-queue limit.
+
+Usage: python3 benchmarks/bench_broadcast.py [--miners 10000] [--jobs 50] [--slow-fraction 0.01]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import rsdt_mining_pool
+from rsdt_mining_pool import BlockTemplate, LatencyHistogram, RSDTMiningPool
+
+
+def raise_file_limit():
+    """Allow as many sockets as the hard limit permits"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+def make_template(height: int) -> BlockTemplate:
+    return BlockTemplate(
+        height=height,
+        difficulty=1,
+        target=b'\xff' * 32,
+        block_header=bytes(80),
+        coinbase_tx=b'',
+        merkle_root=bytes(32),
+        timestamp=int(time.time())
+    )
+
+
+async def simulated_miner(port: int, miner_id: int, slow: bool, jobs: int,
+                          received: dict, logged_in: list):
+    """Log in, then record when each pushed job arrives"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if slow:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.setblocking(False)
+    await asyncio.get_running_loop().sock_connect(sock, ('127.0.0.1', port))
+    reader, writer = await asyncio.open_connection(sock=sock)
+
+    login = {"id": 1, "method": "login", "params": {"login": f"RSDTsoak{miner_id:06d}", "pass": "soak"}}
+    writer.write((json.dumps(login) + '\n').encode())
+    await reader.readline()
+    logged_in[0] += 1
+
+    try:
+        if slow:
+            # Never read again; the pool should eventually drop us
+            await asyncio.sleep(3600)
+        for _ in range(jobs):
+            line = await reader.readline()
+            if not line:
+                break
+            height = json.loads(line)["params"]["height"]
+            received.setdefault(height, []).append(time.time())
+    finally:
+        writer.close()
+
+
+def client_process(port: int, first_id: int, count: int, slow_every: int, jobs: int,
+                   ready: multiprocessing.Queue, results: multiprocessing.Queue):
+    """Run a slice of the simulated miners in their own event loop"""
+    raise_file_limit()
+
+    async def run():
+        received = {}
+        logged_in = [0]
+        tasks = []
+        for i in range(count):
+            miner_id = first_id + i
+            slow = slow_every > 0 and miner_id % slow_every == 0
+            tasks.append(asyncio.create_task(
+                simulated_miner(port, miner_id, slow, jobs, received, logged_in)))
+            if i % 500 == 499:
+                await asyncio.sleep(0.05)
+        while logged_in[0] < count:
+            await asyncio.sleep(0.1)
+        ready.put(count)
+        fast = [t for i, t in enumerate(tasks)
+                if not (slow_every > 0 and (first_id + i) % slow_every == 0)]
+        await asyncio.wait(fast, timeout=120)
+        for task in tasks:
+            task.cancel()
+        results.put(received)
+
+    asyncio.run(run())
+
+
+async def run_soak(args) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        config_file = os.path.join(workdir, 'pool_config.json')
+        with open(config_file, 'w') as f:
+            json.dump({"database": os.path.join(workdir, 'pool.db'), "pool_port": 0,
+                       "send_queue_size": args.send_queue}, f)
+        pool = RSDTMiningPool(config_file)
+        pool.current_block = make_template(1)
+
+        server = await asyncio.start_server(pool.handle_miner_connection, '127.0.0.1', 0,
+                                            backlog=4096)
+        port = server.sockets[0].getsockname()[1]
+
+        ctx = multiprocessing.get_context('spawn')
+        ready = ctx.Queue()
+        results = ctx.Queue()
+        per_process = -(-args.miners // args.client_processes)
+        slow_every = int(1 / args.slow_fraction) if args.slow_fraction > 0 else 0
+        processes = []
+        for p in range(args.client_processes):
+            count = min(per_process, args.miners - p * per_process)
+            proc = ctx.Process(target=client_process, args=(
+                port, p * per_process, count, slow_every, args.jobs, ready, results))
+            proc.start()
+            processes.append(proc)
+
+        loop = asyncio.get_running_loop()
+        connected = 0
+        for _ in processes:
+            connected += await loop.run_in_executor(None, ready.get)
+        print(f"{connected} miners logged in, {len(pool.connections)} pool connections")
+
+        enqueue = LatencyHistogram()
+        sent_at = {}
+        for height in range(2, args.jobs + 2):
+            pool.current_block = make_template(height)
+            sent_at[height] = time.time()
+            start = time.perf_counter()
+            await pool.broadcast_job()
+            enqueue.record(time.perf_counter() - start)
+            await asyncio.sleep(args.interval)
+
+        delivery = LatencyHistogram()
+        complete = LatencyHistogram()
+        for _ in processes:
+            received = await loop.run_in_executor(None, results.get)
+            for height, times in received.items():
+                for t in times:
+                    delivery.record(max(0.0, t - sent_at[height]))
+                if times:
+                    complete.record(max(0.0, max(times) - sent_at[height]))
+        for proc in processes:
+            proc.join()
+
+        server.close()
+        return {
+            "miners": args.miners,
+            "jobs": args.jobs,
+            "broadcast_enqueue": enqueue.snapshot(),
+            "delivery_latency": delivery.snapshot(),
+            "slice_complete_latency": complete.snapshot(),
+            "slow_consumer_disconnects": pool.slow_consumer_disconnects,
+            "connections_left": len(pool.connections)
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RSDT pool job broadcast soak benchmark')
+    parser.add_argument('--miners', type=int, default=10000, help='Simulated miners')
+    parser.add_argument('--jobs', type=int, default=50, help='Jobs to broadcast')
+    parser.add_argument('--interval', type=float, default=0.2, help='Seconds between jobs')
+    parser.add_argument('--slow-fraction', type=float, default=0.01,
+                        help='Fraction of miners that stop reading after login')
+    parser.add_argument('--send-queue', type=int, default=16, help='Per-connection send queue size')
+    parser.add_argument('--client-processes', type=int, default=4, help='Client processes')
+    args = parser.parse_args()
+
+    print(f"file limit: {raise_file_limit()}")
+    rsdt_mining_pool.logger.setLevel(logging.ERROR)
+    print(json.dumps(asyncio.run(run_soak(args)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
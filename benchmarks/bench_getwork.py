@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Getwork throughput benchmark for mining_pool/pool_server.py
+
+Calls the pool's get_work handler in-process with pre-parsed requests
+from a population of known miners, so the number is the handler's own
+cost per job (template, target, job id, job store, response body)
+without HTTP parsing. Reported as getwork requests per second on one
+core.
+
+Usage: python3 benchmarks/bench_getwork.py [--requests 200000] [--miners 1000] [--module path/to/pool_server.py]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODULE = os.path.join(BENCH_DIR, '..', 'mining_pool', 'pool_server.py')
+
+
+class FakeRequest:
+    """The parts of an aiohttp request get_work reads"""
+
+    remote = '127.0.0.1'
+    query = {}
+
+    def __init__(self, payload: dict):
+        self.payload = payload
+
+    async def json(self):
+        return self.payload
+
+
+def load_pool_module(path: str):
+    spec = importlib.util.spec_from_file_location('pool_server_under_test', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def run(args) -> dict:
+    module = load_pool_module(args.module)
+    pool = module.RSDTMiningPool()
+    requests = [FakeRequest({"address": f"RSDTbench{i:06d}"}) for i in range(args.miners)]
+    for request in requests:
+        await pool.get_work(request)
+
+    start = time.process_time()
+    for i in range(args.requests):
+        await pool.get_work(requests[i % args.miners])
+    cpu = time.process_time() - start
+    return {
+        "module": os.path.relpath(args.module),
+        "requests": args.requests,
+        "requests_per_sec": round(args.requests / cpu, 1) if cpu > 0 else None,
+        "us_per_request": round(cpu / args.requests * 1e6, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RSDT getwork pool throughput benchmark')
+    parser.add_argument('--requests', type=int, default=200000, help='getwork calls to time')
+    parser.add_argument('--miners', type=int, default=1000, help='Distinct miner addresses')
+    parser.add_argument('--module', default=DEFAULT_MODULE,
+                        help='pool_server.py to load, e.g. a copy of an older revision')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(f"{result['module']}: {result['requests_per_sec']:.1f} getwork/s per core "
+          f"({result['us_per_request']:.2f} us each)")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Hashing kernel microbenchmark for python_miner/rsdt_miner.py
+
+Hashes the same nonce range on one core twice: once the way the miner
+used to (new bytes per nonce, hexdigest, int(hex, 16) against the
+target) and once with NonceScanner (prefix state copy, nonce patched
+into a reusable buffer, digest compared as bytes). Both must find the
+same shares. Reported in hashes per second.
+
+Usage: python3 benchmarks/bench_miner_kernel.py [--hashes 1000000] [--batch 4096] [--difficulty 1000]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python_miner'))
+
+from rsdt_miner import NonceScanner
+
+
+def naive_scan(block_data: bytes, target: int, start: int, count: int):
+    """The miner's original per-nonce loop"""
+    found = []
+    for nonce in range(start, start + count):
+        block_with_nonce = block_data + struct.pack('<Q', nonce)
+        hash_result = hashlib.sha256(block_with_nonce).hexdigest()
+        if int(hash_result, 16) < target:
+            found.append((nonce, hash_result))
+    return found
+
+
+def kernel_scan(block_data: bytes, target: int, start: int, count: int, batch: int):
+    scanner = NonceScanner(block_data, target)
+    found = []
+    for offset in range(start, start + count, batch):
+        found.extend(scanner.scan(offset, min(batch, start + count - offset)))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RSDT Python miner hashing kernel benchmark')
+    parser.add_argument('--hashes', type=int, default=1000000, help='Nonces per run')
+    parser.add_argument('--batch', type=int, default=4096, help='Nonces per kernel call')
+    parser.add_argument('--difficulty', type=int, default=1000, help='Share difficulty')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    # 88 bytes, like a getwork job: 80-byte header plus 8-byte extranonce
+    block_data = hashlib.sha256(b'rsdt').digest() * 2 + bytes(24)
+    target = (2 ** 256) // args.difficulty
+
+    results = {}
+    found = {}
+    for name, run in (("naive", lambda: naive_scan(block_data, target, 0, args.hashes)),
+                      ("kernel", lambda: kernel_scan(block_data, target, 0, args.hashes, args.batch))):
+        start = time.process_time()
+        found[name] = run()
+        cpu = time.process_time() - start
+        results[name] = round(args.hashes / cpu, 1)
+        print(f"{name:7s} {results[name]:12.1f} H/s  ({len(found[name])} shares)")
+
+    if found["naive"] != found["kernel"]:
+        print("FAIL: kernel found different shares")
+        sys.exit(1)
+    results["speedup"] = round(results["kernel"] / results["naive"], 2)
+    print(f"speedup x{results['speedup']:.2f}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Multi-process scaling benchmark for rsdt_mining_pool.py
+
+Runs benchmarks/stratum_load.py against a local pool once per
+``stratum_workers`` value (1 is the single-process pool, more runs the
+supervisor with SO_REUSEPORT workers) and prints accepted shares/sec and
+the speedup over one worker. Run the load generator with enough client
+processes that it is not the bottleneck.
+
+Usage: python3 benchmarks/bench_pool_scaling.py [--workers 1,2,4,8] [--connections 1000] [--duration 20]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, BENCH_DIR)
+
+import rsdt_mining_pool
+import stratum_load
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RSDT pool multi-process scaling benchmark')
+    parser.add_argument('--workers', default='1,2,4', help='Comma-separated stratum_workers values')
+    parser.add_argument('--connections', type=int, default=1000, help='Miner connections')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds per run')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help='Load generator processes')
+    parser.add_argument('--transport', default='streams', help='stratum_transport for the pool')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    rsdt_mining_pool.logger.setLevel(logging.WARNING)
+    results = {}
+    baseline = None
+    for workers in (int(w) for w in args.workers.split(',')):
+        load_args = stratum_load.build_parser().parse_args([
+            '--connections', str(args.connections),
+            '--duration', str(args.duration),
+            '--processes', str(args.processes),
+            '--pool-config', f'stratum_workers={workers}',
+            '--pool-config', f'stratum_transport={args.transport}',
+        ])
+        result = asyncio.run(stratum_load.run_load(load_args, load_args.mix))
+        accepted = result["throughput"]["accepted_per_sec"]
+        baseline = baseline or accepted
+        results[workers] = {
+            "accepted_per_sec": accepted,
+            "speedup": round(accepted / baseline, 2) if baseline else None,
+            "submit_latency": result["latency"]["submit"],
+            "pool_cpu_seconds": result["pool_cpu_seconds"],
+            "pool_rss_mb": result["pool_rss_mb"]
+        }
+        print(f"{workers:3d} workers  {accepted:10.1f} accepted/s  "
+              f"x{results[workers]['speedup']:.2f}  "
+              f"p99 {result['latency']['submit']['p99_ms']:.3f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+PPLNS payout benchmark for rsdt_mining_pool.py
+
+Fills a PPLNSWindow with millions of difficulty-weighted shares from a
+population of miners, then compares the cost of a block split against a
+naive pass over every share in the window, and times crediting the
+resulting balances to the pool database in one transaction.
+
+Usage: python3 benchmarks/bench_pplns.py [--shares 5000000] [--miners 10000]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import rsdt_mining_pool
+from rsdt_mining_pool import COIN, PoolDatabase, PPLNSWindow, RSDTMiningPool
+
+
+def naive_split(shares, reward: int, fee_percent: float) -> dict:
+    """Split by summing the window share by share"""
+    totals = {}
+    for address, difficulty in shares:
+        totals[address] = totals.get(address, 0) + difficulty
+    total = sum(totals.values())
+    distributable = reward - int(reward * fee_percent / 100)
+    return {address: distributable * difficulty // total for address, difficulty in totals.items()}
+
+
+async def credit(db_path: str, payouts: dict) -> float:
+    database = PoolDatabase(db_path)
+    await database.start()
+    start = time.perf_counter()
+    await database.credit_block(1, '00' * 32, 0.6, 0.006,
+                                {address: amount / COIN for address, amount in payouts.items()})
+    elapsed = time.perf_counter() - start
+    await database.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RSDT pool PPLNS payout benchmark')
+    parser.add_argument('--shares', type=int, default=5000000, help='Shares in the window')
+    parser.add_argument('--miners', type=int, default=10000, help='Distinct miner addresses')
+    parser.add_argument('--extra', type=int, default=1000000,
+                        help='Shares added after the window is full (exercises expiry)')
+    parser.add_argument('--splits', type=int, default=20, help='Block splits to time')
+    args = parser.parse_args()
+
+    rsdt_mining_pool.logger.setLevel(logging.WARNING)
+    rng = random.Random(1)
+    addresses = [f"RSDTbench{m:06d}" for m in range(args.miners)]
+    difficulties = (1000, 2000, 4000, 8000, 16000)
+    stream = [(rng.choice(addresses), rng.choice(difficulties))
+              for _ in range(args.shares + args.extra)]
+    reward = 600 * COIN
+
+    # Size the window so it holds roughly --shares shares
+    window = PPLNSWindow(sum(d for _, d in stream[:args.shares]))
+    start = time.perf_counter()
+    for address, difficulty in stream:
+        window.add(address, difficulty)
+    add_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.splits):
+        payouts, fee = window.split(reward, 1.0)
+    split_seconds = (time.perf_counter() - start) / args.splits
+
+    start = time.perf_counter()
+    naive = naive_split(window.shares, reward, 1.0)
+    naive_seconds = time.perf_counter() - start
+    assert naive == payouts, "incremental split disagrees with the naive split"
+
+    with tempfile.TemporaryDirectory() as workdir:
+        config_file = os.path.join(workdir, 'pool_config.json')
+        with open(config_file, 'w') as f:
+            json.dump({"database": os.path.join(workdir, 'pool.db')}, f)
+        pool = RSDTMiningPool(config_file)
+        credit_seconds = asyncio.run(credit(pool.db_path, payouts))
+        conn = sqlite3.connect(pool.db_path)
+        credited = conn.execute('SELECT COUNT(*), SUM(pending_balance) FROM miners').fetchone()
+        conn.close()
+
+    adds = len(stream)
+    print(json.dumps({
+        "window": window.metrics(),
+        "add_ns_per_share": round(add_seconds / adds * 1e9, 1),
+        "split_ms": round(split_seconds * 1000, 3),
+        "naive_split_ms": round(naive_seconds * 1000, 3),
+        "speedup": round(naive_seconds / split_seconds, 1) if split_seconds > 0 else None,
+        "credit_transaction_ms": round(credit_seconds * 1000, 3),
+        "miners_credited": credited[0],
+        "credited_rsdt": credited[1],
+        "pool_fee_rsdt": fee / COIN
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Share persistence benchmark for rsdt_mining_pool.py
+
+Runs a synthetic Stratum load (N miner connections submitting shares over
+TCP) against two pools: one persisting every share with its own SQLite
+connection and commit (the legacy path), and one using the batched
+PoolDatabase writer. Reports accepted shares/sec for both.
+
+Usage: python3 benchmarks/bench_share_persistence.py [--miners 200] [--shares 20000]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import rsdt_mining_pool
+from rsdt_mining_pool import BlockTemplate, Miner, RSDTMiningPool
+
+
+class LegacySharePool(RSDTMiningPool):
+    """Pool that persists shares the way submit_share used to"""
+
+    async def submit_share(self, miner_address: str, worker_name: str, nonce: int, job,
+                           received=None) -> bool:
+        if not self.current_block:
+            return False
+        if not self.validate_share(miner_address, nonce, self.current_block):
+            return False
+
+        miner_key = f"{miner_address}.{worker_name}"
+        if miner_key not in self.miners:
+            self.miners[miner_key] = Miner(
+                address=miner_address,
+                worker_name=worker_name,
+                connection_time=time.time(),
+                last_share_time=time.time()
+            )
+        miner = self.miners[miner_key]
+        miner.shares_submitted += 1
+        miner.shares_accepted += 1
+        miner.last_share_time = time.time()
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT OR REPLACE INTO miners
+            (address, worker_name, total_shares, accepted_shares, last_seen)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (miner_address, worker_name, miner.shares_submitted, miner.shares_accepted,
+              datetime.now().isoformat(' ')))
+        cursor.execute('''
+            INSERT INTO shares
+            (miner_address, worker_name, nonce, difficulty, timestamp)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (miner_address, worker_name, nonce, self.current_block.difficulty, int(time.time())))
+        conn.commit()
+        conn.close()
+        return True
+
+
+def make_pool(pool_class, workdir: str) -> RSDTMiningPool:
+    """Create a pool with an isolated config and database"""
+    config_file = os.path.join(workdir, 'pool_config.json')
+    with open(config_file, 'w') as f:
+        json.dump({"database": os.path.join(workdir, 'pool.db'), "pool_port": 0}, f)
+
+    pool = pool_class(config_file)
+    # The legacy path checks shares against the template target, so all 0xff
+    # bytes accepts every nonce. The current pool checks them against the job
+    # difficulty (1 accepts every nonce) and submits anything under the
+    # template target as a block, so there the target is zero.
+    pool.current_block = BlockTemplate(
+        height=1,
+        difficulty=1,
+        target=b'\xff' * 32 if pool_class is LegacySharePool else bytes(32),
+        block_header=bytes(80),
+        coinbase_tx=b'',
+        merkle_root=bytes(32),
+        timestamp=int(time.time())
+    )
+    return pool
+
+
+async def read_reply(reader: asyncio.StreamReader) -> dict:
+    """Next reply from the pool, skipping pushed jobs"""
+    while True:
+        message = json.loads(await reader.readline())
+        if message.get("method") != "job":
+            return message
+
+
+async def miner_session(port: int, miner_id: int, shares: int, counter: list):
+    """One simulated miner submitting shares back to back"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    address = f"RSDTbench{miner_id:06d}"
+    login = {"id": 0, "method": "login", "params": {"login": address, "pass": "bench"}}
+    writer.write((json.dumps(login) + '\n').encode())
+    job_id = json.loads(await reader.readline())["result"]["job"]["job_id"]
+
+    for i in range(shares):
+        # Distinct nonces across miners, so no share is a duplicate
+        nonce = miner_id * shares + i + 1
+        request = {
+            "id": i + 1,
+            "method": "submit",
+            "params": {"login": address, "pass": "bench", "nonce": str(nonce), "job_id": job_id}
+        }
+        writer.write((json.dumps(request) + '\n').encode())
+        reply = await read_reply(reader)
+        if (reply.get("result") or {}).get("status") == "OK":
+            counter[0] += 1
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_load(pool: RSDTMiningPool, miners: int, shares: int) -> dict:
+    """Drive the pool with a synthetic Stratum load and time it"""
+    await pool.database.start()
+    server = await asyncio.start_server(pool.handle_miner_connection, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+
+    per_miner = max(1, shares // miners)
+    counter = [0]
+    start = time.perf_counter()
+    await asyncio.gather(*(miner_session(port, m, per_miner, counter) for m in range(miners)))
+    elapsed = time.perf_counter() - start
+
+    server.close()
+    await server.wait_closed()
+    await pool.database.close()
+
+    conn = sqlite3.connect(pool.db_path)
+    stored = conn.execute('SELECT COUNT(*) FROM shares').fetchone()[0]
+    conn.close()
+
+    return {
+        "accepted": counter[0],
+        "stored": stored,
+        "seconds": elapsed,
+        "shares_per_sec": counter[0] / elapsed if elapsed > 0 else 0.0,
+        "writer": pool.database.metrics()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RSDT pool share persistence benchmark')
+    parser.add_argument('--miners', type=int, default=200, help='Concurrent miner connections')
+    parser.add_argument('--shares', type=int, default=20000, help='Total shares to submit')
+    args = parser.parse_args()
+
+    rsdt_mining_pool.logger.setLevel(logging.WARNING)
+
+    results = {}
+    for name, pool_class in (("legacy", LegacySharePool), ("batched", RSDTMiningPool)):
+        with tempfile.TemporaryDirectory() as workdir:
+            pool = make_pool(pool_class, workdir)
+            results[name] = asyncio.run(run_load(pool, args.miners, args.shares))
+        r = results[name]
+        print(f"{name:8s} {r['accepted']:8d} shares in {r['seconds']:7.2f}s "
+              f"= {r['shares_per_sec']:10.1f} shares/s (stored {r['stored']})")
+
+    legacy = results["legacy"]["shares_per_sec"]
+    if legacy > 0:
+        print(f"speedup: {results['batched']['shares_per_sec'] / legacy:.1f}x")
+    print(json.dumps(results["batched"]["writer"], indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Share validation latency benchmark for rsdt_mining_pool.py
+
+Drives the Stratum server with a load generator (N miners submitting a
+mix of valid, duplicate, unknown-job and malformed shares) and reports
+submit-to-reply latency percentiles with validation inline on the event
+loop and with the process-pool ShareValidator. ``--hash-rounds`` repeats
+the double SHA-256 to emulate a slower PoW such as RandomX.
+
+Usage: python3 benchmarks/bench_share_validation.py [--miners 200] [--shares 20000] [--hash-rounds 2000]
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import rsdt_mining_pool
+from rsdt_mining_pool import (BlockTemplate, LatencyHistogram, RSDTMiningPool,
+                              ShareValidator, share_hash)
+
+
+def slow_hash_values(rounds: int, header_prefix: bytes, nonces: List[int]) -> List[int]:
+    """hash_values with the hash repeated ``rounds`` times"""
+    results = []
+    for nonce in nonces:
+        digest = share_hash(header_prefix, nonce)
+        for _ in range(rounds - 1):
+            digest = share_hash(digest.ljust(76, b'\0'), nonce)
+        results.append(int.from_bytes(digest, 'little'))
+    return results
+
+
+def make_pool(workdir: str, workers: int, rounds: int) -> RSDTMiningPool:
+    """Create a pool with an isolated config and database"""
+    config_file = os.path.join(workdir, 'pool_config.json')
+    with open(config_file, 'w') as f:
+        json.dump({"database": os.path.join(workdir, 'pool.db'), "pool_port": 0}, f)
+
+    pool = RSDTMiningPool(config_file)
+    pool.validator = ShareValidator(workers=workers,
+                                    batch_fn=functools.partial(slow_hash_values, rounds))
+    # Shares are checked against the job difficulty; a zero network target
+    # keeps them from all being submitted to the daemon as blocks
+    pool.current_block = BlockTemplate(
+        height=100,
+        difficulty=1,
+        target=bytes(32),
+        block_header=bytes(80),
+        coinbase_tx=b'',
+        merkle_root=bytes(32),
+        timestamp=int(time.time())
+    )
+    return pool
+
+
+async def miner_session(port: int, miner_id: int, shares: int, mix: dict,
+                        latency: LatencyHistogram):
+    """One simulated miner submitting a mix of good and bad shares"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    rng = random.Random(miner_id)
+    address = f"RSDTbench{miner_id:06d}"
+    login = {"id": 0, "method": "login", "params": {"login": address, "pass": "bench"}}
+    writer.write((json.dumps(login) + '\n').encode())
+    current_job = json.loads(await reader.readline())["result"]["job"]["job_id"]
+    # Distinct nonces across miners, so only the deliberate repeats are duplicates
+    first_nonce = miner_id * shares + 1
+    last_nonce = first_nonce
+
+    for i in range(shares):
+        job_id = current_job
+        nonce = first_nonce + i
+        roll = rng.random()
+        if roll < mix["duplicate"]:
+            nonce = last_nonce
+        elif roll < mix["duplicate"] + mix["unknown"]:
+            job_id = "deadbeef"
+        elif roll < mix["duplicate"] + mix["unknown"] + mix["malformed"]:
+            nonce = "not-a-nonce"
+        last_nonce = nonce if isinstance(nonce, int) else last_nonce
+
+        request = {
+            "id": i,
+            "method": "submit",
+            "params": {"login": address, "pass": "bench", "nonce": str(nonce), "job_id": job_id}
+        }
+        start = time.perf_counter()
+        writer.write((json.dumps(request) + '\n').encode())
+        while json.loads(await reader.readline()).get("method") == "job":
+            pass
+        latency.record(time.perf_counter() - start)
+
+    writer.close()
+    await writer.wait_closed()
+
+
+async def loop_lag_probe(lag: LatencyHistogram, interval: float = 0.01):
+    """Measure how late the event loop wakes up a periodic timer"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag.record(max(0.0, loop.time() - start - interval))
+
+
+async def run_load(pool: RSDTMiningPool, miners: int, shares: int, mix: dict) -> dict:
+    """Run the load generator against one pool configuration"""
+    await pool.validator.start()
+    await pool.database.start()
+    server = await asyncio.start_server(pool.handle_miner_connection, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+
+    client_latency = LatencyHistogram()
+    loop_lag = LatencyHistogram()
+    probe = asyncio.create_task(loop_lag_probe(loop_lag))
+
+    per_miner = max(1, shares // miners)
+    start = time.perf_counter()
+    await asyncio.gather(*(miner_session(port, m, per_miner, mix, client_latency)
+                           for m in range(miners)))
+    elapsed = time.perf_counter() - start
+
+    probe.cancel()
+    server.close()
+    await server.wait_closed()
+    await pool.database.close()
+    await pool.validator.close()
+
+    return {
+        "replies_per_sec": client_latency.count / elapsed if elapsed > 0 else 0.0,
+        "client_latency": client_latency.snapshot(),
+        "loop_lag": loop_lag.snapshot(),
+        "pool": pool.get_metrics()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RSDT pool share validation benchmark')
+    parser.add_argument('--miners', type=int, default=200, help='Concurrent miner connections')
+    parser.add_argument('--shares', type=int, default=20000, help='Total shares to submit')
+    parser.add_argument('--hash-rounds', type=int, default=2000,
+                        help='Hash repetitions per share (1 = plain double SHA-256)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Validation worker processes')
+    parser.add_argument('--bad-ratio', type=float, default=0.1,
+                        help='Fraction of shares split evenly between duplicate, unknown-job and malformed')
+    args = parser.parse_args()
+
+    rsdt_mining_pool.logger.setLevel(logging.WARNING)
+    share = args.bad_ratio / 3
+    mix = {"duplicate": share, "unknown": share, "malformed": share}
+
+    for name, workers in (("inline", 0), ("process-pool", args.workers)):
+        with tempfile.TemporaryDirectory() as workdir:
+            pool = make_pool(workdir, workers, args.hash_rounds)
+            result = asyncio.run(run_load(pool, args.miners, args.shares, mix))
+        client = result["client_latency"]
+        lag = result["loop_lag"]
+        print(f"{name:12s} {result['replies_per_sec']:9.1f} replies/s  "
+              f"p50 {client['p50_ms']:8.3f} ms  p99 {client['p99_ms']:8.3f} ms  "
+              f"loop lag p99 {lag['p99_ms']:8.3f} ms")
+        print(json.dumps({"validator": result["pool"]["validator"],
+                          "fast_rejects": result["pool"]["fast_rejects"],
+                          "server_submit_latency": result["pool"]["submit_latency"]}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Stratum transport benchmark for rsdt_mining_pool.py
+
+Two measurements:
+
+* codec: decode a pipelined stream of submit requests and encode their
+  replies in-process, once the way the pool used to (readline, str
+  decode, json.loads, json.dumps of a dict) and once through
+  StratumProtocol framing, the selected codec and the pre-encoded OK
+  reply. Reported as messages per second on one core.
+* pool: run benchmarks/stratum_load.py against a local pool for each
+  combination of stratum_transport, json_codec and (if installed) uvloop,
+  and report requests handled per second of pool CPU time.
+
+Usage: python3 benchmarks/bench_stratum_transport.py [--messages 200000] [--connections 200] [--duration 15]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, BENCH_DIR)
+
+import rsdt_mining_pool
+from rsdt_mining_pool import StratumProtocol, ok_reply, orjson, use_json_codec, uvloop
+
+import stratum_load
+
+
+class NullTransport(asyncio.Transport):
+    """Transport that swallows everything, for in-process framing runs"""
+
+    def write(self, data):
+        pass
+
+    def is_closing(self):
+        return False
+
+    def pause_reading(self):
+        pass
+
+    def resume_reading(self):
+        pass
+
+
+def submit_stream(messages: int, chunk_size: int):
+    """Pipelined submit requests cut into socket-sized chunks"""
+    lines = b''.join(
+        (json.dumps({"id": i, "method": "submit",
+                     "params": {"login": "RSDTbench000001", "pass": "w0", "job_id": "1a2b",
+                                "nonce": str(i)}}) + '\n').encode()
+        for i in range(messages))
+    return [lines[i:i + chunk_size] for i in range(0, len(lines), chunk_size)]
+
+
+async def legacy_codec(chunks) -> int:
+    """readline + decode + json.loads, json.dumps + encode per reply"""
+    reader = asyncio.StreamReader()
+    for chunk in chunks:
+        reader.feed_data(chunk)
+    reader.feed_eof()
+    handled = 0
+    while True:
+        data = await reader.readline()
+        if not data:
+            return handled
+        message = json.loads(data.decode().strip())
+        (json.dumps({"id": message.get('id'), "result": {"status": "OK"}}) + '\n').encode()
+        handled += 1
+
+
+async def protocol_codec(chunks) -> int:
+    """StratumProtocol framing + selected codec + pre-encoded OK reply"""
+    protocol = StratumProtocol(pool=None)
+    protocol.transport = NullTransport()
+    handled = 0
+    for chunk in chunks:
+        protocol.data_received(chunk)
+        while protocol.messages:
+            message = protocol.messages.popleft()
+            ok_reply(message.get('id'))
+            handled += 1
+    return handled
+
+
+def run_codec(args) -> dict:
+    chunks = submit_stream(args.messages, args.chunk_size)
+    results = {}
+    variants = [("legacy", legacy_codec, 'stdlib'), ("protocol+stdlib", protocol_codec, 'stdlib')]
+    if orjson is not None:
+        variants.append(("protocol+orjson", protocol_codec, 'orjson'))
+    for name, runner, codec in variants:
+        use_json_codec(codec)
+        start = time.process_time()
+        handled = asyncio.run(runner(chunks))
+        cpu = time.process_time() - start
+        results[name] = round(handled / cpu, 1) if cpu > 0 else None
+        print(f"codec {name:18s} {results[name]:12.1f} msgs/s per core")
+    use_json_codec('auto')
+    return results
+
+
+def run_pool(args) -> dict:
+    variants = []
+    for transport in ('streams', 'protocol'):
+        for codec in ('stdlib', 'orjson') if orjson is not None else ('stdlib',):
+            for loop in ('asyncio', 'uvloop') if uvloop is not None else ('asyncio',):
+                variants.append((transport, codec, loop))
+
+    results = {}
+    for transport, codec, loop in variants:
+        name = f"{transport}+{codec}+{loop}"
+        load_args = stratum_load.build_parser().parse_args([
+            '--connections', str(args.connections),
+            '--duration', str(args.duration),
+            '--processes', str(args.processes),
+            '--mix', 'valid=1',
+            '--block-interval', '0',
+            '--pool-config', f'stratum_transport={transport}',
+            '--pool-config', f'json_codec={codec}',
+            '--pool-config', f'use_uvloop={json.dumps(loop == "uvloop")}',
+        ])
+        result = asyncio.run(stratum_load.run_load(load_args, load_args.mix))
+        per_core = result["throughput"]["requests_per_pool_cpu_second"]
+        results[name] = {
+            "requests_per_pool_cpu_second": per_core,
+            "submits_per_sec": result["throughput"]["submits_per_sec"],
+            "submit_latency": result["latency"]["submit"],
+            "pool_loop_lag": result["pool_loop_lag"]
+        }
+        print(f"pool  {name:26s} {per_core or 0:12.1f} requests per pool CPU second  "
+              f"({result['throughput']['submits_per_sec']:.1f} submits/s, "
+              f"p99 {result['latency']['submit']['p99_ms']:.3f} ms)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RSDT pool Stratum transport benchmark')
+    parser.add_argument('--messages', type=int, default=200000, help='Messages for the codec run')
+    parser.add_argument('--chunk-size', type=int, default=65536, help='Bytes per simulated socket read')
+    parser.add_argument('--connections', type=int, default=200, help='Miner connections for the pool run')
+    parser.add_argument('--duration', type=float, default=15, help='Seconds per pool run')
+    parser.add_argument('--processes', type=int, default=2, help='Load generator processes')
+    parser.add_argument('--skip-pool', action='store_true', help='Only run the in-process codec benchmark')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    args = parser.parse_args()
+
+    rsdt_mining_pool.logger.setLevel(logging.WARNING)
+    results = {"codec": run_codec(args)}
+    if not args.skip_pool:
+        results["pool"] = run_pool(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
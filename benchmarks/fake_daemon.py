@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Fake RSDT daemon for pool benchmarks
+
+Serves the JSON-RPC methods rsdt_mining_pool.py uses (get_info,
+get_block_template and submit_block, singly or batched) on /json_rpc.
+The chain advances one block every ``--block-interval`` seconds, so
+load tests see template changes and stale shares without a real node.
+
+Usage: python3 benchmarks/fake_daemon.py [--port 18081] [--block-interval 30]
+"""
+
+import argparse
+import hashlib
+import logging
+import time
+from typing import Dict, Optional
+
+from aiohttp import web
+
+MAX_TARGET = 2 ** 256 - 1
+
+logger = logging.getLogger('RSDT_FakeDaemon')
+
+
+class FakeDaemon:
+    """Deterministic chain that grows on a fixed schedule"""
+
+    def __init__(self, block_interval: float = 30.0, network_difficulty: int = 10 ** 12,
+                 start_height: int = 1000, reward: int = 600 * 10 ** 12):
+        self.block_interval = block_interval
+        self.network_difficulty = network_difficulty
+        self.start_height = start_height
+        self.reward = reward
+        self.started = time.time()
+        self.calls: Dict[str, int] = {}
+        self.batches = 0
+        self.blocks_submitted = 0
+        self.last_block: Optional[str] = None
+
+    def height(self) -> int:
+        if self.block_interval <= 0:
+            return self.start_height
+        return self.start_height + int((time.time() - self.started) / self.block_interval)
+
+    def block_template(self) -> Dict:
+        height = self.height()
+        seed = hashlib.sha256(height.to_bytes(8, 'little')).digest()
+        # 80-byte blob; the 4 reserved bytes sit inside the hashed 76-byte prefix
+        blob = (seed * 3)[:80]
+        target = MAX_TARGET // self.network_difficulty
+        return {
+            "height": height,
+            "difficulty": self.network_difficulty,
+            "target": target.to_bytes(32, 'little').hex(),
+            "blocktemplate_blob": blob.hex(),
+            "coinbase_tx": seed.hex(),
+            "merkle_root": hashlib.sha256(seed).hexdigest(),
+            "prev_hash": hashlib.sha256((height - 1).to_bytes(8, 'little')).hexdigest(),
+            "reserved_offset": 68,
+            "expected_reward": self.reward,
+            "status": "OK"
+        }
+
+    def dispatch(self, request: Dict) -> Dict:
+        method = request.get('method')
+        self.calls[method] = self.calls.get(method, 0) + 1
+        response = {"jsonrpc": "2.0", "id": request.get('id')}
+        if method == 'get_info':
+            response["result"] = {"height": self.height(), "difficulty": self.network_difficulty,
+                                  "status": "OK"}
+        elif method == 'get_block_template':
+            response["result"] = self.block_template()
+        elif method == 'submit_block':
+            params = request.get('params')
+            if not isinstance(params, list) or not params or len(params[0]) < 160:
+                response["error"] = {"code": -6, "message": "Wrong block blob"}
+            else:
+                self.blocks_submitted += 1
+                self.last_block = params[0]
+                response["result"] = {"status": "OK"}
+        else:
+            response["error"] = {"code": -32601, "message": "Method not found"}
+        return response
+
+    async def handle_json_rpc(self, request):
+        payload = await request.json()
+        if isinstance(payload, list):
+            self.batches += 1
+            return web.json_response([self.dispatch(call) for call in payload])
+        return web.json_response(self.dispatch(payload))
+
+    async def handle_stats(self, request):
+        return web.json_response({
+            "height": self.height(),
+            "calls": self.calls,
+            "batches": self.batches,
+            "blocks_submitted": self.blocks_submitted
+        })
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/json_rpc', self.handle_json_rpc)
+        app.router.add_get('/stats', self.handle_stats)
+        return app
+
+    async def start(self, host: str = '127.0.0.1', port: int = 18081) -> web.AppRunner:
+        runner = web.AppRunner(self.make_app(), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        logger.info(f"Fake daemon listening on {host}:{port}")
+        return runner
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description='Fake RSDT daemon for pool benchmarks')
+    parser.add_argument('--host', default='127.0.0.1', help='Listen address')
+    parser.add_argument('--port', type=int, default=18081, help='JSON-RPC port')
+    parser.add_argument('--block-interval', type=float, default=30.0,
+                        help='Seconds per block (0 = never advance)')
+    parser.add_argument('--network-difficulty', type=int, default=10 ** 12,
+                        help='Difficulty reported in templates')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    daemon = FakeDaemon(args.block_interval, args.network_difficulty)
+    web.run_app(daemon.make_app(), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == '__main__':
+    main()
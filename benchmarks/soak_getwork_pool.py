@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Soak test for the getwork pool's job store (mining_pool/pool_server.py)
+
+Runs the pool in-process and keeps it busy with /getwork calls from a
+rotating population of miners that almost never find a share, which is
+the pattern that used to leak jobs. Every ``--sample`` seconds it reads
+/metrics and prints job count, estimated job store memory and process
+RSS. It fails (exit status 1) if the store ever holds more than
+``--max-jobs`` jobs, or if RSS in the second half of the run grows more
+than ``--rss-growth`` percent over its first-half peak.
+
+Usage: python3 benchmarks/soak_getwork_pool.py [--duration 600] [--clients 64] [--ttl 30] [--max-jobs 20000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'mining_pool'))
+sys.path.insert(0, BENCH_DIR)
+
+from aiohttp import ClientSession, web
+
+import pool_server
+from stratum_load import free_port
+
+
+async def getwork_client(session: ClientSession, base: str, args, deadline: float, counts: dict):
+    while time.time() < deadline:
+        address = f"RSDTsoak{random.randrange(args.miners):06d}"
+        async with session.post(f"{base}/getwork", json={"address": address}) as response:
+            job = await response.json()
+        counts["getwork"] += 1
+        if random.random() < args.submit_ratio:
+            # A share that misses the target touches the job without retiring it
+            async with session.post(f"{base}/submitwork", json={
+                    "address": address, "job_id": job["job_id"],
+                    "nonce": random.randrange(1, 2 ** 32), "hash": "00"}) as response:
+                await response.read()
+            counts["submitwork"] += 1
+
+
+async def run(args) -> bool:
+    port = free_port()
+    app = pool_server.create_app(job_ttl=args.ttl, max_jobs=args.max_jobs,
+                                 sweep_interval=min(10.0, args.ttl))
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    base = f"http://127.0.0.1:{port}"
+
+    started = time.time()
+    deadline = started + args.duration
+    counts = {"getwork": 0, "submitwork": 0}
+    samples = []
+    ok = True
+    async with ClientSession() as session:
+        clients = [asyncio.create_task(getwork_client(session, base, args, deadline, counts))
+                   for _ in range(args.clients)]
+        print(f"{'elapsed':>8s} {'getwork':>10s} {'jobs':>8s} {'store_mb':>9s} {'rss_mb':>8s} "
+              f"{'expired':>9s} {'evicted':>9s}")
+        while time.time() < deadline:
+            await asyncio.sleep(min(args.sample, max(0.0, deadline - time.time())))
+            async with session.get(f"{base}/metrics") as response:
+                metrics = await response.json()
+            store = metrics["job_store"]
+            sample = {
+                "elapsed": round(time.time() - started, 1),
+                "getwork": counts["getwork"],
+                "jobs": store["jobs"],
+                "store_mb": round(store["memory_bytes"] / 2 ** 20, 2),
+                "rss_mb": round((metrics["process_rss_bytes"] or 0) / 2 ** 20, 1),
+                "expired": store["expired"],
+                "evicted": store["evicted"]
+            }
+            samples.append(sample)
+            print(f"{sample['elapsed']:8.1f} {sample['getwork']:10d} {sample['jobs']:8d} "
+                  f"{sample['store_mb']:9.2f} {sample['rss_mb']:8.1f} "
+                  f"{sample['expired']:9d} {sample['evicted']:9d}")
+            if store["jobs"] > args.max_jobs:
+                print(f"FAIL: {store['jobs']} jobs stored, cap is {args.max_jobs}")
+                ok = False
+        await asyncio.gather(*clients)
+    await runner.cleanup()
+
+    half = len(samples) // 2
+    if half and samples[0]["rss_mb"]:
+        first_peak = max(s["rss_mb"] for s in samples[:half])
+        final = samples[-1]["rss_mb"]
+        growth = (final - first_peak) / first_peak * 100
+        print(f"RSS first-half peak {first_peak:.1f} MB, final {final:.1f} MB ({growth:+.1f}%)")
+        if growth > args.rss_growth:
+            print(f"FAIL: RSS grew more than {args.rss_growth}% after warm-up")
+            ok = False
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"counts": counts, "samples": samples, "passed": ok}, f, indent=2)
+    print("PASS" if ok else "FAIL")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RSDT getwork pool job store soak test')
+    parser.add_argument('--duration', type=float, default=600, help='Seconds to run')
+    parser.add_argument('--clients', type=int, default=64, help='Concurrent getwork clients')
+    parser.add_argument('--miners', type=int, default=100000, help='Distinct miner addresses')
+    parser.add_argument('--submit-ratio', type=float, default=0.05,
+                        help='Fraction of jobs that get a (missing) share')
+    parser.add_argument('--ttl', type=float, default=30, help='Job idle TTL in seconds')
+    parser.add_argument('--max-jobs', type=int, default=20000, help='Job store cap')
+    parser.add_argument('--sample', type=float, default=10, help='Seconds between samples')
+    parser.add_argument('--rss-growth', type=float, default=10,
+                        help='Allowed RSS growth after warm-up, in percent')
+    parser.add_argument('--output', help='Write samples as JSON to this file')
+    args = parser.parse_args()
+
+    sys.exit(0 if asyncio.run(run(args)) else 1)
+
+
+if __name__ == '__main__':
+    main()
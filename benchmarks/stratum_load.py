@@ -0,0 +1,617 @@
+#!/usr/bin/env python3
+"""
+Stratum load generator for rsdt_mining_pool.py
+
+Opens N simulated miner connections that run the login / getjob / submit
+sequence at a configurable rate, with a configurable mix of valid,
+invalid (above target), stale and duplicate shares. Valid and invalid
+nonces are found by hashing the job blob against its target, so every
+share's expected outcome is known and mismatching replies are counted.
+
+By default the generator starts benchmarks/fake_daemon.py and a pool
+process configured against it in a scratch directory; ``--pool`` points
+it at an already running pool instead. It reports throughput, reply
+latency percentiles per method, client and pool event-loop lag and pool
+RSS, and ``--output`` writes everything as JSON. ``--compare`` prints the
+change of the headline numbers against an earlier results file.
+
+Usage: python3 benchmarks/stratum_load.py [--connections 500] [--duration 30] [--rate 0]
+                                          [--mix valid=0.85,invalid=0.05,stale=0.05,duplicate=0.05]
+                                          [--output results.json] [--compare old.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+
+import rsdt_mining_pool
+from rsdt_mining_pool import LatencyHistogram, share_hash
+
+POOL_SCRIPT = os.path.join(BENCH_DIR, '..', 'rsdt_mining_pool.py')
+DAEMON_SCRIPT = os.path.join(BENCH_DIR, 'fake_daemon.py')
+SHARE_KINDS = ('valid', 'invalid', 'stale', 'duplicate')
+METHODS = ('login', 'getjob', 'submit')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {kind: 0.0 for kind in SHARE_KINDS}
+    for part in text.split(','):
+        kind, _, weight = part.partition('=')
+        if kind.strip() not in mix:
+            raise argparse.ArgumentTypeError(f"unknown share kind '{kind}'")
+        mix[kind.strip()] = float(weight)
+    total = sum(mix.values())
+    if total <= 0:
+        raise argparse.ArgumentTypeError("share mix is empty")
+    return {kind: weight / total for kind, weight in mix.items()}
+
+
+def parse_config_override(text: str):
+    key, _, value = text.partition('=')
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def process_tree(pid: Optional[int]) -> List[int]:
+    """A process and all of its descendants, from /proc"""
+    if not pid:
+        return []
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir('/proc') if os.path.isdir('/proc') else ():
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rpartition(')')[2].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, ()))
+    return tree
+
+
+def cpu_seconds(pid: Optional[int]) -> Optional[float]:
+    """User plus system CPU time of a process tree from /proc"""
+    total = None
+    for member in process_tree(pid):
+        try:
+            with open(f"/proc/{member}/stat") as f:
+                fields = f.read().rpartition(')')[2].split()
+            total = (total or 0.0) + (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+        except (OSError, ValueError, IndexError):
+            continue
+    return total
+
+
+def rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Resident set size of a process from /proc, in MiB"""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def tree_rss_mb(pid: Optional[int]) -> Optional[float]:
+    """Resident set size summed over a process tree, in MiB"""
+    values = [value for value in map(rss_mb, process_tree(pid)) if value is not None]
+    return sum(values) if values else None
+
+
+class LoadStats:
+    """Counters and histograms for one client process"""
+
+    def __init__(self):
+        self.latency = {method: LatencyHistogram() for method in METHODS}
+        self.sent = {kind: 0 for kind in SHARE_KINDS}
+        self.replies: Dict[str, int] = {}
+        self.unexpected = {kind: 0 for kind in SHARE_KINDS}
+        self.stale_unavailable = 0
+        self.stale_races = 0
+        self.jobs_pushed = 0
+        self.connect_errors = 0
+        self.logged_in = 0
+        self.loop_lag = LatencyHistogram()
+
+    def merge(self, other: 'LoadStats'):
+        for method in METHODS:
+            self.latency[method].merge(other.latency[method])
+        for kind in SHARE_KINDS:
+            self.sent[kind] += other.sent[kind]
+            self.unexpected[kind] += other.unexpected[kind]
+        for reply, count in other.replies.items():
+            self.replies[reply] = self.replies.get(reply, 0) + count
+        self.stale_unavailable += other.stale_unavailable
+        self.stale_races += other.stale_races
+        self.jobs_pushed += other.jobs_pushed
+        self.connect_errors += other.connect_errors
+        self.logged_in += other.logged_in
+        self.loop_lag.merge(other.loop_lag)
+
+
+class StratumClient:
+    """Newline-delimited JSON-RPC client that matches replies to requests"""
+
+    def __init__(self, reader, writer, stats: LoadStats):
+        self.reader = reader
+        self.writer = writer
+        self.stats = stats
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.next_id = 1
+        self.job: Optional[Dict] = None
+        self.stale_job: Optional[Dict] = None
+        self.reader_task = asyncio.create_task(self._read_loop())
+
+    @classmethod
+    async def connect(cls, host: str, port: int, stats: LoadStats) -> 'StratumClient':
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer, stats)
+
+    def set_job(self, job: Dict):
+        if not job or 'job_id' not in job:
+            return
+        if self.job and self.job.get('height') != job.get('height'):
+            self.stale_job = self.job
+        self.job = dict(job, header_prefix=bytes.fromhex(job['blob'])[:76],
+                        target_value=int.from_bytes(bytes.fromhex(job['target']), 'little'),
+                        nonces=[])
+
+    async def _read_loop(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                future = self.pending.pop(message.get('id'), None)
+                if future and not future.done():
+                    future.set_result(message)
+                elif message.get('method') == 'job':
+                    self.stats.jobs_pushed += 1
+                    self.set_job(message.get('params'))
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("connection closed"))
+
+    async def request(self, method: str, params: Dict) -> Dict:
+        request_id = self.next_id
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        start = time.perf_counter()
+        self.writer.write((json.dumps({"id": request_id, "method": method, "params": params}) + '\n').encode())
+        reply = await future
+        self.stats.latency[method].record(time.perf_counter() - start)
+        return reply
+
+    async def close(self):
+        self.reader_task.cancel()
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def find_nonce(job: Dict, start: int, valid: bool) -> int:
+    """First nonce from ``start`` whose share hash meets (or misses) the target"""
+    nonce = start
+    while True:
+        value = int.from_bytes(share_hash(job['header_prefix'], nonce), 'little')
+        if (value < job['target_value']) == valid:
+            return nonce
+        nonce = (nonce + 1) & 0xFFFFFFFF
+
+
+def expected_reply(kind: str, reply: Dict) -> bool:
+    if kind == 'valid':
+        return (reply.get('result') or {}).get('status') == 'OK'
+    if kind == 'invalid':
+        return (reply.get('result') or {}).get('status') == 'ERROR'
+    if kind == 'stale':
+        return reply.get('error') == 'Stale job'
+    return reply.get('error') == 'Duplicate share'
+
+
+def reply_label(reply: Dict) -> str:
+    if reply.get('error'):
+        return str(reply['error'])
+    return (reply.get('result') or {}).get('status', 'unknown')
+
+
+async def miner_session(host: str, port: int, miner_id: int, args, mix: Dict[str, float],
+                        deadline: float, stats: LoadStats):
+    """One simulated miner: log in, then submit shares until the deadline"""
+    try:
+        client = await StratumClient.connect(host, port, stats)
+    except OSError:
+        stats.connect_errors += 1
+        return
+
+    rng = random.Random(miner_id)
+    address = f"RSDTload{miner_id:06d}"
+    worker = f"w{miner_id % 4}"
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    next_nonce = rng.randrange(0, 2 ** 31)
+    interval = 1.0 / args.rate if args.rate > 0 else 0.0
+    submits = 0
+
+    try:
+        reply = await client.request('login', {"login": address, "pass": worker, "agent": "stratum_load"})
+        client.set_job((reply.get('result') or {}).get('job'))
+        if not client.job:
+            return
+        stats.logged_in += 1
+        next_send = time.perf_counter() + rng.random() * interval
+
+        while time.time() < deadline:
+            if interval:
+                delay = next_send - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                next_send += interval
+
+            kind = rng.choices(kinds, weights)[0]
+            job = client.job
+            if kind == 'stale' and not client.stale_job:
+                stats.stale_unavailable += 1
+                kind = 'valid'
+            if kind == 'duplicate' and not job['nonces']:
+                kind = 'valid'
+
+            if kind == 'stale':
+                job = client.stale_job
+                nonce = next_nonce
+            elif kind == 'duplicate':
+                nonce = job['nonces'][-1]
+            else:
+                nonce = find_nonce(job, next_nonce, kind == 'valid')
+            next_nonce = (nonce + 1) & 0xFFFFFFFF
+            if kind != 'stale':
+                job['nonces'].append(nonce)
+                del job['nonces'][:-8]
+
+            stats.sent[kind] += 1
+            reply = await client.request('submit', {"login": address, "pass": worker,
+                                                    "job_id": job['job_id'], "nonce": str(nonce)})
+            label = reply_label(reply)
+            stats.replies[label] = stats.replies.get(label, 0) + 1
+            if expected_reply(kind, reply):
+                pass
+            elif reply.get('error') == 'Stale job':
+                # The block changed while the share was in flight
+                stats.stale_races += 1
+            else:
+                stats.unexpected[kind] += 1
+
+            submits += 1
+            if args.getjob_every and submits % args.getjob_every == 0:
+                reply = await client.request('getjob', {"login": address, "pass": worker})
+                client.set_job(reply.get('result'))
+    except ConnectionError:
+        stats.connect_errors += 1
+    finally:
+        await client.close()
+
+
+async def loop_lag_probe(lag: LatencyHistogram, interval: float = 0.01):
+    """Measure how late the event loop wakes up a periodic timer"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag.record(max(0.0, loop.time() - start - interval))
+
+
+async def run_clients(host: str, port: int, first_id: int, count: int, args,
+                      mix: Dict[str, float], deadline: float) -> LoadStats:
+    """Run a slice of the simulated miners in this process"""
+    stats = LoadStats()
+    probe = asyncio.create_task(loop_lag_probe(stats.loop_lag))
+    tasks = []
+    for i in range(count):
+        tasks.append(asyncio.create_task(
+            miner_session(host, port, first_id + i, args, mix, deadline, stats)))
+        if args.ramp > 0:
+            await asyncio.sleep(1.0 / args.ramp)
+    await asyncio.gather(*tasks)
+    probe.cancel()
+    return stats
+
+
+def client_process(host: str, port: int, first_id: int, count: int, args,
+                   mix: Dict[str, float], deadline: float, results: multiprocessing.Queue):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    results.put(asyncio.run(run_clients(host, port, first_id, count, args, mix, deadline)))
+
+
+async def wait_for_pool(host: str, port: int, timeout: float = 30.0):
+    """Wait until the pool accepts a login and hands out a job"""
+    stop = time.time() + timeout
+    while time.time() < stop:
+        try:
+            client = await StratumClient.connect(host, port, LoadStats())
+            try:
+                reply = await asyncio.wait_for(
+                    client.request('login', {"login": "RSDTloadprobe", "pass": "probe"}), 5)
+            finally:
+                await client.close()
+            if 'job_id' in ((reply.get('result') or {}).get('job') or {}):
+                return
+        except (OSError, asyncio.TimeoutError):
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"pool at {host}:{port} did not become ready")
+
+
+async def sample_rss(pid: Optional[int], samples: List[float], interval: float = 1.0):
+    while pid:
+        value = tree_rss_mb(pid)
+        if value is not None:
+            samples.append(value)
+        await asyncio.sleep(interval)
+
+
+async def fetch_json(url: Optional[str]) -> Optional[Dict]:
+    if not url:
+        return None
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                return await response.json()
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return None
+
+
+def start_local_pool(workdir: str, args) -> Dict:
+    """Start the fake daemon and a pool process configured against it"""
+    daemon_port, pool_port, api_port = free_port(), free_port(), free_port()
+    daemon = subprocess.Popen(
+        [sys.executable, DAEMON_SCRIPT, '--port', str(daemon_port),
+         '--block-interval', str(args.block_interval)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    config = {
+        "daemon_url": f"http://127.0.0.1:{daemon_port}",
+        "database": os.path.join(workdir, 'pool.db'),
+        "pool_port": pool_port,
+        "api_port": api_port,
+        "zmq_pub": f"tcp://127.0.0.1:{free_port()}",
+        "validation_workers": args.pool_validation_workers,
+        "vardiff_start_difficulty": args.share_difficulty,
+        "vardiff_min_difficulty": args.share_difficulty,
+        "vardiff_max_difficulty": args.share_difficulty
+    }
+    config.update(dict(args.pool_config))
+    with open(os.path.join(workdir, 'pool_config.json'), 'w') as f:
+        json.dump(config, f)
+    # The pool reads pool_config.json and writes its log in its working directory
+    pool = subprocess.Popen([sys.executable, os.path.abspath(POOL_SCRIPT)], cwd=workdir,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return {"daemon": daemon, "pool": pool, "pool_port": pool_port, "daemon_port": daemon_port,
+            "api_url": f"http://127.0.0.1:{api_port}/metrics",
+            "daemon_stats_url": f"http://127.0.0.1:{daemon_port}/stats"}
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=BENCH_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+async def run_load(args, mix: Dict[str, float]) -> Dict:
+    local = None
+    workdir = None
+    if args.pool:
+        host, _, port = args.pool.rpartition(':')
+        port = int(port)
+        pool_pid = args.pool_pid
+        api_url = args.pool_metrics
+        daemon_stats_url = None
+    else:
+        workdir = tempfile.TemporaryDirectory()
+        local = start_local_pool(workdir.name, args)
+        host, port = '127.0.0.1', local["pool_port"]
+        pool_pid = local["pool"].pid
+        api_url = local["api_url"]
+        daemon_stats_url = local["daemon_stats_url"]
+
+    try:
+        await wait_for_pool(host, port)
+        rss_samples: List[float] = []
+        sampler = asyncio.create_task(sample_rss(pool_pid, rss_samples))
+
+        cpu_start = cpu_seconds(pool_pid)
+        started = time.time()
+        deadline = started + args.duration + (args.connections / args.ramp if args.ramp > 0 else 0)
+        per_process = -(-args.connections // args.processes)
+        if args.processes == 1:
+            stats = await run_clients(host, port, 0, args.connections, args, mix, deadline)
+        else:
+            ctx = multiprocessing.get_context('spawn')
+            results = ctx.Queue()
+            processes = []
+            for p in range(args.processes):
+                count = min(per_process, args.connections - p * per_process)
+                if count <= 0:
+                    break
+                proc = ctx.Process(target=client_process, args=(
+                    host, port, p * per_process, count, args, mix, deadline, results))
+                proc.start()
+                processes.append(proc)
+            loop = asyncio.get_running_loop()
+            stats = LoadStats()
+            for _ in processes:
+                stats.merge(await loop.run_in_executor(None, results.get))
+            for proc in processes:
+                proc.join()
+        elapsed = time.time() - started
+        cpu_end = cpu_seconds(pool_pid)
+
+        sampler.cancel()
+        pool_metrics = await fetch_json(api_url)
+        daemon_stats = await fetch_json(daemon_stats_url)
+    finally:
+        if local:
+            for proc in (local["pool"], local["daemon"]):
+                proc.terminate()
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+            workdir.cleanup()
+
+    submits = stats.latency['submit'].count
+    accepted = stats.replies.get('OK', 0)
+    requests = sum(histogram.count for histogram in stats.latency.values())
+    pool_cpu = cpu_end - cpu_start if cpu_start is not None and cpu_end is not None else None
+    return {
+        "revision": git_revision(),
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(started)),
+        "settings": {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        "share_mix": mix,
+        "seconds": round(elapsed, 3),
+        "connections": {"requested": args.connections, "logged_in": stats.logged_in,
+                        "errors": stats.connect_errors},
+        "throughput": {
+            "submits_per_sec": round(submits / elapsed, 1) if elapsed > 0 else 0.0,
+            "accepted_per_sec": round(accepted / elapsed, 1) if elapsed > 0 else 0.0,
+            "requests_per_pool_cpu_second": round(requests / pool_cpu, 1) if pool_cpu else None
+        },
+        "pool_cpu_seconds": round(pool_cpu, 3) if pool_cpu is not None else None,
+        "latency": {method: histogram.snapshot() for method, histogram in stats.latency.items()},
+        "shares": {"sent": stats.sent, "replies": stats.replies, "unexpected": stats.unexpected,
+                   "stale_unavailable": stats.stale_unavailable, "stale_races": stats.stale_races},
+        "jobs_pushed": stats.jobs_pushed,
+        "client_loop_lag": stats.loop_lag.snapshot(),
+        "client_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "pool_rss_mb": {"peak": round(max(rss_samples), 1) if rss_samples else None,
+                        "final": round(rss_samples[-1], 1) if rss_samples else None},
+        "pool_loop_lag": (pool_metrics or {}).get('loop_lag'),
+        "pool_metrics": pool_metrics,
+        "daemon": daemon_stats
+    }
+
+
+HEADLINE = (
+    ("throughput", "submits_per_sec"),
+    ("throughput", "accepted_per_sec"),
+    ("throughput", "requests_per_pool_cpu_second"),
+    ("latency", "submit", "p50_ms"),
+    ("latency", "submit", "p99_ms"),
+    ("client_loop_lag", "p99_ms"),
+    ("pool_loop_lag", "p99_ms"),
+    ("pool_rss_mb", "peak"),
+)
+
+
+def lookup(result: Dict, path) -> Optional[float]:
+    for key in path:
+        if not isinstance(result, dict):
+            return None
+        result = result.get(key)
+    return result
+
+
+def print_summary(result: Dict, baseline: Optional[Dict] = None):
+    submit = result["latency"]["submit"]
+    print(f"{result['connections']['logged_in']} miners, {result['seconds']:.1f}s: "
+          f"{result['throughput']['submits_per_sec']:.1f} submits/s "
+          f"({result['throughput']['accepted_per_sec']:.1f} accepted/s), "
+          f"submit p50 {submit['p50_ms']:.3f} ms p99 {submit['p99_ms']:.3f} ms")
+    print(f"sent {result['shares']['sent']}  unexpected {result['shares']['unexpected']}")
+    if not baseline:
+        return
+    print(f"compared with {baseline.get('revision')} ({baseline.get('timestamp')}):")
+    for path in HEADLINE:
+        new, old = lookup(result, path), lookup(baseline, path)
+        if new is None or old is None:
+            continue
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        print(f"  {'.'.join(path):32s} {old:12.3f} -> {new:12.3f}  {change}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='RSDT pool Stratum load generator')
+    parser.add_argument('--connections', type=int, default=500, help='Simulated miner connections')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of load after ramp-up')
+    parser.add_argument('--rate', type=float, default=0,
+                        help='Shares per second per connection (0 = as fast as replies allow)')
+    parser.add_argument('--ramp', type=float, default=500, help='New connections per second (0 = all at once)')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('valid=0.85,invalid=0.05,stale=0.05,duplicate=0.05'),
+                        help='Share mix as kind=weight pairs (valid, invalid, stale, duplicate)')
+    parser.add_argument('--getjob-every', type=int, default=50, help='Send getjob after this many submits (0 = never)')
+    parser.add_argument('--processes', type=int, default=1, help='Client processes')
+    parser.add_argument('--share-difficulty', type=int, default=2,
+                        help='Share difficulty pinned in the local pool (keeps nonce search cheap)')
+    parser.add_argument('--block-interval', type=float, default=10,
+                        help='Fake daemon seconds per block (drives stale shares)')
+    parser.add_argument('--pool-validation-workers', type=int, default=None,
+                        help='validation_workers for the local pool')
+    parser.add_argument('--pool-config', type=parse_config_override, action='append', default=[],
+                        metavar='KEY=VALUE', help='Extra local pool config (VALUE parsed as JSON when possible)')
+    parser.add_argument('--pool', help='HOST:PORT of an already running pool instead of a local one')
+    parser.add_argument('--pool-pid', type=int, help='PID of the --pool process, for RSS sampling')
+    parser.add_argument('--pool-metrics', help='URL of the --pool /metrics endpoint')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+
+    rsdt_mining_pool.logger.setLevel(logging.WARNING)
+    result = asyncio.run(run_load(args, args.mix))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_summary(result, baseline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,21 +5,164 @@
 
 import asyncio
 import json
+import os
+import sys
 import time
 import hashlib
 import struct
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Callable, Set, Tuple
 from dataclasses import dataclass
-from aiohttp import web, ClientSession
+from aiohttp import web, ClientSession, WSCloseCode
 import aiohttp_cors
 
-@dataclass
+class JobTemplate:
+    """Work shared by every job at one height and difficulty
+    
+    ``header`` is the 80-byte header every job starts from: height and
+    timestamp (uint64 LE), previous hash and merkle root. A job's
+    block_data is the header plus its 8-byte extranonce; miners append an
+    8-byte nonce. The getwork response is pre-rendered around the two
+    per-job fields.
+    """
+    __slots__ = ('height', 'difficulty', 'target', 'header', 'response_head', 'response_mid')
+    
+    def __init__(self, height: int, difficulty: int, target_hex: str):
+        self.height = height
+        self.difficulty = difficulty
+        self.target = int(target_hex, 16)
+        merkle_root = hashlib.sha256(f"block_{height}".encode()).digest()
+        self.header = struct.pack('<QQ', height, int(time.time())) + bytes(32) + merkle_root
+        self.response_head = f'{{"block_data": "{self.header.hex()}'
+        self.response_mid = (f'", "target": "{target_hex}", "difficulty": {difficulty}, '
+                             f'"height": {height}, "job_id": "')
+    
+    def block_data(self, extranonce: int) -> bytes:
+        return self.header + struct.pack('<Q', extranonce)
+    
+    def render(self, extranonce: int, job_id: str) -> bytes:
+        """getwork response body for one job"""
+        extranonce_hex = struct.pack('<Q', extranonce).hex()
+        return f'{self.response_head}{extranonce_hex}{self.response_mid}{job_id}"}}'.encode()
+
 class MiningJob:
-    job_id: str
-    block_data: str
-    target: str
-    timestamp: float
-    miner_address: str
+    """An issued getwork job; slotted, since the pool holds up to max_jobs of them"""
+    __slots__ = ('job_id', 'template', 'extranonce', 'timestamp', 'miner_address', 'last_used')
+    
+    def __init__(self, job_id: str, template: JobTemplate, extranonce: int, timestamp: float,
+                 miner_address: str):
+        self.job_id = job_id
+        self.template = template
+        self.extranonce = extranonce
+        self.timestamp = timestamp
+        self.miner_address = miner_address
+        self.last_used = timestamp
+    
+    @property
+    def block_data(self) -> bytes:
+        return self.template.block_data(self.extranonce)
+
+class JobStore:
+    """Issued jobs with an idle TTL and a hard cap
+    
+    Jobs sit in an OrderedDict from least to most recently used; a lookup
+    moves the job to the end. Since every job has the same TTL, that is
+    also expiry order, so expiring pops from the front until it reaches a
+    live job (amortized O(1) per job). It runs every ``EXPIRE_EVERY``
+    inserts and from the pool's sweeper; lookups check the TTL themselves.
+    Past ``max_jobs`` the least recently used job is evicted.
+    """
+    
+    EXPIRE_EVERY = 256
+    
+    def __init__(self, ttl: float = 300.0, max_jobs: int = 100000):
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self.jobs: OrderedDict = OrderedDict()
+        self.issued = 0
+        self.expired = 0
+        self.evicted = 0
+    
+    def __len__(self) -> int:
+        return len(self.jobs)
+    
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self.jobs
+    
+    def add(self, job: MiningJob):
+        """Store a new job, expiring and evicting as needed"""
+        jobs = self.jobs
+        jobs[job.job_id] = job
+        self.issued += 1
+        if len(jobs) > self.max_jobs:
+            jobs.popitem(last=False)
+            self.evicted += 1
+        elif not self.issued % self.EXPIRE_EVERY:
+            self.expire(job.last_used)
+    
+    def get(self, job_id: str) -> Optional[MiningJob]:
+        """Look up a live job and mark it used"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        now = time.time()
+        if now - job.last_used > self.ttl:
+            del self.jobs[job_id]
+            self.expired += 1
+            return None
+        job.last_used = now
+        self.jobs.move_to_end(job_id)
+        return job
+    
+    def pop(self, job_id: str) -> Optional[MiningJob]:
+        return self.jobs.pop(job_id, None)
+    
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop jobs idle for longer than the TTL; returns how many"""
+        deadline = (now if now is not None else time.time()) - self.ttl
+        expired = 0
+        while self.jobs:
+            job = next(iter(self.jobs.values()))
+            if job.last_used >= deadline:
+                break
+            self.jobs.popitem(last=False)
+            expired += 1
+        self.expired += expired
+        return expired
+    
+    def memory_bytes(self) -> int:
+        """Estimated bytes held by the store, sizing the newest job as typical
+
+        Templates are shared between jobs and not counted per job.
+        """
+        size = sys.getsizeof(self.jobs)
+        if self.jobs:
+            job = next(reversed(self.jobs.values()))
+            per_job = sys.getsizeof(job) + sum(
+                sys.getsizeof(getattr(job, name))
+                for name in ('job_id', 'extranonce', 'timestamp', 'miner_address', 'last_used'))
+            size += per_job * len(self.jobs)
+        return size
+    
+    def metrics(self) -> Dict:
+        """Job counts and estimated memory use"""
+        return {
+            "jobs": len(self.jobs),
+            "max_jobs": self.max_jobs,
+            "ttl": self.ttl,
+            "issued": self.issued,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "memory_bytes": self.memory_bytes()
+        }
+
+def process_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, where /proc is available"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
 
 @dataclass
 class Miner:
@@ -30,78 +173,276 @@ class Miner:
     last_seen: float
     connection_id: str
 
+class EventBus:
+    """In-process publish/subscribe for pool events
+    
+    Only the latest event of each type is kept, tagged with a sequence
+    number, so publishing costs the same however many dashboards watch.
+    Readers ask for everything newer than the last sequence they saw and
+    get coalesced state instead of a backlog. Callbacks registered with
+    ``subscribe`` run synchronously on every publish.
+    """
+    
+    def __init__(self):
+        self.sequence = 0
+        self.latest: Dict[str, Tuple[int, Dict]] = {}
+        self.published: Dict[str, int] = {}
+        self.callbacks: List[Callable[[str, Dict], None]] = []
+        self._changed: Optional[asyncio.Event] = None
+    
+    def subscribe(self, callback: Callable[[str, Dict], None]):
+        """Call ``callback(event, data)`` on every publish"""
+        self.callbacks.append(callback)
+    
+    def publish(self, event: str, data: Dict):
+        """Record an event and wake anyone waiting for news"""
+        self.sequence += 1
+        self.latest[event] = (self.sequence, data)
+        self.published[event] = self.published.get(event, 0) + 1
+        for callback in self.callbacks:
+            callback(event, data)
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = None
+    
+    def since(self, sequence: int) -> Dict[str, Dict]:
+        """Latest event of each type published after ``sequence``"""
+        return {event: data for event, (seq, data) in self.latest.items() if seq > sequence}
+    
+    async def wait(self, sequence: int, timeout: Optional[float] = None) -> bool:
+        """Wait until an event newer than ``sequence`` is published"""
+        if self.sequence > sequence:
+            return True
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+class DashboardClient:
+    """A websocket viewer with a single-slot outbox
+    
+    Only the newest update waits to be sent, so a slow viewer skips
+    updates instead of buffering them.
+    """
+    
+    def __init__(self, ws: web.WebSocketResponse):
+        self.ws = ws
+        self.pending: Optional[str] = None
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.skipped = 0
+    
+    def offer(self, data: str):
+        """Queue an update, replacing one not yet sent"""
+        if self.pending is not None:
+            self.skipped += 1
+        self.pending = data
+        self.ready.set()
+    
+    async def run(self):
+        """Send queued updates until the socket closes"""
+        while not self.ws.closed:
+            await self.ready.wait()
+            self.ready.clear()
+            data, self.pending = self.pending, None
+            try:
+                await self.ws.send_str(data)
+            except ConnectionResetError:
+                return
+            self.sent += 1
+
 class RSDTMiningPool:
-    def __init__(self, pool_fee: float = 0.01):
+    def __init__(self, pool_fee: float = 0.01, network_difficulty: int = 1000000000,
+                 update_interval: float = 1.0, job_ttl: float = 300.0, max_jobs: int = 100000,
+                 sweep_interval: float = 10.0, share_difficulty: int = 1000000,
+                 longpoll_timeout: float = 60.0, max_batch: int = 1000):
         self.pool_fee = pool_fee  # 1% pool fee
         self.miners: Dict[str, Miner] = {}
-        self.current_jobs: Dict[str, MiningJob] = {}
+        self.current_jobs = JobStore(job_ttl, max_jobs)
+        self.sweep_interval = sweep_interval
+        self.max_batch = max_batch  # Shares per /submitwork/batch request
         self.block_height = 0
         self.pool_balance = 0.0
+        self.share_difficulty = share_difficulty
+        self.network_difficulty = network_difficulty
+        self._targets: Dict[int, str] = {}
+        self.network_target = int(self._calculate_target(network_difficulty), 16)
         
-    def _generate_job_id(self) -> str:
-        """Generate unique job ID"""
-        return hashlib.sha256(f"{time.time()}{len(self.current_jobs)}".encode()).hexdigest()[:16]
-    
-    def _generate_block_data(self) -> str:
-        """Generate block data for mining"""
-        # Simplified block data generation
-        # In production, this would get real block data from the blockchain
-        block_data = {
-            "height": self.block_height,
-            "timestamp": int(time.time()),
-            "previous_hash": "0000000000000000000000000000000000000000000000000000000000000000",
-            "merkle_root": hashlib.sha256(f"block_{self.block_height}".encode()).hexdigest()
-        }
-        return json.dumps(block_data)
+        # Jobs share a per-height template and differ only in a counter-based extranonce
+        self._template: Optional[JobTemplate] = None
+        self.next_job_id = 1
+        
+        # Long-polling getwork requests park here until the height changes
+        self.template_changed = asyncio.Condition()
+        self.longpoll_timeout = longpoll_timeout
+        self.longpolls_waiting = 0
+        self.longpolls_woken = 0
+        self.longpolls_timed_out = 0
+        
+        # Events for dashboards
+        self.events = EventBus()
+        self.dashboards: Set[DashboardClient] = set()
+        self.update_interval = update_interval  # Minimum seconds between websocket updates
+        self.background: List[asyncio.Task] = []
+        
+        # Running totals, kept in step with self.miners so stats are O(1)
+        self.total_hashrate = 0.0
+        self.total_shares = 0
+        self.accepted_shares = 0
+        self.blocks_found = 0
+        
+        # Serialized /stats body, rebuilt only after the totals change
+        self.stats_epoch = f"{int(time.time()):x}"
+        self.stats_version = 0
+        self._stats_cache: Optional[Tuple[int, bytes, str]] = None
+        
+    def _current_template(self) -> JobTemplate:
+        """Template for the current height, built once per height and difficulty"""
+        template = self._template
+        if (template is None or template.height != self.block_height or
+                template.difficulty != self.share_difficulty):
+            # Simplified block data generation
+            # In production, this would get real block data from the blockchain
+            template = JobTemplate(self.block_height, self.share_difficulty,
+                                   self._calculate_target(self.share_difficulty))
+            self._template = template
+        return template
     
     def _calculate_target(self, difficulty: int) -> str:
-        """Calculate mining target based on difficulty"""
-        # Simplified target calculation
-        target = (2 ** 256) // difficulty
-        return hex(target)[2:].zfill(64)
+        """Calculate mining target based on difficulty, cached per difficulty"""
+        target_hex = self._targets.get(difficulty)
+        if target_hex is None:
+            # Simplified target calculation
+            target = min((2 ** 256) // difficulty, 2 ** 256 - 1)
+            target_hex = self._targets[difficulty] = f"{target:064x}"
+        return target_hex
+    
+    async def wait_for_new_template(self, job_id: str):
+        """Park a long-poll until the height moves past the job's, or the timeout"""
+        job = self.current_jobs.get(job_id)
+        if job is None or job.template.height != self.block_height:
+            return
+        height = job.template.height
+        
+        self.longpolls_waiting += 1
+        try:
+            async with self.template_changed:
+                await asyncio.wait_for(
+                    self.template_changed.wait_for(lambda: self.block_height != height),
+                    self.longpoll_timeout
+                )
+            self.longpolls_woken += 1
+        except asyncio.TimeoutError:
+            self.longpolls_timed_out += 1
+        finally:
+            self.longpolls_waiting -= 1
     
     async def get_work(self, request):
-        """Handle getwork requests from miners"""
+        """Handle getwork requests from miners
+        
+        With ``?longpoll=<job_id>`` the reply is held until that job's
+        template is replaced (or the long-poll timeout passes), then new
+        work is returned.
+        """
         data = await request.json()
         miner_address = data.get('address')
         
         if not miner_address:
             return web.json_response({"error": "Address required"}, status=400)
         
+        longpoll = request.query.get('longpoll')
+        if longpoll:
+            await self.wait_for_new_template(longpoll)
+        
         # Register or update miner
-        if miner_address not in self.miners:
-            self.miners[miner_address] = Miner(
+        now = time.time()
+        miner = self.miners.get(miner_address)
+        if miner is None:
+            miner = Miner(
                 address=miner_address,
                 hashrate=0.0,
                 shares_submitted=0,
                 shares_accepted=0,
-                last_seen=time.time(),
+                last_seen=now,
                 connection_id=request.remote
             )
+            self.miners[miner_address] = miner
+            self.total_hashrate += miner.hashrate
+            self._stats_changed()
         else:
-            self.miners[miner_address].last_seen = time.time()
-        
-        # Generate new job
-        job_id = self._generate_job_id()
-        block_data = self._generate_block_data()
-        target = self._calculate_target(1000000)  # Simplified difficulty
-        
-        job = MiningJob(
-            job_id=job_id,
-            block_data=block_data,
-            target=target,
-            timestamp=time.time(),
-            miner_address=miner_address
-        )
+            miner.last_seen = now
         
-        self.current_jobs[job_id] = job
+        # New job: the current template plus a unique extranonce
+        template = self._current_template()
+        extranonce = self.next_job_id
+        self.next_job_id += 1
+        job_id = f"{extranonce:x}"
         
-        return web.json_response({
-            "job_id": job_id,
-            "block_data": block_data,
-            "target": target,
-            "difficulty": 1000000
-        })
+        self.current_jobs.add(MiningJob(job_id, template, extranonce, now, miner_address))
+        
+        return web.Response(body=template.render(extranonce, job_id),
+                            content_type='application/json')
+    
+    def _check_share(self, miner: Miner, job_id: str, nonce) -> Tuple[Dict, bool]:
+        """Validate one share against its job and count it
+        
+        Returns the share's result and whether it was accepted. Callers
+        publish events and invalidate stats once per request.
+        """
+        # Validate job exists and has not expired; JSON lists and objects cannot be keys
+        job = self.current_jobs.get(job_id) if isinstance(job_id, str) else None
+        if job is None:
+            return {"error": "Invalid job ID"}, False
+        
+        # Validate work (simplified)
+        if not isinstance(nonce, int) or not 0 <= nonce < 2 ** 64:
+            return {"error": "Invalid nonce"}, False
+        target = job.template.target
+        
+        # Recreate hash: block data with the 8-byte nonce appended, as the miner hashes it
+        block_with_nonce = job.block_data + struct.pack('<Q', nonce)
+        calculated_hash = hashlib.sha256(block_with_nonce).hexdigest()
+        hash_int = int(calculated_hash, 16)
+        
+        # Check if work is valid
+        self.total_shares += 1
+        miner.shares_submitted += 1
+        if hash_int >= target:
+            return {"accepted": False, "message": "Share rejected - does not meet target"}, False
+        
+        miner.shares_accepted += 1
+        self.accepted_shares += 1
+        
+        # Calculate reward (simplified)
+        reward = 0.001  # 0.001 RSDT per share
+        self.pool_balance += reward
+        
+        # Remove completed job
+        self.current_jobs.pop(job_id)
+        
+        if hash_int < self.network_target:
+            self._block_found(miner.address, calculated_hash)
+        return {"accepted": True, "reward": reward, "message": "Share accepted!"}, True
+    
+    async def _shares_counted(self, miner: Miner, accepted: int, height: int):
+        """Publish the outcome of a submit request; ``height`` is the height before it"""
+        self._stats_changed()
+        if accepted:
+            self.events.publish("share_accepted", {
+                "miner": miner.address,
+                "shares": accepted,
+                "shares_accepted": miner.shares_accepted,
+                "total_shares": self.total_shares,
+                "accepted_shares": self.accepted_shares,
+                "pool_balance": self.pool_balance,
+                "timestamp": time.time()
+            })
+        if self.block_height != height:
+            async with self.template_changed:
+                self.template_changed.notify_all()
     
     async def submit_work(self, request):
         """Handle work submission from miners"""
@@ -111,73 +452,194 @@ class RSDTMiningPool:
         hash_result = data.get('hash')
         miner_address = data.get('address')
         
-        if not all([job_id, nonce, hash_result, miner_address]):
+        if not all([job_id, hash_result, miner_address]) or nonce is None:
             return web.json_response({"error": "Missing required fields"}, status=400)
         
-        # Validate job exists
-        if job_id not in self.current_jobs:
-            return web.json_response({"error": "Invalid job ID"}, status=400)
-        
-        job = self.current_jobs[job_id]
-        
         # Validate miner
-        if miner_address not in self.miners:
+        miner = self.miners.get(miner_address)
+        if miner is None:
             return web.json_response({"error": "Unknown miner"}, status=400)
         
-        miner = self.miners[miner_address]
+        height = self.block_height
+        result, accepted = self._check_share(miner, job_id, nonce)
+        if "error" in result:
+            return web.json_response(result, status=400)
         
-        # Validate work (simplified)
-        block_data = job.block_data
-        target = int(job.target, 16)
+        await self._shares_counted(miner, int(accepted), height)
+        return web.json_response(result)
+    
+    async def submit_work_batch(self, request):
+        """Handle a batch of shares: {"address": ..., "shares": [[job_id, nonce, hash], ...]}
         
-        # Recreate hash
-        block_with_nonce = block_data + str(nonce)
-        calculated_hash = hashlib.sha256(block_with_nonce.encode()).hexdigest()
-        hash_int = int(calculated_hash, 16)
+        Shares are checked in order and answered in one response, with a
+        result per share in the same order.
+        """
+        data = await request.json()
+        miner_address = data.get('address')
+        shares = data.get('shares')
         
-        # Check if work is valid
-        if hash_int < target:
-            miner.shares_accepted += 1
-            miner.shares_submitted += 1
-            
-            # Calculate reward (simplified)
-            reward = 0.001  # 0.001 RSDT per share
-            self.pool_balance += reward
-            
-            # Remove completed job
-            del self.current_jobs[job_id]
-            
-            return web.json_response({
-                "accepted": True,
-                "reward": reward,
-                "message": "Share accepted!"
-            })
-        else:
-            miner.shares_submitted += 1
-            return web.json_response({
-                "accepted": False,
-                "message": "Share rejected - does not meet target"
-            })
-    
-    async def get_stats(self, request):
-        """Get pool statistics"""
-        total_miners = len(self.miners)
-        total_hashrate = sum(miner.hashrate for miner in self.miners.values())
-        total_shares = sum(miner.shares_submitted for miner in self.miners.values())
-        accepted_shares = sum(miner.shares_accepted for miner in self.miners.values())
+        if not miner_address or not isinstance(shares, list) or not shares:
+            return web.json_response({"error": "Missing required fields"}, status=400)
+        if len(shares) > self.max_batch:
+            return web.json_response({"error": f"At most {self.max_batch} shares per batch"},
+                                     status=400)
+        
+        # Validate miner
+        miner = self.miners.get(miner_address)
+        if miner is None:
+            return web.json_response({"error": "Unknown miner"}, status=400)
         
+        height = self.block_height
+        results = []
+        accepted = 0
+        for share in shares:
+            if not isinstance(share, list) or len(share) != 3 or not isinstance(share[0], str):
+                results.append({"error": "Malformed share"})
+                continue
+            result, ok = self._check_share(miner, share[0], share[1])
+            results.append(result)
+            accepted += ok
+        
+        await self._shares_counted(miner, accepted, height)
         return web.json_response({
+            "accepted": accepted,
+            "rejected": len(results) - accepted,
+            "results": results
+        })
+    
+    def _block_found(self, miner_address: str, block_hash: str):
+        """Advance to the next height after a share meets the network target"""
+        self.blocks_found += 1
+        self.events.publish("block_found", {
+            "height": self.block_height,
+            "hash": block_hash,
+            "miner": miner_address,
+            "blocks_found": self.blocks_found,
+            "timestamp": time.time()
+        })
+        self.block_height += 1
+        self._stats_changed()
+        self.events.publish("job_changed", {
+            "height": self.block_height,
+            "network_difficulty": self.network_difficulty,
+            "timestamp": time.time()
+        })
+    
+    def _stats_changed(self):
+        """Invalidate the cached /stats body"""
+        self.stats_version += 1
+    
+    def pool_stats(self) -> Dict:
+        """Pool-wide statistics from the running totals"""
+        total_shares = self.total_shares
+        accepted_shares = self.accepted_shares
+        
+        return {
             "pool_name": "RSDT Mining Pool",
-            "total_miners": total_miners,
-            "total_hashrate": total_hashrate,
+            "total_miners": len(self.miners),
+            "total_hashrate": self.total_hashrate,
             "total_shares": total_shares,
             "accepted_shares": accepted_shares,
             "acceptance_rate": (accepted_shares / total_shares * 100) if total_shares > 0 else 0,
             "pool_balance": self.pool_balance,
             "pool_fee": self.pool_fee,
             "current_height": self.block_height
+        }
+    
+    def cached_stats(self) -> Tuple[bytes, str]:
+        """Serialized pool statistics and their ETag"""
+        cache = self._stats_cache
+        if cache is None or cache[0] != self.stats_version:
+            body = json.dumps(self.pool_stats()).encode()
+            cache = (self.stats_version, body, f'"{self.stats_epoch}-{self.stats_version}"')
+            self._stats_cache = cache
+        return cache[1], cache[2]
+    
+    async def get_stats(self, request):
+        """Get pool statistics"""
+        body, etag = self.cached_stats()
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        
+        # Unchanged stats cost a header comparison
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and (if_none_match.strip() == '*' or
+                              etag in (tag.strip().removeprefix('W/') for tag in if_none_match.split(','))):
+            return web.Response(status=304, headers=headers)
+        
+        return web.Response(body=body, content_type='application/json', headers=headers)
+    
+    def _dashboard_update(self, since: int) -> str:
+        """Serialized update with the events after ``since`` and current stats"""
+        return json.dumps({
+            "sequence": self.events.sequence,
+            "events": self.events.since(since),
+            "stats": self.pool_stats()
+        })
+    
+    async def stream_stats(self, request):
+        """Websocket feed of pool events for dashboards"""
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        
+        client = DashboardClient(ws)
+        client.offer(self._dashboard_update(0))
+        self.dashboards.add(client)
+        sender = asyncio.create_task(client.run())
+        try:
+            # Viewers only listen; reading processes pings and the close handshake
+            async for _ in ws:
+                pass
+        finally:
+            self.dashboards.discard(client)
+            sender.cancel()
+        return ws
+    
+    async def broadcast_updates(self):
+        """Fan coalesced events out to dashboards, at most once per update interval"""
+        sent = self.events.sequence
+        while True:
+            await self.events.wait(sent)
+            if self.dashboards:
+                # Serialized once, shared by every viewer
+                data = self._dashboard_update(sent)
+                for client in self.dashboards:
+                    client.offer(data)
+            sent = self.events.sequence
+            await asyncio.sleep(self.update_interval)
+    
+    async def sweep_jobs(self):
+        """Expire idle jobs even when no new work is being handed out"""
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.current_jobs.expire()
+    
+    async def get_metrics(self, request):
+        """Get job store, memory and event metrics"""
+        return web.json_response({
+            "job_store": self.current_jobs.metrics(),
+            "miners": len(self.miners),
+            "process_rss_bytes": process_rss_bytes(),
+            "events_published": dict(self.events.published),
+            "dashboards": len(self.dashboards),
+            "longpolls": {
+                "waiting": self.longpolls_waiting,
+                "woken": self.longpolls_woken,
+                "timed_out": self.longpolls_timed_out
+            }
         })
     
+    async def start_background(self, app):
+        """Start background tasks with the web app"""
+        self.background.append(asyncio.create_task(self.broadcast_updates()))
+        self.background.append(asyncio.create_task(self.sweep_jobs()))
+    
+    async def stop_background(self, app):
+        """Stop background tasks and close dashboard sockets"""
+        for task in self.background:
+            task.cancel()
+        for client in list(self.dashboards):
+            await client.ws.close(code=WSCloseCode.GOING_AWAY, message=b'Server shutdown')
+    
     async def get_miner_stats(self, request):
         """Get individual miner statistics"""
         miner_address = request.match_info.get('address')
@@ -197,12 +659,12 @@ class RSDTMiningPool:
             "estimated_earnings": miner.shares_accepted * 0.001
         })
 
-def create_app():
+def create_app(**pool_options):
     """Create web application"""
     app = web.Application()
     
     # Create pool instance
-    pool = RSDTMiningPool()
+    pool = RSDTMiningPool(**pool_options)
     
     # Setup CORS
     cors = aiohttp_cors.setup(app, defaults={
@@ -217,8 +679,14 @@ def create_app():
     # Add routes
     app.router.add_post('/getwork', pool.get_work)
     app.router.add_post('/submitwork', pool.submit_work)
+    app.router.add_post('/submitwork/batch', pool.submit_work_batch)
     app.router.add_get('/stats', pool.get_stats)
     app.router.add_get('/miner/{address}', pool.get_miner_stats)
+    app.router.add_get('/ws', pool.stream_stats)
+    app.router.add_get('/metrics', pool.get_metrics)
+    
+    app.on_startup.append(pool.start_background)
+    app.on_shutdown.append(pool.stop_background)
     
     # Add CORS to all routes
     for route in list(app.router.routes()):
@@ -239,10 +707,13 @@ async def main():
     
     print("RSDT Mining Pool started on http://0.0.0.0:18090")
     print("API endpoints:")
-    print("  POST /getwork - Get mining work")
+    print("  POST /getwork - Get mining work (?longpoll=<job_id> waits for a new block)")
     print("  POST /submitwork - Submit completed work")
+    print("  POST /submitwork/batch - Submit several shares in one request")
     print("  GET /stats - Get pool statistics")
     print("  GET /miner/{address} - Get miner statistics")
+    print("  GET /ws - Stream pool events (websocket)")
+    print("  GET /metrics - Job store and memory metrics")
     
     # Keep server running
     try:
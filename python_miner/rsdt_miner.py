@@ -4,37 +4,492 @@
 # All rights reserved.
 
 import argparse
+import math
+import multiprocessing
+import multiprocessing.connection
+import queue
+import signal
 import time
 import threading
 import requests
 import json
 import hashlib
+import os
 import struct
-from typing import Optional, Dict, Any
+import sys
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from rsdt_stratum_client import StratumClientThread, is_stratum_url
+
+class NonceScanner:
+    """Batch hashing kernel for one job
+    
+    Getwork jobs hash SHA-256 over block data with an 8-byte
+    little-endian nonce appended; Stratum jobs (``stratum=True``) hash
+    double SHA-256 over the 76-byte header prefix and a 4-byte nonce.
+    Whole 64-byte blocks of the block data are hashed once and each nonce
+    starts from a ``.copy()`` of that state; the remaining bytes sit in a
+    reusable bytearray whose nonce field is patched in place. Digests are
+    compared as bytes with the target, so a batch allocates only the
+    digests themselves.
+    """
+    
+    def __init__(self, block_data: bytes, target: int, stratum: bool = False):
+        # This is a simplified mining implementation
+        # In production, you'd use the actual RandomX library
+        self.stratum = stratum
+        nonce_size = 4 if stratum else 8
+        self.nonce_limit = 1 << (8 * nonce_size)
+        prefix_len = len(block_data) - len(block_data) % 64
+        self.prefix = hashlib.sha256(block_data[:prefix_len])
+        self.tail = bytearray(block_data[prefix_len:] + bytes(nonce_size))
+        self.nonce_offset = len(self.tail) - nonce_size
+        # Every hash meets a target past the 256-bit range
+        self.target = target.to_bytes(32, 'big') if target < 1 << 256 else None
+    
+    def scan(self, start: int, count: int) -> List[Tuple[int, str]]:
+        """Hash ``count`` nonces from ``start`` and return the (nonce, hash) pairs below target"""
+        if self.stratum:
+            return self._scan_double(start, count)
+        tail = self.tail
+        offset = self.nonce_offset
+        target = self.target
+        copy = self.prefix.copy
+        pack_into = struct.pack_into
+        found = []
+        for nonce in range(start, start + count):
+            pack_into('<Q', tail, offset, nonce)
+            state = copy()
+            state.update(tail)
+            digest = state.digest()
+            if target is None or digest < target:
+                found.append((nonce, digest.hex()))
+        return found
+    
+    def _scan_double(self, start: int, count: int) -> List[Tuple[int, str]]:
+        """Stratum pool hash; the digest is a little-endian number, so it is compared reversed"""
+        tail = self.tail
+        offset = self.nonce_offset
+        target = self.target
+        copy = self.prefix.copy
+        pack_into = struct.pack_into
+        sha256 = hashlib.sha256
+        found = []
+        for nonce in range(start, start + count):
+            pack_into('<I', tail, offset, nonce)
+            state = copy()
+            state.update(tail)
+            digest = sha256(state.digest()).digest()
+            if target is None or digest[::-1] < target:
+                found.append((nonce, digest.hex()))
+        return found
+
+def hash_worker(index: int, jobs: multiprocessing.connection.Connection, generation,
+                next_nonce, hash_counts, share_counts, results, chunk: int, batch: int):
+    """Hashing process: scan nonce ranges claimed from the engine until told to stop
+    
+    Ranges are claimed under the lock that also guards ``generation``, so a
+    claim always belongs to a known job. Hashes done and shares found are
+    added to this process's own slot in ``hash_counts`` and
+    ``share_counts``, which nobody else writes.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    job = None
+    scanner_generation = None
+    while True:
+        # Pick up the newest job. A job can arrive before set_job publishes
+        # its generation; claiming a range below waits on set_job's lock.
+        if job is None or job[0] < generation.value:
+            job = jobs.recv()
+            while job is not None and jobs.poll():
+                job = jobs.recv()
+            if job is None:
+                return
+            continue
+        job_generation, job_id, block_data, target, stratum = job
+        if scanner_generation != job_generation:
+            scanner = NonceScanner(block_data, target, stratum)
+            scanner_generation = job_generation
+        
+        with next_nonce.get_lock():
+            if generation.value != job_generation:
+                continue
+            start = next_nonce.value
+            next_nonce.value += chunk
+        if start >= scanner.nonce_limit:
+            # Nonce space used up (chunks divide it evenly); wait for the next job
+            job = None
+            continue
+        
+        for offset in range(0, chunk, batch):
+            if generation.value != job_generation:
+                break
+            found = scanner.scan(start + offset, batch)
+            for nonce, hash_result in found:
+                results.put((job_generation, job_id, nonce, hash_result))
+            hash_counts[index] += batch
+            share_counts[index] += len(found)
+
+class HashEngine:
+    """Multiprocess hashing backend, one process per hashing core
+    
+    The coordinator (this object, in the miner process) sends each job to
+    every process over its own pipe and bumps ``generation``; processes
+    switch jobs between batches. Nonces are handed out in disjoint
+    ``chunk``-sized ranges from a shared counter, so no two processes hash
+    the same nonce. Found shares come back on a queue, hash and share
+    counts through shared per-process counter arrays.
+    """
+    
+    NONCE_CHUNK = 1 << 16
+    BATCH = 4096
+    
+    def __init__(self, processes: int):
+        self.processes = processes
+        self.generation = multiprocessing.Value('Q', 0, lock=False)
+        self.next_nonce = multiprocessing.Value('Q', 0)
+        self.hash_counts = multiprocessing.Array('Q', processes, lock=False)
+        self.share_counts = multiprocessing.Array('Q', processes, lock=False)
+        self.results: multiprocessing.Queue = multiprocessing.Queue()
+        self.pipes: List[multiprocessing.connection.Connection] = []
+        self.workers: List[multiprocessing.Process] = []
+        self.job_ids: Dict[int, str] = {}
+    
+    def start(self):
+        for index in range(self.processes):
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            worker = multiprocessing.Process(
+                target=hash_worker, name=f"rsdt-hash-{index}", daemon=True,
+                args=(index, receiver, self.generation, self.next_nonce, self.hash_counts,
+                      self.share_counts, self.results, self.NONCE_CHUNK, self.BATCH))
+            worker.start()
+            self.pipes.append(sender)
+            self.workers.append(worker)
+    
+    def set_job(self, job_id: str, block_data: bytes, target: int, stratum: bool = False):
+        """Replace the job in every process and restart the nonce ranges"""
+        with self.next_nonce.get_lock():
+            job_generation = self.generation.value + 1
+            # Jobs are in the pipes before the new generation is visible
+            for pipe in self.pipes:
+                pipe.send((job_generation, job_id, block_data, target, stratum))
+            self.next_nonce.value = 0
+            self.generation.value = job_generation
+    
+    def next_result(self, timeout: float) -> Optional[Tuple[str, int, str]]:
+        """Next share for the current job, or None after ``timeout`` seconds"""
+        deadline = time.time() + timeout
+        while True:
+            try:
+                job_generation, job_id, nonce, hash_result = self.results.get(
+                    timeout=max(0.0, deadline - time.time()))
+            except queue.Empty:
+                return None
+            if job_generation == self.generation.value:
+                return job_id, nonce, hash_result
+    
+    def total_hashes(self) -> int:
+        return sum(self.hash_counts)
+    
+    def worker_counts(self) -> List[Tuple[int, int]]:
+        """(hashes, shares found) per process, read without locking"""
+        return list(zip(self.hash_counts[:], self.share_counts[:]))
+    
+    def stop(self):
+        """Tell every process to exit and wait for them"""
+        for pipe in self.pipes:
+            try:
+                pipe.send(None)
+            except OSError:
+                pass
+        for worker in self.workers:
+            worker.join(timeout=2)
+            if worker.is_alive():
+                worker.terminate()
+        self.pipes.clear()
+        self.workers.clear()
+
+class RateMeter:
+    """Exponentially weighted rates of a monotonic counter
+    
+    ``update`` is called with the counter's running total at irregular
+    times; each window's rate decays toward the rate since the previous
+    update with weight ``1 - exp(-elapsed / window)``, so a 60 s rate
+    reflects roughly the last minute whatever the sampling interval.
+    
+    The averages start at zero, so until a window has filled each rate is
+    divided by the weight it has gathered, ``1 - exp(-span / window)``,
+    which makes it the weighted average over the time measured so far.
+    """
+    
+    WINDOWS = (("10s", 10.0), ("60s", 60.0), ("15m", 900.0))
+    
+    def __init__(self):
+        self.total = 0
+        self.first_time: Optional[float] = None
+        self.last_time: Optional[float] = None
+        self.rates = {name: 0.0 for name, _ in self.WINDOWS}
+    
+    def update(self, total: int, now: float):
+        if self.last_time is None:
+            self.first_time = now
+        elif now > self.last_time:
+            elapsed = now - self.last_time
+            instant = (total - self.total) / elapsed
+            for name, window in self.WINDOWS:
+                alpha = 1.0 - math.exp(-elapsed / window)
+                self.rates[name] += alpha * (instant - self.rates[name])
+        self.total = total
+        self.last_time = now
+    
+    def snapshot(self) -> Dict[str, Any]:
+        span = (self.last_time - self.first_time) if self.last_time is not None else 0.0
+        rates = {}
+        for name, window in self.WINDOWS:
+            weight = 1.0 - math.exp(-span / window)
+            rates[name] = round(self.rates[name] / weight, 2) if weight > 0 else 0.0
+        return {"total": self.total, **rates}
+
+class MinerStats:
+    """Aggregates the engine's per-process counters into rates
+    
+    Only the status reporter thread calls ``sample``; hashing processes
+    write their own counter slots and the share submitter owns the share
+    counts, so nothing here needs a lock. ``snapshot`` is what the stats
+    file and the stats endpoint serve.
+    """
+    
+    def __init__(self, miner: 'RSDTMiner'):
+        self.miner = miner
+        self.started = time.time()
+        self.hashrate = RateMeter()
+        self.workers = [(RateMeter(), RateMeter()) for _ in range(miner.threads)]
+        self.latest: Dict[str, Any] = {}
+    
+    def sample(self) -> Dict[str, Any]:
+        miner = self.miner
+        now = time.time()
+        counts = miner.engine.worker_counts()
+        self.hashrate.update(sum(hashes for hashes, _ in counts), now)
+        workers = []
+        for index, ((hashes, found), (hash_meter, share_meter)) in enumerate(zip(counts, self.workers)):
+            hash_meter.update(hashes, now)
+            share_meter.update(found, now)
+            workers.append({"worker": index, "hashes": hash_meter.snapshot(),
+                            "shares_found": share_meter.snapshot()})
+        
+        submitter = miner.submitter
+        self.latest = {
+            "address": miner.address,
+            "pool": miner.pool_url,
+            "timestamp": now,
+            "uptime": round(now - self.started, 1),
+            "hashrate": self.hashrate.snapshot(),
+            "shares": {"found": sum(found for _, found in counts),
+                       "submitted": submitter.submitted,
+                       "accepted": submitter.accepted,
+                       "rejected": submitter.submitted - submitter.accepted,
+                       "batches": submitter.batches},
+            "stale_restarts": miner.stale_restarts,
+            "workers": workers
+        }
+        return self.latest
+    
+    def write(self, path: str):
+        """Replace ``path`` atomically with the latest snapshot"""
+        temp = f"{path}.tmp"
+        with open(temp, 'w') as f:
+            json.dump(self.latest, f, indent=2)
+        os.replace(temp, path)
+    
+    def serve(self, port: int) -> ThreadingHTTPServer:
+        """Serve the latest snapshot as JSON on ``GET /stats`` from a daemon thread"""
+        stats = self
+        
+        class StatsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip('/') not in ('', '/stats'):
+                    self.send_error(404)
+                    return
+                body = json.dumps(stats.latest).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer(('0.0.0.0', port), StatsHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        return server
+
+class ShareSubmitter:
+    """Background thread that sends found shares to the pool in batches
+    
+    Shares queued within ``window`` seconds of the first one go out
+    together in a single /submitwork/batch request over a kept-alive
+    connection. Pools without the batch endpoint get one /submitwork
+    request per share. The share counters are only written by this
+    submitter's thread.
+    """
+    
+    def __init__(self, miner: 'RSDTMiner', window: float = 0.05, max_batch: int = 256):
+        self.miner = miner
+        self.window = window
+        self.max_batch = max_batch
+        self.queue: queue.Queue = queue.Queue()
+        self.session = requests.Session()
+        self.batch_supported = True
+        self.batches = 0
+        self.submitted = 0
+        self.accepted = 0
+    
+    def submit(self, job_id: str, nonce: int, hash_result: str):
+        """Queue a share; returns immediately"""
+        self.queue.put((job_id, nonce, hash_result))
+    
+    def run(self):
+        """Collect shares into batches until mining stops and the queue is empty"""
+        while self.miner.is_mining or not self.queue.empty():
+            try:
+                batch = [self.queue.get(timeout=1)]
+            except queue.Empty:
+                continue
+            
+            deadline = time.time() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.time()
+                try:
+                    batch.append(self.queue.get(timeout=remaining) if remaining > 0
+                                 else self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._send(batch)
+    
+    def _post_batch(self, batch: List[Tuple[str, int, str]]) -> Optional[List[bool]]:
+        """Submit a batch; None if the pool has no batch endpoint"""
+        try:
+            response = self.session.post(f"{self.miner.pool_url}/submitwork/batch",
+                                         json={"address": self.miner.address,
+                                               "shares": [list(share) for share in batch]},
+                                         timeout=10)
+            if response.status_code in (404, 405):
+                print("Pool does not support batched submits, sending shares one by one")
+                self.batch_supported = False
+                return None
+            if response.status_code == 200:
+                return [result.get("accepted", False) for result in response.json()["results"]]
+            print(f"Batch submit failed: {response.text}")
+        except Exception as e:
+            print(f"Error submitting work: {e}")
+        return [False] * len(batch)
+    
+    def _send(self, batch: List[Tuple[str, int, str]]):
+        results = self._post_batch(batch) if self.batch_supported else None
+        if results is None:
+            results = [self.miner._submit_work_to_pool(*share) for share in batch]
+        self.batches += 1
+        
+        for (job_id, nonce, hash_result), accepted in zip(batch, results):
+            self.submitted += 1
+            if accepted:
+                self.accepted += 1
+                print(f"Share accepted! Nonce: {nonce}, Hash: {hash_result[:16]}...")
+            else:
+                print(f"Share rejected. Nonce: {nonce}")
+        
+        # Calculate earnings (simplified)
+        earnings = self.accepted * 0.001  # 0.001 RSDT per share
+        print(f"Earnings: {earnings:.6f} RSDT")
+
+class StratumSubmitter:
+    """Share submission over the miner's Stratum connection
+    
+    Each share is written to the pool as soon as it is found and the
+    reply is matched by request id, so many shares can be in flight on
+    the one connection and nothing needs batching. Replies are counted on
+    the Stratum client's thread, the only writer of the share counters.
+    """
+    
+    def __init__(self, miner: 'RSDTMiner', client: StratumClientThread):
+        self.miner = miner
+        self.client = client
+        self.batches = 0  # Shares are pipelined, never batched
+        self.submitted = 0
+        self.accepted = 0
+    
+    def submit(self, job_id: str, nonce: int, hash_result: str):
+        """Send a share; returns immediately"""
+        reply = self.client.submit(job_id, nonce)
+        reply.add_done_callback(lambda reply: self._result(reply, nonce, hash_result))
+    
+    def _result(self, reply: Future, nonce: int, hash_result: str):
+        self.submitted += 1
+        if not reply.cancelled() and reply.exception() is None and reply.result():
+            self.accepted += 1
+            print(f"Share accepted! Nonce: {nonce}, Hash: {hash_result[:16]}...")
+        else:
+            print(f"Share rejected. Nonce: {nonce}")
 
 class RSDTMiner:
-    def __init__(self, address: str, pool_url: str, threads: int = 0):
+    LONGPOLL_TIMEOUT = 90  # Longer than the pool holds a long-poll
+    
+    STATS_INTERVAL = 5  # Seconds between counter samples
+    REPORT_INTERVAL = 30  # Seconds between printed status reports
+    
+    def __init__(self, address: str, pool_url: str, threads: int = 0, longpoll: bool = True,
+                 batch_window: float = 0.05, stats_file: Optional[str] = None,
+                 stats_port: Optional[int] = None, worker: str = 'default'):
         self.address = address
         self.pool_url = pool_url
         self.threads = threads or self._get_optimal_threads()
+        self.engine = HashEngine(self.threads)
+        self.longpoll = longpoll
         self.is_mining = False
         self.current_job = None
+        self.work_generation = 0  # Bumped when the pool moves to a new block
+        self.stale_restarts = 0
+        # stratum+tcp:// pools push jobs over one persistent connection
+        self.stratum: Optional[StratumClientThread] = None
+        if is_stratum_url(pool_url):
+            self.stratum = StratumClientThread(pool_url, address, worker,
+                                               on_job=self._stratum_job)
+            self.submitter = StratumSubmitter(self, self.stratum)
+        else:
+            self.submitter = ShareSubmitter(self, window=batch_window)
+        self.stats = MinerStats(self)
+        self.stats_file = stats_file
+        self.stats_port = stats_port
+        self.stats_server: Optional[ThreadingHTTPServer] = None
         self.hashrate = 0
-        self.shares_submitted = 0
-        self.shares_accepted = 0
+    
+    @property
+    def shares_submitted(self) -> int:
+        return self.submitter.submitted
+    
+    @property
+    def shares_accepted(self) -> int:
+        return self.submitter.accepted
         
     def _get_optimal_threads(self) -> int:
-        """Get optimal number of threads based on CPU cores"""
-        import multiprocessing
+        """Get optimal number of hashing processes based on CPU cores"""
         cores = multiprocessing.cpu_count()
         return max(1, cores - 1)  # Leave one core free
     
-    def _get_work_from_pool(self) -> Optional[Dict[str, Any]]:
-        """Get mining work from pool"""
+    def _get_work_from_pool(self, longpoll_job: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get mining work from pool, or wait for the block after ``longpoll_job``"""
         try:
             response = requests.post(f"{self.pool_url}/getwork", 
                                    json={"address": self.address}, 
-                                   timeout=10)
+                                   params={"longpoll": longpoll_job} if longpoll_job else None,
+                                   timeout=self.LONGPOLL_TIMEOUT if longpoll_job else 10)
             if response.status_code == 200:
                 return response.json()
         except Exception as e:
@@ -59,85 +514,104 @@ class RSDTMiner:
             print(f"Error submitting work: {e}")
         return False
     
-    def _mine_block(self, block_data: bytes, target: int) -> tuple:
-        """Mine a block using RandomX algorithm"""
-        # This is a simplified mining implementation
-        # In production, you'd use the actual RandomX library
-        
-        nonce = 0
-        start_time = time.time()
-        
-        while self.is_mining:
-            # Create block with nonce
-            block_with_nonce = block_data + struct.pack('<Q', nonce)
-            
-            # Calculate hash (simplified - use actual RandomX in production)
-            hash_result = hashlib.sha256(block_with_nonce).hexdigest()
-            hash_int = int(hash_result, 16)
-            
-            # Check if hash meets target
-            if hash_int < target:
-                return nonce, hash_result, time.time() - start_time
-            
-            nonce += 1
-            
-            # Update hashrate every 1000 attempts
-            if nonce % 1000 == 0:
-                elapsed = time.time() - start_time
-                if elapsed > 0:
-                    self.hashrate = nonce / elapsed
-        
-        return None, None, 0
-    
-    def _mining_worker(self, worker_id: int):
-        """Mining worker thread"""
-        print(f"Worker {worker_id} started")
-        
+    def _mining_coordinator(self):
+        """Feed pool jobs to the hashing engine and hand its shares to the submitter"""
         while self.is_mining:
             # Get work from pool
+            generation = self.work_generation
             job = self._get_work_from_pool()
             if not job:
                 time.sleep(5)
                 continue
             
             self.current_job = job
-            block_data = bytes.fromhex(job['block_data'])
-            target = int(job['target'], 16)
+            self.engine.set_job(job['job_id'], bytes.fromhex(job['block_data']),
+                                int(job['target'], 16))
             
-            # Mine the block
-            nonce, hash_result, mining_time = self._mine_block(block_data, target)
+            # Mine until a share turns up or the pool moves to a new block
+            while self.is_mining and self.work_generation == generation:
+                found = self.engine.next_result(timeout=0.5)
+                if found:
+                    # Submit work to pool; the submitter batches and counts it.
+                    # The pool retires a job once it has a share, so fetch the next one.
+                    self.submitter.submit(*found)
+                    break
+    
+    def _stratum_job(self, job: Dict[str, Any]):
+        """Take a job pushed by a Stratum pool; runs on the Stratum client's thread"""
+        previous = self.current_job
+        self.current_job = job
+        if previous and job.get('height') != previous.get('height'):
+            self.stale_restarts += 1
+            print(f"New block at height {job.get('height')}, restarting workers")
+        self.work_generation += 1
+    
+    def _stratum_coordinator(self):
+        """Hand each job the pool pushes to the hashing engine and stream its shares back"""
+        generation = 0
+        while self.is_mining:
+            if self.work_generation != generation:
+                generation = self.work_generation
+                job = self.current_job
+                # The pool reads the hash and target as little-endian numbers
+                self.engine.set_job(job['job_id'], bytes.fromhex(job['blob'])[:76],
+                                    int.from_bytes(bytes.fromhex(job['target']), 'little'),
+                                    stratum=True)
             
-            if nonce is not None and self.is_mining:
-                # Submit work to pool
-                accepted = self._submit_work_to_pool(job['job_id'], nonce, hash_result)
-                
-                self.shares_submitted += 1
-                if accepted:
-                    self.shares_accepted += 1
-                    print(f"Share accepted! Nonce: {nonce}, Hash: {hash_result[:16]}...")
-                else:
-                    print(f"Share rejected. Nonce: {nonce}")
-                
-                # Calculate earnings (simplified)
-                earnings = self.shares_accepted * 0.001  # 0.001 RSDT per share
-                print(f"Earnings: {earnings:.6f} RSDT")
+            found = self.engine.next_result(timeout=0.5)
+            if found:
+                self.submitter.submit(*found)
+    
+    def _longpoll_worker(self):
+        """Hold a long-poll open on the pool and restart workers on a new block"""
+        while self.is_mining:
+            job = self.current_job
+            if not job:
+                time.sleep(1)
+                continue
+            
+            new_job = self._get_work_from_pool(longpoll_job=job['job_id'])
+            if not new_job:
+                time.sleep(5)
+                continue
+            
+            # A timed-out long-poll returns work for the same height
+            if new_job.get('height') != job.get('height'):
+                self.work_generation += 1
+                self.stale_restarts += 1
+                print(f"New block at height {new_job.get('height')}, restarting workers")
+            self.current_job = new_job
     
     def start_mining(self):
         """Start mining"""
         print(f"Starting RSDT miner...")
         print(f"Address: {self.address}")
         print(f"Pool: {self.pool_url}")
-        print(f"Threads: {self.threads}")
+        print(f"Hashing processes: {self.threads}")
+        if self.stats_port:
+            self.stats_server = self.stats.serve(self.stats_port)
+            print(f"Stats: http://localhost:{self.stats_port}/stats")
         
         self.is_mining = True
         
-        # Start worker threads
-        threads = []
-        for i in range(self.threads):
-            thread = threading.Thread(target=self._mining_worker, args=(i,))
-            thread.daemon = True
-            thread.start()
-            threads.append(thread)
+        # Start hashing processes and the thread that feeds them
+        self.engine.start()
+        if self.stratum:
+            self.stratum.start()
+        coordinator_thread = threading.Thread(
+            target=self._stratum_coordinator if self.stratum else self._mining_coordinator)
+        coordinator_thread.daemon = True
+        coordinator_thread.start()
+        
+        if not self.stratum:
+            submitter_thread = threading.Thread(target=self.submitter.run)
+            submitter_thread.daemon = True
+            submitter_thread.start()
+        
+        if self.longpoll and not self.stratum:
+            longpoll_thread = threading.Thread(target=self._longpoll_worker)
+            longpoll_thread.daemon = True
+            longpoll_thread.start()
         
         # Status reporting thread
         status_thread = threading.Thread(target=self._status_reporter)
@@ -155,28 +629,58 @@ class RSDTMiner:
     def stop_mining(self):
         """Stop mining"""
         self.is_mining = False
+        self.engine.stop()
+        if self.stratum:
+            self.stratum.stop()
+        if self.stats_server:
+            self.stats_server.shutdown()
+            self.stats_server = None
         print("Miner stopped")
     
     def _status_reporter(self):
-        """Report mining status"""
+        """Sample the engine's counters and report mining status"""
+        last_report = time.time()
+        self.stats.sample()
         while self.is_mining:
-            time.sleep(30)  # Report every 30 seconds
-            if self.is_mining:
-                print(f"\n--- Mining Status ---")
-                print(f"Hashrate: {self.hashrate:.2f} H/s")
-                print(f"Shares submitted: {self.shares_submitted}")
-                print(f"Shares accepted: {self.shares_accepted}")
-                if self.shares_submitted > 0:
-                    acceptance_rate = (self.shares_accepted / self.shares_submitted) * 100
-                    print(f"Acceptance rate: {acceptance_rate:.2f}%")
-                print(f"Earnings: {self.shares_accepted * 0.001:.6f} RSDT")
-                print("-------------------\n")
+            time.sleep(self.STATS_INTERVAL)
+            stats = self.stats.sample()
+            self.hashrate = stats["hashrate"]["60s"]
+            if self.stats_file:
+                try:
+                    self.stats.write(self.stats_file)
+                except OSError as e:
+                    print(f"Error writing stats file: {e}")
+            if not self.is_mining or time.time() - last_report < self.REPORT_INTERVAL:
+                continue
+            last_report = time.time()
+            hashrate, shares = stats["hashrate"], stats["shares"]
+            print(f"\n--- Mining Status ---")
+            print(f"Hashrate: {hashrate['10s']:.2f} H/s (10s) {hashrate['60s']:.2f} H/s (60s) "
+                  f"{hashrate['15m']:.2f} H/s (15m)")
+            for worker in stats["workers"]:
+                print(f"  Process {worker['worker']}: {worker['hashes']['60s']:.2f} H/s, "
+                      f"{worker['shares_found']['total']} shares found")
+            print(f"Shares submitted: {shares['submitted']}")
+            print(f"Shares accepted: {shares['accepted']}")
+            print(f"Stale restarts: {self.stale_restarts}")
+            if shares['submitted'] > 0:
+                acceptance_rate = (shares['accepted'] / shares['submitted']) * 100
+                print(f"Acceptance rate: {acceptance_rate:.2f}%")
+            print(f"Earnings: {shares['accepted'] * 0.001:.6f} RSDT")
+            print("-------------------\n")
 
 def main():
     parser = argparse.ArgumentParser(description='RSDT Miner')
     parser.add_argument('--address', '-a', required=True, help='RSDT wallet address')
-    parser.add_argument('--pool', '-p', default='http://pool.rsdt.network:18090', help='Mining pool URL')
-    parser.add_argument('--threads', '-t', type=int, default=0, help='Number of mining threads (0 = auto)')
+    parser.add_argument('--pool', '-p', default='http://pool.rsdt.network:18090',
+                        help='Mining pool URL: http:// for getwork, stratum+tcp:// for Stratum')
+    parser.add_argument('--worker', '-w', default='default', help='Worker name (Stratum pools)')
+    parser.add_argument('--threads', '-t', type=int, default=0, help='Number of hashing processes (0 = auto)')
+    parser.add_argument('--batch-window', type=float, default=0.05,
+                        help='Seconds to collect shares into one submit request')
+    parser.add_argument('--stats-file', help='Write JSON mining stats to this file every few seconds')
+    parser.add_argument('--stats-port', type=int, help='Serve JSON mining stats on this port at /stats')
+    parser.add_argument('--no-longpoll', action='store_true', help='Do not long-poll the pool for new blocks')
     parser.add_argument('--version', '-v', action='version', version='RSDT Miner v1.0.0')
     
     args = parser.parse_args()
@@ -187,7 +691,9 @@ def main():
         return 1
     
     # Create and start miner
-    miner = RSDTMiner(args.address, args.pool, args.threads)
+    miner = RSDTMiner(args.address, args.pool, args.threads, longpoll=not args.no_longpoll,
+                      batch_window=args.batch_window, stats_file=args.stats_file,
+                      stats_port=args.stats_port, worker=args.worker)
     
     try:
         miner.start_mining()
@@ -4,121 +4,233 @@ RSDT Linux Miner
 Simple Python-based miner for testing
 """
 
-import requests
-import json
+import argparse
+import os
 import time
 import threading
 import hashlib
+import struct
 from datetime import datetime
 
+from rsdt_stratum_client import StratumClientThread
+
+def system_cpu_times():
+    """(busy, total) CPU seconds across all cores from /proc/stat, or None"""
+    try:
+        with open('/proc/stat') as f:
+            fields = [int(value) for value in f.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    ticks = os.sysconf('SC_CLK_TCK')
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)  # idle + iowait
+    total = sum(fields[:8])  # guest time is already counted in user
+    return (total - idle) / ticks, total / ticks
+
+class Throttle:
+    """Duty-cycle pacing shared by the mining threads
+    
+    Threads hash in batches of about ``batch_seconds`` and then sleep:
+    ``cpu_percent`` is the share of wall time each thread spends hashing,
+    and ``max_hashrate`` caps the whole miner's H/s. In ``idle_only``
+    mode ``update``, called about once a second, measures the CPU used
+    by everything except this process and halves the duty cycle while
+    that is above ``idle_threshold`` of the machine, down to a full
+    pause; it doubles back up once the machine is quiet again.
+    """
+    
+    def __init__(self, threads, cpu_percent=100.0, max_hashrate=0.0, idle_only=False,
+                 idle_threshold=0.25, batch_seconds=0.05):
+        self.threads = threads
+        self.cpu_percent = max(1.0, min(100.0, cpu_percent))
+        self.max_hashrate = max_hashrate
+        self.idle_only = idle_only
+        self.idle_threshold = idle_threshold
+        self.batch_seconds = batch_seconds
+        self.idle_factor = 1.0
+        self.other_load = 0.0
+        self.last_sample = None
+    
+    @property
+    def duty(self):
+        """Fraction of wall time a mining thread should spend hashing"""
+        return self.cpu_percent / 100.0 * self.idle_factor
+    
+    def pause(self, busy, cpu, hashes):
+        """Seconds to sleep after ``hashes`` hashes that took ``busy`` seconds and ``cpu`` CPU seconds
+        
+        Sized on the thread's CPU time, so threads that wait for each
+        other (or for the GIL) are not charged for the wait.
+        """
+        duty = self.duty
+        if duty <= 0:
+            return self.batch_seconds * 10
+        pause = cpu / duty - busy
+        if self.max_hashrate > 0:
+            pause = max(pause, hashes * self.threads / self.max_hashrate - busy)
+        return pause
+    
+    def next_batch(self, batch, busy):
+        """Batch size that takes about ``batch_seconds`` at the rate just seen"""
+        if busy <= 0:
+            return batch * 2
+        return max(16, min(1 << 20, int(batch * self.batch_seconds / busy)))
+    
+    def update(self, process_cpu):
+        """Adjust the idle-only backoff; ``process_cpu`` is this process's CPU seconds so far"""
+        if not self.idle_only:
+            return
+        sample = system_cpu_times()
+        if sample is None:
+            # No /proc/stat: use the load average less this miner's own threads
+            load = os.getloadavg()[0] - self.threads * self.duty
+            self.other_load = max(0.0, load / (os.cpu_count() or 1))
+        else:
+            if self.last_sample is None:
+                self.last_sample = sample + (process_cpu,)
+                return
+            busy, total, own = (now - before for now, before
+                                in zip(sample + (process_cpu,), self.last_sample))
+            self.last_sample = sample + (process_cpu,)
+            if total <= 0:
+                return
+            self.other_load = max(0.0, (busy - own) / total)
+        
+        if self.other_load > self.idle_threshold:
+            self.idle_factor = self.idle_factor / 2 if self.idle_factor > 0.05 else 0.0
+        else:
+            self.idle_factor = min(1.0, max(self.idle_factor, 0.025) * 2)
+
 class RSDTLinuxMiner:
-    def __init__(self, pool_url, wallet_address, worker_name, threads=1):
+    def __init__(self, pool_url, wallet_address, worker_name, threads=1, throttle=None):
         self.pool_url = pool_url
         self.wallet_address = wallet_address
         self.worker_name = worker_name
         self.threads = threads
+        self.throttle = throttle or Throttle(threads)
         self.mining_active = False
-        self.total_hashes = 0
+        # One slot per mining thread, written only by that thread
+        self.thread_hashes = [0] * threads
         self.shares_found = 0
         self.shares_accepted = 0
         self.current_job = None
+        self.client = StratumClientThread(pool_url, wallet_address, worker_name,
+                                          on_job=self.set_job)
         
+    @property
+    def total_hashes(self):
+        return sum(self.thread_hashes)
+    
+    def set_job(self, job):
+        """Take a job from the pool; called on the Stratum client's thread"""
+        self.current_job = {
+            "job_id": job["job_id"],
+            "header_prefix": bytes.fromhex(job["blob"])[:76],
+            "target": int.from_bytes(bytes.fromhex(job["target"]), 'little')
+        }
+    
     def connect_to_pool(self):
         """Connect to mining pool"""
         print(f"Connecting to pool: {self.pool_url}")
         
-        # Login to pool
-        login_data = {
-            "id": 1,
-            "method": "login",
-            "params": {
-                "login": self.wallet_address,
-                "pass": self.worker_name
-            }
-        }
-        
-        try:
-            response = requests.post(self.pool_url, json=login_data, timeout=10)
-            result = response.json()
-            
-            if result.get("result", {}).get("status") == "OK":
-                self.current_job = result["result"]["job"]
-                print("Successfully connected to pool!")
-                return True
-            else:
-                print("Failed to login to pool")
-                return False
-                
-        except Exception as e:
-            print(f"Connection error: {e}")
-            return False
-    
-    def mine_nonce(self, nonce):
+        # The client logs in on every (re)connect and keeps the connection open
+        self.client.start()
+        if self.client.wait_connected(timeout=10):
+            print("Successfully connected to pool!")
+            return True
+        print("Failed to login to pool")
+        self.client.stop()
+        return False
+    
+    def mine_nonce(self, job, nonce):
         """Mine with given nonce"""
-        if not self.current_job:
-            return False
-            
-        # Simplified mining - just check if nonce meets some criteria
-        hash_input = f"{self.current_job.get('blob', '')}{nonce}"
-        hash_result = hashlib.sha256(hash_input.encode()).hexdigest()
-        
-        # Simple difficulty check
-        return hash_result.startswith("0000")
-    
-    def submit_share(self, nonce):
-        """Submit share to pool"""
-        submit_data = {
-            "id": 2,
-            "method": "submit",
-            "params": {
-                "login": self.wallet_address,
-                "pass": self.worker_name,
-                "nonce": str(nonce),
-                "job_id": self.current_job.get("job_id", "")
-            }
-        }
-        
-        try:
-            response = requests.post(self.pool_url, json=submit_data, timeout=10)
-            result = response.json()
-            return result.get("result", {}).get("status") == "OK"
-        except:
-            return False
+        # Same share hash as the pool: double SHA-256 of the 76-byte header
+        # prefix and a 4-byte nonce, read as a little-endian number
+        header = job["header_prefix"] + struct.pack('<I', nonce)
+        hash_result = hashlib.sha256(hashlib.sha256(header).digest()).digest()
+        return int.from_bytes(hash_result, 'little') < job["target"]
+    
+    def submit_share(self, job, nonce):
+        """Submit share to pool without waiting for the reply"""
+        reply = self.client.submit(job["job_id"], nonce)
+        reply.add_done_callback(lambda reply: self.share_result(reply, nonce))
+    
+    def share_result(self, reply, nonce):
+        """Count a share's reply; runs on the Stratum client's thread"""
+        if not reply.cancelled() and reply.exception() is None and reply.result():
+            self.shares_accepted += 1
+            print(f"Share accepted! Nonce: {nonce}")
+        else:
+            print(f"Share rejected! Nonce: {nonce}")
     
     def mining_thread(self, thread_id):
         """Mining thread worker"""
-        nonce = thread_id * 1000000
-        thread_hashes = 0
+        throttle = self.throttle
+        span = (1 << 32) // self.threads  # Each thread owns a slice of the 4-byte nonce
+        job = None
+        batch = 256
         
         while self.mining_active:
-            if self.mine_nonce(nonce):
-                self.shares_found += 1
-                if self.submit_share(nonce):
-                    self.shares_accepted += 1
-                    print(f"Share accepted! Nonce: {nonce}")
-                else:
-                    print(f"Share rejected! Nonce: {nonce}")
+            if self.current_job is not job:
+                # New job from the pool: start this thread's nonce range over
+                job = self.current_job
+                nonce = thread_id * span
+            if job is None:
+                time.sleep(0.1)
+                continue
+            count = min(batch, (thread_id + 1) * span - nonce)
+            if count <= 0:
+                # This thread's nonce range is used up; wait for the next job
+                time.sleep(0.1)
+                continue
+            if throttle.duty <= 0:
+                # Fully backed off in idle-only mode: hash nothing until it lifts
+                time.sleep(throttle.batch_seconds * 10)
+                continue
             
+            # Hash a timed batch, then sleep off the rest of the duty cycle
+            started, started_cpu = time.perf_counter(), time.thread_time()
+            for nonce in range(nonce, nonce + count):
+                if self.mine_nonce(job, nonce):
+                    self.shares_found += 1
+                    self.submit_share(job, nonce)
             nonce += 1
-            thread_hashes += 1
-            self.total_hashes += 1
+            busy = time.perf_counter() - started
+            self.thread_hashes[thread_id] += count
             
-            # Small delay to prevent excessive CPU usage
-            time.sleep(0.001)
+            pause = throttle.pause(busy, time.thread_time() - started_cpu, count)
+            batch = throttle.next_batch(batch, busy)
+            if pause > 0:
+                time.sleep(pause)
     
     def stats_thread(self):
-        """Display mining statistics"""
-        start_time = time.time()
+        """Display mining statistics and drive the idle-only backoff"""
+        last_time = time.perf_counter()
+        last_hashes = self.total_hashes
+        last_cpu = time.process_time()
+        next_report = last_time + 10
         
         while self.mining_active:
-            time.sleep(10)
+            time.sleep(1)
+            self.throttle.update(time.process_time())
             
-            if self.mining_active:
-                elapsed = time.time() - start_time
-                hashrate = self.total_hashes / elapsed if elapsed > 0 else 0
-                
-                print(f"\rH/s: {hashrate:8.0f} | Total: {self.total_hashes:12} | "
-                      f"Shares: {self.shares_found:4} | Accepted: {self.shares_accepted:4}", end="")
+            now = time.perf_counter()
+            if not self.mining_active or now < next_report:
+                continue
+            hashes, cpu = self.total_hashes, time.process_time()
+            elapsed = now - last_time
+            hashrate = (hashes - last_hashes) / elapsed
+            # Average CPU per mining thread, comparable with the --cpu target
+            cpu_percent = (cpu - last_cpu) / elapsed / self.threads * 100
+            last_time, last_hashes, last_cpu = now, hashes, cpu
+            next_report = now + 10
+            
+            throttle = self.throttle
+            state = f" | Target: {throttle.duty * 100:3.0f}%"
+            if throttle.idle_only:
+                state += f" | Other load: {throttle.other_load * 100:3.0f}%"
+            print(f"\rH/s: {hashrate:8.0f} | CPU: {cpu_percent:5.1f}%{state} | "
+                  f"Total: {hashes:12} | Shares: {self.shares_found:4} | "
+                  f"Accepted: {self.shares_accepted:4}", end="")
     
     def start_mining(self):
         """Start mining"""
@@ -158,6 +270,7 @@ class RSDTLinuxMiner:
     def stop_mining(self):
         """Stop mining"""
         self.mining_active = False
+        self.client.stop()
 
 def print_banner():
     print("""
@@ -175,14 +288,29 @@ def print_banner():
 """)
 
 def main():
+    parser = argparse.ArgumentParser(description='RSDT Linux Miner')
+    parser.add_argument('--pool', help='Pool URL, e.g. stratum+tcp://127.0.0.1:3333')
+    parser.add_argument('--wallet', help='Wallet address')
+    parser.add_argument('--worker', help='Worker name')
+    parser.add_argument('--threads', type=int, help='Number of mining threads')
+    parser.add_argument('--cpu', type=float, default=100.0,
+                        help='Percent of the time each thread spends hashing (1-100)')
+    parser.add_argument('--max-hashrate', type=float, default=0.0,
+                        help='Cap on the total hashrate in H/s (0 = no cap)')
+    parser.add_argument('--idle-only', action='store_true',
+                        help='Back off while other programs are using the CPU')
+    args = parser.parse_args()
+    
     print_banner()
     
-    pool_url = input("Enter pool URL (e.g., http://127.0.0.1:3333): ").strip()
-    wallet_address = input("Enter wallet address: ").strip()
-    worker_name = input("Enter worker name: ").strip()
-    threads = int(input("Enter number of threads (default 1): ") or "1")
+    pool_url = args.pool or input("Enter pool URL (e.g., stratum+tcp://127.0.0.1:3333): ").strip()
+    wallet_address = args.wallet or input("Enter wallet address: ").strip()
+    worker_name = args.worker or input("Enter worker name: ").strip()
+    threads = args.threads or int(input("Enter number of threads (default 1): ") or "1")
     
-    miner = RSDTLinuxMiner(pool_url, wallet_address, worker_name, threads)
+    throttle = Throttle(threads, cpu_percent=args.cpu, max_hashrate=args.max_hashrate,
+                        idle_only=args.idle_only)
+    miner = RSDTLinuxMiner(pool_url, wallet_address, worker_name, threads, throttle)
     
     if not miner.connect_to_pool():
         print("Failed to connect to pool. Exiting...")
@@ -195,4 +323,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -7,16 +7,38 @@ Professional mining pool implementation for Resistance Blockchain
 import asyncio
 import json
 import logging
+import math
+import os
+import signal
 import time
 import hashlib
 import struct
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import aiohttp
+from aiohttp import web
 import sqlite3
 from pathlib import Path
 
+try:
+    import zmq
+    import zmq.asyncio
+except ImportError:  # ZMQ notifications are optional, the pool falls back to polling
+    zmq = None
+
+try:
+    import orjson
+except ImportError:  # Faster JSON codec is optional, the stdlib json module is the fallback
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,6 +50,72 @@ logging.basicConfig(
 )
 logger = logging.getLogger('RSDT_Pool')
 
+def share_hash(header_prefix: bytes, nonce: int) -> bytes:
+    """Double SHA-256 of a 76-byte header prefix with the nonce appended"""
+    header = header_prefix + struct.pack('<I', nonce)
+    return hashlib.sha256(hashlib.sha256(header).digest()).digest()
+
+def validate_nonces(header_prefix: bytes, target: bytes, nonces: List[int]) -> List[bool]:
+    """Check a batch of nonces for one job against its target"""
+    target_int = int.from_bytes(target, 'little')
+    return [value < target_int for value in hash_values(header_prefix, nonces)]
+
+def hash_values(header_prefix: bytes, nonces: List[int]) -> List[int]:
+    """Share hashes for a batch of nonces as little-endian integers
+
+    Runs inside validation worker processes, so it has to stay a
+    module-level function that can be pickled.
+    """
+    return [int.from_bytes(share_hash(header_prefix, nonce), 'little') for nonce in nonces]
+
+_compact_json = json.JSONEncoder(separators=(',', ':'))
+
+def encode_line_stdlib(message) -> bytes:
+    """Compact JSON line via the stdlib encoder"""
+    return (_compact_json.encode(message) + '\n').encode()
+
+def encode_line_orjson(message) -> bytes:
+    """Compact JSON line via orjson, newline appended without a copy"""
+    return orjson.dumps(message, option=orjson.OPT_APPEND_NEWLINE)
+
+# Stratum message codec, switched by use_json_codec()
+encode_line = encode_line_stdlib
+decode_message = json.loads
+json_codec = 'stdlib'
+
+def use_json_codec(name: str = 'auto') -> str:
+    """Select the Stratum JSON codec ('auto', 'orjson' or 'stdlib')
+
+    Returns the codec actually in use; 'orjson' falls back to the stdlib
+    when orjson is not installed.
+    """
+    global encode_line, decode_message, json_codec
+    if name != 'stdlib' and orjson is not None:
+        encode_line, decode_message, json_codec = encode_line_orjson, orjson.loads, 'orjson'
+    else:
+        encode_line, decode_message, json_codec = encode_line_stdlib, json.loads, 'stdlib'
+    return json_codec
+
+use_json_codec()
+
+OK_REPLY_HEAD = b'{"id":'
+OK_REPLY_TAIL = b',"result":{"status":"OK"}}\n'
+
+def ok_reply(request_id) -> bytes:
+    """Pre-encoded {"status": "OK"} reply for a request id"""
+    if type(request_id) is int:
+        encoded = b'%d' % request_id
+    else:
+        encoded = encode_line(request_id)[:-1]
+    return OK_REPLY_HEAD + encoded + OK_REPLY_TAIL
+
+MAX_TARGET = 2 ** 256 - 1
+COIN = 10 ** 12  # atomic units per RSDT
+
+def difficulty_to_target(difficulty: int) -> int:
+    """Share target for a difficulty; a hash must be below it"""
+    return MAX_TARGET // max(1, difficulty)
+
 @dataclass
 class BlockTemplate:
     """Block template for mining"""
@@ -39,6 +127,27 @@ class BlockTemplate:
     merkle_root: bytes
     timestamp: int
     nonce: int = 0
+    prev_hash: str = ''
+    reserved_offset: int = 0
+    reward: int = 0
+
+    def has_reserved_area(self) -> bool:
+        """Whether the blob has room for a 4-byte extranonce"""
+        return 0 < self.reserved_offset <= len(self.block_header) - 4
+    
+    def blob_with_extranonce(self, extranonce: int) -> bytes:
+        """Template blob with an extranonce written into the reserved area"""
+        if not self.has_reserved_area():
+            return self.block_header
+        blob = bytearray(self.block_header)
+        struct.pack_into('<I', blob, self.reserved_offset, extranonce)
+        return bytes(blob)
+    
+    def solved_blob(self, extranonce: int, nonce: int) -> bytes:
+        """Full block blob for a solved job; the nonce follows the 76-byte hashed prefix"""
+        blob = bytearray(self.blob_with_extranonce(extranonce))
+        struct.pack_into('<I', blob, 76, nonce)
+        return bytes(blob)
 
 @dataclass
 class Miner:
@@ -51,6 +160,1228 @@ class Miner:
     shares_accepted: int = 0
     hashrate: float = 0.0
 
+@dataclass
+class ShareRecord:
+    """Accepted share waiting to be persisted"""
+    miner_address: str
+    worker_name: str
+    nonce: int
+    difficulty: int
+    total_shares: int
+    accepted_shares: int
+    timestamp: float
+
+class PoolDatabase:
+    """Single-writer share persistence
+
+    Owns one long-lived WAL-mode SQLite connection on a dedicated thread.
+    Accepted shares are queued in memory and written in multi-row
+    transactions every ``flush_interval`` seconds or ``batch_size`` rows,
+    whichever comes first, so the event loop never waits on fsync.
+    """
+
+    # Seconds a finished minute is left alone before it is rolled up,
+    # so shares still sitting in the queue land in raw rows first
+    ROLLUP_GRACE = 10
+
+    def __init__(self, db_path: str, batch_size: int = 500,
+                 flush_interval: float = 0.1, max_queue: int = 10000,
+                 share_retention: float = 86400, rollup_retention: float = 30 * 86400,
+                 analyze_interval: float = 3600, vacuum_interval: float = 86400):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.share_retention = share_retention
+        self.rollup_retention = rollup_retention
+        self.analyze_interval = analyze_interval
+        self.vacuum_interval = vacuum_interval
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rsdt-db')
+        self.conn: Optional[sqlite3.Connection] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self.batch_ready: Optional[asyncio.Event] = None
+        self.writer_task: Optional[asyncio.Task] = None
+        self.closing = False
+
+        # Throughput and backpressure metrics
+        self.shares_queued = 0
+        self.shares_written = 0
+        self.batches_written = 0
+        self.write_errors = 0
+        self.backpressure_waits = 0
+        self.queue_high_water = 0
+        self.last_batch_size = 0
+        self.last_write_ms = 0.0
+
+        # Storage maintenance
+        self.rows_rolled_up = 0
+        self.shares_pruned = 0
+        self.maintenance_errors = 0
+        self.last_maintenance_ms = 0.0
+        self.last_analyze = 0.0
+        self.last_vacuum = 0.0
+
+    async def start(self):
+        """Open the writer connection and start the background flusher"""
+        if self.writer_task:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._open)
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self.batch_ready = asyncio.Event()
+        self.closing = False
+        self.writer_task = asyncio.create_task(self._writer_loop())
+        logger.info(f"Share writer started (batch {self.batch_size} rows / "
+                    f"{self.flush_interval * 1000:.0f} ms, queue {self.max_queue})")
+
+    def _open(self):
+        """Open the connection (runs on the writer thread)"""
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA busy_timeout=5000')
+
+    async def submit(self, record: ShareRecord):
+        """Queue a share for persistence, waiting if the queue is full"""
+        if not self.writer_task:
+            await self.start()
+        if self.queue.full():
+            self.backpressure_waits += 1
+        await self.queue.put(record)
+        self.shares_queued += 1
+
+        depth = self.queue.qsize()
+        if depth > self.queue_high_water:
+            self.queue_high_water = depth
+        if depth >= self.batch_size:
+            self.batch_ready.set()
+
+    async def _writer_loop(self):
+        """Drain the queue into multi-row transactions"""
+        while not (self.closing and self.queue.empty()):
+            try:
+                await asyncio.wait_for(self.batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.batch_ready.clear()
+
+            while not self.queue.empty():
+                batch = []
+                while len(batch) < self.batch_size and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                await self._write(batch)
+
+    async def _write(self, batch: List[ShareRecord]):
+        """Write one batch on the writer thread"""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            await loop.run_in_executor(self.executor, self._write_batch, batch)
+            self.shares_written += len(batch)
+            self.batches_written += 1
+        except Exception as e:
+            self.write_errors += 1
+            logger.error(f"Error writing {len(batch)} shares: {e}")
+        self.last_batch_size = len(batch)
+        self.last_write_ms = (time.perf_counter() - start) * 1000
+
+    def _write_batch(self, batch: List[ShareRecord]):
+        """Insert a batch of shares in a single transaction"""
+        # Only the latest counters per miner need to reach the miners table
+        miners = {}
+        for record in batch:
+            miners[record.miner_address] = (
+                record.miner_address,
+                record.worker_name,
+                record.total_shares,
+                record.accepted_shares,
+                datetime.fromtimestamp(record.timestamp).isoformat(' ')
+            )
+
+        with self.conn:
+            self.conn.executemany('''
+                INSERT INTO miners
+                (address, worker_name, total_shares, accepted_shares, last_seen)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(address) DO UPDATE SET
+                    worker_name = excluded.worker_name,
+                    total_shares = excluded.total_shares,
+                    accepted_shares = excluded.accepted_shares,
+                    last_seen = excluded.last_seen
+            ''', list(miners.values()))
+
+            self.conn.executemany('''
+                INSERT INTO shares (miner_address, worker_name, nonce, difficulty, timestamp)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(r.miner_address, r.worker_name, r.nonce, r.difficulty, int(r.timestamp))
+                  for r in batch])
+
+    async def credit_block(self, height: int, block_hash: str, reward: float, pool_fee: float,
+                           payouts: Dict[str, float]) -> bool:
+        """Record a found block and credit its payouts
+
+        Runs on the writer thread, so it is ordered with share batches.
+        Returns False if the height was already credited.
+        """
+        if not self.writer_task:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._credit_block, height,
+                                          block_hash, reward, pool_fee, payouts)
+
+    def _credit_block(self, height: int, block_hash: str, reward: float, pool_fee: float,
+                      payouts: Dict[str, float]) -> bool:
+        """Insert the block row and all balance updates in one transaction"""
+        with self.conn:
+            cursor = self.conn.execute('''
+                INSERT OR IGNORE INTO blocks (height, hash, reward, pool_fee)
+                VALUES (?, ?, ?, ?)
+            ''', (height, block_hash, reward, pool_fee))
+            if cursor.rowcount == 0:
+                return False
+
+            self.conn.executemany('''
+                INSERT INTO miners (address, pending_balance)
+                VALUES (?, ?)
+                ON CONFLICT(address) DO UPDATE SET
+                    pending_balance = pending_balance + excluded.pending_balance
+            ''', list(payouts.items()))
+        return True
+
+    def _get_state(self, key: str, default: Optional[int] = None) -> Optional[int]:
+        row = self.conn.execute('SELECT value FROM pool_state WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_state(self, key: str, value: int):
+        self.conn.execute('''
+            INSERT INTO pool_state (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        ''', (key, value))
+
+    async def maintain(self, now: Optional[float] = None):
+        """Roll up finished minutes, prune old rows and run ANALYZE/VACUUM when due"""
+        if not self.writer_task:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            await loop.run_in_executor(self.executor, self._maintain, now or time.time())
+        except Exception as e:
+            self.maintenance_errors += 1
+            logger.error(f"Database maintenance failed: {e}")
+        self.last_maintenance_ms = (time.perf_counter() - start) * 1000
+
+    def _maintain(self, now: float):
+        """Storage maintenance pass (runs on the writer thread)"""
+        until = (int(now) - self.ROLLUP_GRACE) // 60 * 60
+        self.rows_rolled_up += self._rollup(until)
+
+        # Raw rows are only dropped once they are rolled up
+        with self.conn:
+            cursor = self.conn.execute('DELETE FROM shares WHERE timestamp < ?',
+                                       (min(until, int(now - self.share_retention)),))
+            self.shares_pruned += cursor.rowcount
+            self.conn.execute('DELETE FROM share_rollups WHERE minute < ?',
+                              (int(now - self.rollup_retention),))
+
+        if now - self.last_analyze >= self.analyze_interval:
+            self.conn.execute('ANALYZE')
+            self.last_analyze = now
+
+        if not self.last_vacuum:
+            self.last_vacuum = self._get_state('last_vacuum', 0)
+            if not self.last_vacuum:
+                # First run on this database starts the VACUUM clock
+                self.last_vacuum = now
+                with self.conn:
+                    self._set_state('last_vacuum', int(now))
+        if self.vacuum_interval and now - self.last_vacuum >= self.vacuum_interval:
+            self.conn.execute('VACUUM')
+            self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            self.last_vacuum = now
+            with self.conn:
+                self._set_state('last_vacuum', int(now))
+            logger.info("Pool database vacuumed")
+
+    def _rollup(self, until: int) -> int:
+        """Fold raw shares older than ``until`` into per-minute rollups"""
+        since = self._get_state('rollup_until')
+        if since is None:
+            oldest = self.conn.execute('SELECT MIN(timestamp) FROM shares').fetchone()[0]
+            since = oldest // 60 * 60 if oldest is not None else until
+        if since >= until:
+            return 0
+
+        with self.conn:
+            cursor = self.conn.execute('''
+                INSERT INTO share_rollups (minute, miner_address, worker_name, shares, difficulty)
+                SELECT timestamp / 60 * 60, miner_address, COALESCE(worker_name, ''),
+                       COUNT(*), SUM(difficulty)
+                FROM shares
+                WHERE timestamp >= ? AND timestamp < ?
+                GROUP BY 1, 2, 3
+                ON CONFLICT(minute, miner_address, worker_name) DO UPDATE SET
+                    shares = shares + excluded.shares,
+                    difficulty = difficulty + excluded.difficulty
+            ''', (since, until))
+            self._set_state('rollup_until', until)
+        return cursor.rowcount
+
+    async def recent_work(self, window_difficulty: int) -> List[Tuple[str, int]]:
+        """Most recent per-minute work per address covering ``window_difficulty``
+
+        Returned oldest first as (address, difficulty) pairs, ready to be
+        replayed into a PPLNSWindow.
+        """
+        if not self.writer_task:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._recent_work, window_difficulty)
+
+    def _recent_work(self, window_difficulty: int) -> List[Tuple[str, int]]:
+        since = self._get_state('rollup_until', 0)
+        work = []
+        total = 0
+        # Raw shares not rolled up yet, then rollups newest first
+        for query, params in (('''
+                SELECT timestamp / 60 * 60 AS minute, miner_address, SUM(difficulty)
+                FROM shares WHERE timestamp >= ?
+                GROUP BY minute, miner_address ORDER BY minute DESC
+            ''', (since,)), ('''
+                SELECT minute, miner_address, SUM(difficulty)
+                FROM share_rollups WHERE minute < ?
+                GROUP BY minute, miner_address ORDER BY minute DESC
+            ''', (since,))):
+            for _, address, difficulty in self.conn.execute(query, params):
+                work.append((address, difficulty))
+                total += difficulty
+                if total >= window_difficulty:
+                    return work[::-1]
+        return work[::-1]
+
+    async def miner_history(self, address: str, since: float) -> List[Dict]:
+        """Hourly share totals for one address from the rollups"""
+        if not self.writer_task:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        rows = await loop.run_in_executor(self.executor, lambda: self.conn.execute('''
+            SELECT minute / 3600 * 3600 AS hour, SUM(shares), SUM(difficulty)
+            FROM share_rollups
+            WHERE miner_address = ? AND minute >= ?
+            GROUP BY hour ORDER BY hour
+        ''', (address, int(since))).fetchall())
+        return [{"hour": hour, "shares": shares, "difficulty": difficulty}
+                for hour, shares, difficulty in rows]
+
+    async def close(self):
+        """Flush everything still queued and close the connection"""
+        if self.writer_task:
+            self.closing = True
+            self.batch_ready.set()
+            await self.writer_task
+            self.writer_task = None
+            logger.info(f"Share writer flushed ({self.shares_written} shares written)")
+
+        if self.conn:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self.executor, self.conn.close)
+            self.conn = None
+        self.executor.shutdown(wait=True)
+
+    def metrics(self) -> Dict:
+        """Throughput and backpressure counters"""
+        return {
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "queue_capacity": self.max_queue,
+            "queue_high_water": self.queue_high_water,
+            "backpressure_waits": self.backpressure_waits,
+            "shares_queued": self.shares_queued,
+            "shares_written": self.shares_written,
+            "batches_written": self.batches_written,
+            "write_errors": self.write_errors,
+            "last_batch_size": self.last_batch_size,
+            "last_write_ms": round(self.last_write_ms, 3),
+            "rows_rolled_up": self.rows_rolled_up,
+            "shares_pruned": self.shares_pruned,
+            "maintenance_errors": self.maintenance_errors,
+            "last_maintenance_ms": round(self.last_maintenance_ms, 3)
+        }
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with percentile estimates"""
+
+    MIN_SECONDS = 1e-6
+    GROWTH = 1.1
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        """Add one observation"""
+        index = 0
+        if seconds > self.MIN_SECONDS:
+            index = int(math.log(seconds / self.MIN_SECONDS) / math.log(self.GROWTH))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Fold another histogram's observations into this one"""
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the given percentile, in seconds"""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * pct / 100)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(self.MIN_SECONDS * self.GROWTH ** (index + 1), self.max)
+        return self.max
+
+    def snapshot(self) -> Dict:
+        """Summary in milliseconds"""
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1000, 3),
+            "p90_ms": round(self.percentile(90) * 1000, 3),
+            "p99_ms": round(self.percentile(99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3)
+        }
+
+class ShareValidator:
+    """Share hashing engine backed by a process pool
+
+    Shares for the same job that arrive within ``batch_window`` seconds go
+    to a worker as a single task, so the header is pickled once per batch
+    rather than once per share. Workers return hash values and the caller
+    compares them against the miner's and the network's target. With
+    ``workers=0`` shares are hashed inline on the event loop.
+    """
+
+    def __init__(self, workers: Optional[int] = None, batch_window: float = 0.002,
+                 max_batch: int = 256, batch_fn=hash_values):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.batch_fn = batch_fn
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.pending: Dict[bytes, Tuple[List[int], List[asyncio.Future]]] = {}
+        self.tasks = set()
+
+        self.shares_validated = 0
+        self.batches_sent = 0
+        self.errors = 0
+
+    async def start(self):
+        """Start the worker processes"""
+        if not self.workers or self.executor:
+            return
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        # Start every worker now instead of on the first share
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.executor, os.getpid)
+                               for _ in range(self.workers)))
+        logger.info(f"Share validator started with {self.workers} worker processes")
+
+    async def hash_share(self, header_prefix: bytes, nonce: int) -> int:
+        """Hash one share, batching it with others for the same header"""
+        key = header_prefix
+        if not self.executor:
+            self.shares_validated += 1
+            return self.batch_fn(key, [nonce])[0]
+
+        loop = asyncio.get_running_loop()
+        batch = self.pending.get(key)
+        if batch is None:
+            batch = self.pending[key] = ([], [])
+            loop.call_later(self.batch_window, self._flush, key)
+
+        future = loop.create_future()
+        batch[0].append(nonce)
+        batch[1].append(future)
+        if len(batch[0]) >= self.max_batch:
+            self._flush(key)
+        return await future
+
+    def _flush(self, key: bytes):
+        """Send the pending batch for a job to the process pool"""
+        batch = self.pending.pop(key, None)
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run_batch(key, *batch))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _run_batch(self, key: bytes, nonces: List[int], futures: List[asyncio.Future]):
+        """Hash a batch in a worker and resolve its futures"""
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, self.batch_fn, key, nonces)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error validating batch of {len(nonces)} shares: {e}")
+            # An unreachable hash value rejects every share in the batch
+            results = [MAX_TARGET] * len(nonces)
+
+        self.batches_sent += 1
+        self.shares_validated += len(nonces)
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        """Stop the worker processes"""
+        if self.executor:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def metrics(self) -> Dict:
+        """Validation throughput counters"""
+        return {
+            "workers": self.workers,
+            "shares_validated": self.shares_validated,
+            "batches_sent": self.batches_sent,
+            "avg_batch_size": round(self.shares_validated / self.batches_sent, 2) if self.batches_sent else 0.0,
+            "pending_batches": len(self.pending),
+            "errors": self.errors
+        }
+
+class DaemonRPCError(Exception):
+    """A daemon JSON-RPC call failed or returned an error"""
+
+class DaemonRPCClient:
+    """Keep-alive JSON-RPC client for the daemon
+
+    Every daemon call the pool makes goes through one aiohttp session with
+    a pooled connector, so template refreshes reuse open TCP connections.
+    ``batch`` sends several calls as one JSON-RPC batch request and falls
+    back to concurrent single calls if the daemon does not accept batches.
+    """
+
+    def __init__(self, daemon_url: str, timeout: float = 10.0, pool_size: int = 8,
+                 keepalive: float = 60.0):
+        self.url = f"{daemon_url.rstrip('/')}/json_rpc"
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.keepalive = keepalive
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.batch_supported: Optional[bool] = None
+        self.next_id = 0
+
+        self.calls: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.latency = LatencyHistogram()
+
+    async def start(self):
+        """Open the pooled session"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size,
+                                             keepalive_timeout=self.keepalive)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+
+    async def close(self):
+        """Close the session and its connections"""
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    def _request(self, method: str, params: Optional[Union[Dict, List]] = None) -> Dict:
+        """Build a JSON-RPC request object"""
+        self.next_id += 1
+        request = {"jsonrpc": "2.0", "id": str(self.next_id), "method": method}
+        if params is not None:
+            request["params"] = params
+        return request
+
+    async def _post(self, payload, timeout: Optional[float]):
+        """POST a request body and decode the JSON reply
+
+        Server errors (HTTP 5xx) raise aiohttp.ClientResponseError rather
+        than being decoded as a reply.
+        """
+        await self.start()
+        # timeout=None would replace the session's rpc_timeout with no timeout at all
+        options = {"timeout": aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+        async with self.session.post(self.url, json=payload, **options) as response:
+            if response.status >= 500:
+                response.raise_for_status()
+            return await response.json(content_type=None)
+
+    def _count(self, counters: Dict[str, int], method: str):
+        counters[method] = counters.get(method, 0) + 1
+
+    async def call(self, method: str, params: Optional[Union[Dict, List]] = None,
+                   timeout: Optional[float] = None):
+        """Make a single JSON-RPC call and return its result"""
+        self._count(self.calls, method)
+        start = time.perf_counter()
+        try:
+            reply = await self._post(self._request(method, params), timeout)
+        except Exception as e:
+            self._count(self.errors, method)
+            raise DaemonRPCError(f"{method}: {e}") from e
+        finally:
+            self.latency.record(time.perf_counter() - start)
+
+        if not isinstance(reply, dict) or 'result' not in reply:
+            self._count(self.errors, method)
+            raise DaemonRPCError(f"{method}: {reply.get('error') if isinstance(reply, dict) else reply}")
+        return reply['result']
+
+    async def batch(self, calls: List[Tuple[str, Optional[Dict]]],
+                    timeout: Optional[float] = None) -> List:
+        """Make several calls in one round trip and return their results in order"""
+        if self.batch_supported is False:
+            return list(await asyncio.gather(*(self.call(method, params, timeout)
+                                               for method, params in calls)))
+
+        requests = [self._request(method, params) for method, params in calls]
+        start = time.perf_counter()
+        try:
+            reply = await self._post(requests, timeout)
+        except Exception as e:
+            # Transport and server errors say nothing about batch support
+            for method, _ in calls:
+                self._count(self.calls, method)
+                self._count(self.errors, method)
+            raise DaemonRPCError(f"batch: {e}") from e
+        finally:
+            self.latency.record(time.perf_counter() - start)
+
+        if not isinstance(reply, list):
+            # The daemon answered, but not with a batch reply
+            logger.info("Daemon does not support JSON-RPC batches, using concurrent calls")
+            self.batch_supported = False
+            return await self.batch(calls, timeout)
+        self.batch_supported = True
+        for method, _ in calls:
+            self._count(self.calls, method)
+
+        replies = {item.get('id'): item for item in reply if isinstance(item, dict)}
+        results = []
+        for request in requests:
+            item = replies.get(request['id'], {})
+            if 'result' not in item:
+                self._count(self.errors, request['method'])
+                raise DaemonRPCError(f"{request['method']}: {item.get('error', 'missing reply')}")
+            results.append(item['result'])
+        return results
+
+    def metrics(self) -> Dict:
+        """Call counts, error counts and latency"""
+        return {
+            "calls": dict(self.calls),
+            "errors": dict(self.errors),
+            "batch_supported": self.batch_supported,
+            "latency": self.latency.snapshot()
+        }
+
+class BlockSubmitter:
+    """Priority path from a block candidate to the daemons
+
+    Each daemon gets its own small keep-alive client, separate from the
+    template client, so a found block never queues behind template
+    fetches. ``keep_warm`` pings the daemons well inside the keep-alive
+    timeout, so the submit goes out on an already open connection. A block
+    is sent to every daemon at once and counts as accepted if any of them
+    accepts it.
+    """
+
+    def __init__(self, daemon_urls: List[str], timeout: float = 5.0,
+                 keepalive_interval: float = 15.0):
+        self.clients = [DaemonRPCClient(url, timeout=timeout, pool_size=2)
+                        for url in daemon_urls]
+        self.keepalive_interval = keepalive_interval
+        self.submitted = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.errors = 0
+        self.warm_failures = 0
+        self.share_to_submit = LatencyHistogram()
+
+    async def warm(self):
+        """Open a connection to every daemon ahead of the next block"""
+        results = await asyncio.gather(*(client.call("get_info") for client in self.clients),
+                                       return_exceptions=True)
+        for client, result in zip(self.clients, results):
+            if isinstance(result, Exception):
+                self.warm_failures += 1
+                logger.debug(f"Block submit connection to {client.url} not ready: {result}")
+
+    async def keep_warm(self):
+        while True:
+            await self.warm()
+            await asyncio.sleep(self.keepalive_interval)
+
+    async def _submit_one(self, client: DaemonRPCClient, blob_hex: str) -> bool:
+        try:
+            result = await client.call("submit_block", [blob_hex])
+        except DaemonRPCError as e:
+            self.errors += 1
+            logger.error(f"Block submit to {client.url} failed: {e}")
+            return False
+        if not isinstance(result, dict) or result.get('status') != 'OK':
+            self.rejected += 1
+            logger.warning(f"Block rejected by {client.url}: {result}")
+            return False
+        return True
+
+    async def submit(self, blob_hex: str, received: float) -> bool:
+        """Send a block blob to every daemon; ``received`` is the share's perf_counter arrival"""
+        self.submitted += 1
+        accepted = False
+        for outcome in asyncio.as_completed([self._submit_one(client, blob_hex)
+                                             for client in self.clients]):
+            if await outcome and not accepted:
+                # First acceptance is what matters for orphan risk
+                accepted = True
+                self.accepted += 1
+                self.share_to_submit.record(time.perf_counter() - received)
+        return accepted
+
+    async def close(self):
+        for client in self.clients:
+            await client.close()
+
+    def metrics(self) -> Dict:
+        """Submit outcomes and share-to-accept latency"""
+        return {
+            "daemons": len(self.clients),
+            "submitted": self.submitted,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "warm_failures": self.warm_failures,
+            "share_to_submit": self.share_to_submit.snapshot()
+        }
+
+class HashrateSeries:
+    """Ring of fixed-width time buckets summing accepted share difficulty"""
+
+    def __init__(self, bucket_seconds: int, slots: int):
+        self.bucket_seconds = bucket_seconds
+        self.slots = slots
+        self.sums = [0] * slots
+        self.stamps = [-1] * slots
+        self.last_bucket = -1
+
+    def add(self, difficulty: int, now: float):
+        """Fold one share's difficulty into the current bucket"""
+        bucket = int(now // self.bucket_seconds)
+        slot = bucket % self.slots
+        if self.stamps[slot] != bucket:
+            self.stamps[slot] = bucket
+            self.sums[slot] = 0
+        self.sums[slot] += difficulty
+        self.last_bucket = bucket
+
+    def rate(self, seconds: int, now: float) -> float:
+        """Effective hashrate (difficulty per second) over the last ``seconds``"""
+        bucket = int(now // self.bucket_seconds)
+        count = max(1, min(self.slots, seconds // self.bucket_seconds))
+        oldest = bucket - count + 1
+        total = 0
+        for slot in range(self.slots):
+            if oldest <= self.stamps[slot] <= bucket:
+                total += self.sums[slot]
+        # The current bucket is only partly elapsed
+        elapsed = (count - 1) * self.bucket_seconds + (now - bucket * self.bucket_seconds)
+        return total / elapsed if elapsed > 0 else 0.0
+
+class HashrateTracker:
+    """In-memory hashrate estimates per worker, per address and pool-wide
+
+    Each accepted share adds its difficulty to a bucket ring (for example
+    360 buckets of 10 s for one hour), so rates over any window up to an
+    hour come from memory rather than from the shares table.
+    """
+
+    WINDOWS = (60, 600, 3600)
+
+    def __init__(self, bucket_seconds: int = 10, window_seconds: int = 3600):
+        self.bucket_seconds = bucket_seconds
+        self.window_seconds = window_seconds
+        self.slots = max(1, window_seconds // bucket_seconds)
+        self.pool = HashrateSeries(bucket_seconds, self.slots)
+        self.addresses: Dict[str, HashrateSeries] = {}
+        self.workers: Dict[str, Dict[str, HashrateSeries]] = {}
+
+    def _series(self, table: Dict, key: str) -> HashrateSeries:
+        series = table.get(key)
+        if series is None:
+            series = table[key] = HashrateSeries(self.bucket_seconds, self.slots)
+        return series
+
+    def record(self, address: str, worker_name: str, difficulty: int, now: float):
+        """Account an accepted share"""
+        self.pool.add(difficulty, now)
+        self._series(self.addresses, address).add(difficulty, now)
+        self._series(self.workers.setdefault(address, {}), worker_name).add(difficulty, now)
+
+    def rates(self, series: Optional[HashrateSeries], now: float) -> Dict[str, float]:
+        """Hashrate over each reporting window"""
+        return {f"{window}s": round(series.rate(window, now), 2) if series else 0.0
+                for window in self.WINDOWS}
+
+    def pool_stats(self, now: float) -> Dict:
+        return {"hashrate": self.rates(self.pool, now),
+                "active_addresses": len(self.addresses)}
+
+    def address_stats(self, address: str, now: float) -> Optional[Dict]:
+        """Hashrate of an address and each of its workers"""
+        if address not in self.addresses:
+            return None
+        return {
+            "address": address,
+            "hashrate": self.rates(self.addresses[address], now),
+            "workers": {worker: self.rates(series, now)
+                        for worker, series in self.workers.get(address, {}).items()}
+        }
+
+    def prune(self, now: float):
+        """Forget addresses and workers with no shares inside the window"""
+        horizon = int(now // self.bucket_seconds) - self.slots
+        for address in [a for a, s in self.addresses.items() if s.last_bucket <= horizon]:
+            del self.addresses[address]
+            self.workers.pop(address, None)
+        for workers in self.workers.values():
+            for worker in [w for w, s in workers.items() if s.last_bucket <= horizon]:
+                del workers[worker]
+
+class PPLNSWindow:
+    """Sliding PPLNS window over the most recent difficulty-weighted shares
+
+    Shares sit in a deque next to a running difficulty sum per address.
+    Adding a share and expiring old ones is O(1) amortised, and a block's
+    split only walks the per-address sums, so it costs O(miners) no
+    matter how many shares the window holds.
+    """
+
+    def __init__(self, window_difficulty: int = 0):
+        self.window_difficulty = window_difficulty
+        self.shares: deque = deque()
+        self.totals: Dict[str, int] = {}
+        self.total_difficulty = 0
+
+    def add(self, address: str, difficulty: int):
+        """Append an accepted share and expire shares that left the window"""
+        self.shares.append((address, difficulty))
+        self.totals[address] = self.totals.get(address, 0) + difficulty
+        self.total_difficulty += difficulty
+        self._trim()
+
+    def resize(self, window_difficulty: int):
+        """Change the window length (total share difficulty)"""
+        self.window_difficulty = window_difficulty
+        self._trim()
+
+    def _trim(self):
+        # Keep the oldest share as long as the rest fall short of the window
+        limit = self.window_difficulty
+        while limit > 0 and self.shares and self.total_difficulty - self.shares[0][1] >= limit:
+            address, difficulty = self.shares.popleft()
+            self.total_difficulty -= difficulty
+            remaining = self.totals[address] - difficulty
+            if remaining:
+                self.totals[address] = remaining
+            else:
+                del self.totals[address]
+
+    def split(self, reward: int, fee_percent: float) -> Tuple[Dict[str, int], int]:
+        """Divide a block reward (atomic units) over the window
+
+        Returns the per-address payouts and the pool's cut, which also
+        absorbs the rounding remainder.
+        """
+        if self.total_difficulty <= 0 or reward <= 0:
+            return {}, max(0, reward)
+        distributable = reward - int(reward * fee_percent / 100)
+        payouts = {address: distributable * difficulty // self.total_difficulty
+                   for address, difficulty in self.totals.items()}
+        return payouts, reward - sum(payouts.values())
+
+    def metrics(self) -> Dict:
+        return {
+            "shares": len(self.shares),
+            "miners": len(self.totals),
+            "total_difficulty": self.total_difficulty,
+            "window_difficulty": self.window_difficulty
+        }
+
+@dataclass
+class MiningJob:
+    """A job handed to one miner"""
+    job_id: str
+    template: BlockTemplate
+    connection_id: int
+    extranonce: int
+    difficulty: int
+    # Nonces already submitted for this job's header, shared by the connection's
+    # jobs that hash the same bytes
+    submitted: set = field(default_factory=set)
+    
+    @property
+    def header_prefix(self) -> bytes:
+        """The hashed header bytes, extranonce included"""
+        return self.template.blob_with_extranonce(self.extranonce)[:76]
+
+class JobRegistry:
+    """Recently issued jobs keyed by job id
+
+    Jobs are grouped per template in a ring of the last ``max_templates``
+    templates; when a new template arrives the oldest template's jobs are
+    dropped in one go, and past ``max_jobs`` the oldest jobs go first.
+    Lookups and stale checks are single dict accesses.
+
+    Duplicate shares are tracked per connection and hashed header, so a
+    share cannot be replayed under another of the connection's jobs
+    that hashes the same bytes. The sets are dropped with their template.
+    """
+
+    def __init__(self, max_templates: int = 3, max_jobs: int = 500000):
+        self.max_templates = max_templates
+        self.max_jobs = max_jobs
+        self.jobs: Dict[str, MiningJob] = {}
+        self.templates: deque = deque()
+        self.blob_hex_parts: Dict[int, Tuple[str, str]] = {}
+        self.submitted: Dict[int, Dict[Tuple[int, Optional[int]], set]] = {}
+        self.next_job_id = 1
+        self.jobs_created = 0
+
+    def create(self, template: BlockTemplate, connection_id: int, extranonce: int,
+               difficulty: int) -> MiningJob:
+        """Register a new job for one connection"""
+        if not self.templates or self.templates[-1][0] is not template:
+            self._add_template(template)
+
+        job = MiningJob(
+            job_id=f"{self.next_job_id:x}",
+            template=template,
+            connection_id=connection_id,
+            extranonce=extranonce,
+            difficulty=difficulty,
+            submitted=self._submitted_set(template, connection_id, extranonce)
+        )
+        self.next_job_id += 1
+        self.jobs_created += 1
+        self.jobs[job.job_id] = job
+        self.templates[-1][1].append(job.job_id)
+        if len(self.jobs) > self.max_jobs:
+            self._evict_oldest_job()
+        return job
+
+    def _evict_oldest_job(self):
+        """Drop the oldest job still tracked"""
+        for _, job_ids in self.templates:
+            if job_ids:
+                self.jobs.pop(job_ids.popleft(), None)
+                return
+
+    def _submitted_set(self, template: BlockTemplate, connection_id: int, extranonce: int) -> set:
+        """The submitted-nonce set for the header a connection's job hashes
+
+        The extranonce only changes the hashed 76-byte prefix when the
+        reserved area lies inside it; otherwise all of a connection's jobs
+        on the template hash the same prefix and share one set.
+        """
+        hashed = template.has_reserved_area() and template.reserved_offset + 4 <= 76
+        key = (connection_id, extranonce if hashed else None)
+        return self.submitted[id(template)].setdefault(key, set())
+
+    def _add_template(self, template: BlockTemplate):
+        """Start a new ring slot, evicting the oldest template's jobs"""
+        self.templates.append((template, deque()))
+        self.submitted[id(template)] = {}
+        if template.has_reserved_area():
+            blob_hex = template.block_header.hex()
+            offset = template.reserved_offset * 2
+            self.blob_hex_parts[id(template)] = (blob_hex[:offset], blob_hex[offset + 8:])
+
+        while len(self.templates) > self.max_templates:
+            old_template, job_ids = self.templates.popleft()
+            self.blob_hex_parts.pop(id(old_template), None)
+            self.submitted.pop(id(old_template), None)
+            for job_id in job_ids:
+                self.jobs.pop(job_id, None)
+
+    def get(self, job_id: str) -> Optional[MiningJob]:
+        return self.jobs.get(job_id)
+
+    def blob_hex(self, job: MiningJob) -> str:
+        """Hex blob for a job, spliced from the template's cached hex"""
+        parts = self.blob_hex_parts.get(id(job.template))
+        if not parts:
+            return job.template.block_header.hex()
+        return parts[0] + struct.pack('<I', job.extranonce).hex() + parts[1]
+
+class VardiffController:
+    """Per-connection share difficulty retargeting
+
+    Keeps the timestamps of recent shares and moves the difficulty toward
+    ``target_spm`` shares per minute once per ``retarget_interval``
+    seconds, or early once ``window`` shares have arrived. Retargets are
+    clamped to the network difficulty passed in, since shares are never
+    made harder than a block.
+    """
+
+    def __init__(self, difficulty: int, target_spm: float = 6.0, retarget_interval: float = 30.0,
+                 window: int = 60, variance: float = 0.3,
+                 min_difficulty: int = 100, max_difficulty: Optional[int] = None):
+        self.difficulty = difficulty
+        self.target_spm = target_spm
+        self.retarget_interval = retarget_interval
+        self.variance = variance
+        self.min_difficulty = min_difficulty
+        self.max_difficulty = max_difficulty
+        self.shares: deque = deque(maxlen=window)
+        self.window_start = time.time()
+        self.retargets = 0
+
+    def record_share(self, now: float, network_difficulty: Optional[int] = None) -> Optional[int]:
+        """Add an accepted share; returns the new difficulty if it changed"""
+        self.shares.append(now)
+        if len(self.shares) == self.shares.maxlen:
+            return self.retarget(now, network_difficulty, force=True)
+        return self.retarget(now, network_difficulty)
+
+    def retarget(self, now: float, network_difficulty: Optional[int] = None,
+                 force: bool = False) -> Optional[int]:
+        """Recompute the difficulty if the window has elapsed"""
+        elapsed = now - self.window_start
+        if elapsed <= 0 or (elapsed < self.retarget_interval and not force):
+            return None
+
+        shares = sum(1 for t in self.shares if t >= self.window_start)
+        spm = shares * 60 / elapsed
+        ratio = spm / self.target_spm
+        self.window_start = now
+        self.shares.clear()
+        if abs(ratio - 1) <= self.variance:
+            return None
+
+        # Move at most 4x per retarget so one noisy window cannot overshoot
+        new_difficulty = int(self.difficulty * min(4.0, max(0.25, ratio)))
+        new_difficulty = max(self.min_difficulty, new_difficulty)
+        if self.max_difficulty:
+            new_difficulty = min(self.max_difficulty, new_difficulty)
+        if network_difficulty:
+            new_difficulty = min(network_difficulty, new_difficulty)
+        if new_difficulty == self.difficulty:
+            return None
+
+        self.difficulty = new_difficulty
+        self.retargets += 1
+        return new_difficulty
+
+class MinerConnection:
+    """A connected miner and its bounded outbound queue
+
+    Replies and job pushes are queued as encoded bytes and written by a
+    per-connection task, so a slow socket only delays its own miner. A
+    miner that lets ``max_queue`` messages pile up is disconnected.
+    """
+
+    def __init__(self, conn_id: int, writer, max_queue: int = 256):
+        self.id = conn_id
+        self.writer = writer
+        self.max_queue = max_queue
+        self.pending: deque = deque()
+        self.ready = asyncio.Event()
+        self.closed = False
+        self.overflowed = False
+        self.address: Optional[str] = None
+        self.worker_name: Optional[str] = None
+        self.logged_in = False
+        self.vardiff: Optional[VardiffController] = None
+        self.current_job: Optional[MiningJob] = None
+        self.messages_sent = 0
+        self.queue_high_water = 0
+        self.writer_task = asyncio.create_task(self._writer_loop())
+
+    def send(self, data: bytes) -> bool:
+        """Queue bytes for sending; disconnects the miner on overflow"""
+        if self.closed:
+            return False
+        if len(self.pending) >= self.max_queue:
+            logger.warning(f"Disconnecting slow miner {self.address} ({len(self.pending)} messages queued)")
+            self.overflowed = True
+            self.abort()
+            return False
+        self.pending.append(data)
+        if len(self.pending) > self.queue_high_water:
+            self.queue_high_water = len(self.pending)
+        self.ready.set()
+        return True
+
+    async def _writer_loop(self):
+        """Write queued messages, waiting for the socket to drain"""
+        try:
+            while not self.closed:
+                await self.ready.wait()
+                self.ready.clear()
+                while self.pending and not self.closed:
+                    chunks = list(self.pending)
+                    self.pending.clear()
+                    self.writer.writelines(chunks)
+                    self.messages_sent += len(chunks)
+                    await self.writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            self.abort()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error sending to miner {self.address}: {e}")
+            self.abort()
+
+    def abort(self):
+        """Drop the connection without flushing"""
+        self.closed = True
+        self.pending.clear()
+        self.ready.set()
+        self.writer.transport.abort()
+
+    async def close(self):
+        """Stop the writer task and close the socket"""
+        self.closed = True
+        self.ready.set()
+        self.writer_task.cancel()
+        try:
+            if not self.writer.is_closing():
+                self.writer.close()
+            await self.writer.wait_closed()
+        except Exception:
+            pass
+
+class StratumProtocol(asyncio.Protocol):
+    """Newline-delimited JSON framing straight off the transport
+
+    Incoming bytes are appended to one reusable buffer and split on
+    newlines in place, and each line is decoded from its bytes without an
+    intermediate str. Messages are handled in order by one task per
+    connection; reading pauses while too many are waiting. The protocol
+    also stands in for the StreamWriter a MinerConnection writes to.
+    """
+
+    MAX_LINE = 65536
+    MAX_PENDING = 64
+    INVALID = object()
+
+    def __init__(self, pool: 'RSDTMiningPool'):
+        self.pool = pool
+        self.transport: Optional[asyncio.Transport] = None
+        self.buffer = bytearray()
+        self.messages: deque = deque()
+        self.message_ready = asyncio.Event()
+        self.reading_paused = False
+        self.writing_paused = False
+        self.drain_waiter: Optional[asyncio.Future] = None
+        self.lost = False
+        self.lost_event = asyncio.Event()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        conn = self.pool.open_connection(self)
+        asyncio.create_task(self.pool.serve_protocol(conn, self))
+
+    def data_received(self, data: bytes):
+        buffer = self.buffer
+        buffer += data
+        start = 0
+        while True:
+            end = buffer.find(b'\n', start)
+            if end < 0:
+                break
+            if end > start:
+                try:
+                    self.messages.append(decode_message(buffer[start:end]))
+                except ValueError:
+                    self.messages.append(self.INVALID)
+            start = end + 1
+        if start:
+            del buffer[:start]
+
+        if len(buffer) > self.MAX_LINE:
+            logger.warning(f"Dropping miner {self.get_extra_info('peername')}: line too long")
+            self.transport.abort()
+            return
+        if self.messages:
+            self.message_ready.set()
+            if len(self.messages) >= self.MAX_PENDING and not self.reading_paused:
+                self.reading_paused = True
+                self.transport.pause_reading()
+
+    def eof_received(self):
+        self.message_ready.set()
+        return False
+
+    def connection_lost(self, exc):
+        self.lost = True
+        self.lost_event.set()
+        self.message_ready.set()
+        if self.drain_waiter and not self.drain_waiter.done():
+            self.drain_waiter.set_exception(ConnectionResetError("Connection lost"))
+
+    async def next_message(self):
+        """Next decoded message in arrival order, or None once the peer is gone"""
+        while not self.messages:
+            if self.lost or self.transport.is_closing():
+                return None
+            self.message_ready.clear()
+            await self.message_ready.wait()
+        message = self.messages.popleft()
+        if self.reading_paused and len(self.messages) < self.MAX_PENDING // 4:
+            self.reading_paused = False
+            self.transport.resume_reading()
+        return message
+
+    # Flow control and the StreamWriter subset used by MinerConnection
+
+    def pause_writing(self):
+        self.writing_paused = True
+
+    def resume_writing(self):
+        self.writing_paused = False
+        if self.drain_waiter and not self.drain_waiter.done():
+            self.drain_waiter.set_result(None)
+
+    def writelines(self, chunks):
+        self.transport.writelines(chunks)
+
+    async def drain(self):
+        if self.lost:
+            raise ConnectionResetError("Connection lost")
+        if self.writing_paused:
+            self.drain_waiter = asyncio.get_running_loop().create_future()
+            await self.drain_waiter
+
+    def get_extra_info(self, name, default=None):
+        return self.transport.get_extra_info(name, default)
+
+    def is_closing(self) -> bool:
+        return self.transport.is_closing()
+
+    def close(self):
+        self.transport.close()
+
+    async def wait_closed(self):
+        await self.lost_event.wait()
+
 class RSDTMiningPool:
     """RSDT Mining Pool Server"""
     
@@ -63,6 +1394,60 @@ class RSDTMiningPool:
         self.min_payout = self.config.get('min_payout', 0.1)  # Minimum payout in RSDT
         self.db_path = self.config.get('database', 'rsdt_pool.db')
         self.setup_database()
+        use_json_codec(self.config.get('json_codec', 'auto'))
+        self.database = PoolDatabase(
+            self.db_path,
+            batch_size=self.config.get('db_batch_size', 500),
+            flush_interval=self.config.get('db_flush_interval_ms', 100) / 1000,
+            max_queue=self.config.get('db_queue_size', 10000),
+            share_retention=self.config.get('share_retention_hours', 24) * 3600,
+            rollup_retention=self.config.get('rollup_retention_days', 30) * 86400,
+            analyze_interval=self.config.get('db_analyze_interval', 3600),
+            vacuum_interval=self.config.get('db_vacuum_interval', 86400)
+        )
+        self.validator = ShareValidator(
+            workers=self.config.get('validation_workers'),
+            batch_window=self.config.get('validation_batch_ms', 2) / 1000
+        )
+        self.rpc = DaemonRPCClient(
+            self.daemon_url,
+            timeout=self.config.get('rpc_timeout', 10),
+            pool_size=self.config.get('rpc_pool_size', 8)
+        )
+        self.block_submitter = BlockSubmitter(
+            self.config.get('block_submit_urls') or [self.daemon_url],
+            timeout=self.config.get('block_submit_timeout', 5),
+            keepalive_interval=self.config.get('block_submit_keepalive', 15)
+        )
+        self.block_tasks = set()
+        self.submit_latency = LatencyHistogram()
+        self.loop_lag = LatencyHistogram()
+        self.jobs = JobRegistry(self.config.get('job_history_templates', 3))
+        self.next_extranonce = 1
+        self.extranonce_step = 1
+        self.fast_rejects = {"malformed": 0, "unknown_job": 0, "stale": 0, "duplicate": 0}
+        self.block_candidates = 0
+        self.hashrate = HashrateTracker(
+            bucket_seconds=self.config.get('hashrate_bucket_seconds', 10),
+            window_seconds=self.config.get('hashrate_window_seconds', 3600)
+        )
+        self.pplns = PPLNSWindow()
+        self.pplns_window_factor = self.config.get('pplns_window_factor', 2.0)
+        self.pplns_restored = False
+        self.blocks_credited = 0
+        
+        # Connected miners, keyed by connection id
+        self.connections: Dict[int, MinerConnection] = {}
+        self.next_connection_id = 1
+        self.slow_consumer_disconnects = 0
+        
+        # Template refresh: ZMQ push with polling as the fallback
+        self.template_lock = asyncio.Lock()
+        self.poll_wakeup = asyncio.Event()
+        self.zmq_connected = False
+        self.zmq_last_event = 0.0
+        self.template_updates = {"zmq": 0, "poll": 0}
+        self.block_to_job = {"zmq": LatencyHistogram(), "poll": LatencyHistogram()}
         
     def load_config(self, config_file: str) -> Dict:
         """Load pool configuration"""
@@ -73,7 +1458,42 @@ class RSDTMiningPool:
             "database": "rsdt_pool.db",
             "pool_address": "4A64wDfoaR6Lf1CGww4KanRZXbwrzXFFfE7wjtwvtZu8gVWEyYHzgbpAPiBra5UR5HCjcEFufBMZLRcHj3BCXLfuNf9Sn4N",
             "pool_port": 3333,
-            "api_port": 8080
+            "api_port": 8080,
+            "db_batch_size": 500,
+            "db_flush_interval_ms": 100,
+            "db_queue_size": 10000,
+            "share_retention_hours": 24,
+            "rollup_retention_days": 30,
+            "db_maintenance_interval": 60,
+            "db_analyze_interval": 3600,
+            "db_vacuum_interval": 86400,
+            "validation_workers": None,
+            "validation_batch_ms": 2,
+            "rpc_timeout": 10,
+            "rpc_pool_size": 8,
+            "block_submit_urls": [],
+            "block_submit_timeout": 5,
+            "block_submit_keepalive": 15,
+            "zmq_pub": "tcp://127.0.0.1:18083",
+            "zmq_silence_timeout": 600,
+            "poll_interval": 30,
+            "fallback_poll_min": 1,
+            "fallback_poll_max": 5,
+            "send_queue_size": 256,
+            "stratum_transport": "streams",
+            "json_codec": "auto",
+            "use_uvloop": True,
+            "stratum_workers": 1,
+            "vardiff_start_difficulty": 1000,
+            "vardiff_min_difficulty": 100,
+            "vardiff_max_difficulty": None,
+            "vardiff_target_spm": 6,
+            "vardiff_retarget_interval": 30,
+            "vardiff_variance": 0.3,
+            "job_history_templates": 3,
+            "hashrate_bucket_seconds": 10,
+            "hashrate_window_seconds": 3600,
+            "pplns_window_factor": 2.0
         }
         
         try:
@@ -89,6 +1509,7 @@ class RSDTMiningPool:
     def setup_database(self):
         """Setup SQLite database for pool data"""
         conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
         cursor = conn.cursor()
         
         # Create tables
@@ -104,16 +1525,51 @@ class RSDTMiningPool:
             )
         ''')
         
+        columns = [row[1] for row in cursor.execute('PRAGMA table_info(shares)')]
+        if 'share_data' in columns:
+            cursor.execute('ALTER TABLE shares RENAME TO shares_legacy')
+        
+        # Accepted shares only, with integer nonce and unix timestamp
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS shares (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                miner_address TEXT,
+                id INTEGER PRIMARY KEY,
+                miner_address TEXT NOT NULL,
                 worker_name TEXT,
-                share_data TEXT,
-                difficulty INTEGER,
-                is_valid BOOLEAN,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (miner_address) REFERENCES miners (address)
+                nonce INTEGER,
+                difficulty INTEGER NOT NULL,
+                timestamp INTEGER NOT NULL
+            )
+        ''')
+        
+        if 'share_data' in columns:
+            self.migrate_shares(cursor)
+        
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_shares_miner_time ON shares (miner_address, timestamp)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_shares_time ON shares (timestamp)
+        ''')
+        
+        # Per-minute, per-worker aggregates of raw shares
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS share_rollups (
+                minute INTEGER NOT NULL,
+                miner_address TEXT NOT NULL,
+                worker_name TEXT NOT NULL,
+                shares INTEGER NOT NULL,
+                difficulty INTEGER NOT NULL,
+                PRIMARY KEY (minute, miner_address, worker_name)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_rollups_miner ON share_rollups (miner_address, minute)
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pool_state (
+                key TEXT PRIMARY KEY,
+                value INTEGER
             )
         ''')
         
@@ -132,41 +1588,47 @@ class RSDTMiningPool:
         conn.close()
         logger.info("Database setup complete")
     
+    def migrate_shares(self, cursor):
+        """Copy shares from the old share_data TEXT layout into the compact table"""
+        cursor.execute('''
+            INSERT INTO shares (miner_address, worker_name, nonce, difficulty, timestamp)
+            SELECT miner_address, worker_name,
+                   CASE WHEN share_data LIKE 'nonce:%'
+                        THEN CAST(substr(share_data, 7) AS INTEGER) END,
+                   COALESCE(difficulty, 0),
+                   COALESCE(CAST(strftime('%s', timestamp) AS INTEGER), 0)
+            FROM shares_legacy
+            WHERE is_valid AND miner_address IS NOT NULL
+            ORDER BY id
+        ''')
+        migrated = cursor.rowcount
+        cursor.execute('DROP TABLE shares_legacy')
+        logger.info(f"Migrated {migrated} shares to the compact shares table")
+    
     async def get_block_template(self) -> Optional[BlockTemplate]:
         """Get current block template from daemon"""
         try:
-            async with aiohttp.ClientSession() as session:
-                # Get blockchain info
-                async with session.post(f"{self.daemon_url}/json_rpc", json={
-                    "jsonrpc": "2.0",
-                    "id": "0",
-                    "method": "get_info"
-                }) as response:
-                    info = await response.json()
-                
-                # Get block template
-                async with session.post(f"{self.daemon_url}/json_rpc", json={
-                    "jsonrpc": "2.0",
-                    "id": "0",
-                    "method": "get_block_template",
-                    "params": {
-                        "wallet_address": self.config['pool_address'],
-                        "reserve_size": 60
-                    }
-                }) as response:
-                    template = await response.json()
-                
-                if 'result' in template:
-                    result = template['result']
-                    return BlockTemplate(
-                        height=result['height'],
-                        difficulty=result['difficulty'],
-                        target=bytes.fromhex(result['target']),
-                        block_header=bytes.fromhex(result['blocktemplate_blob']),
-                        coinbase_tx=bytes.fromhex(result['coinbase_tx']),
-                        merkle_root=bytes.fromhex(result['merkle_root']),
-                        timestamp=int(time.time())
-                    )
+            # Blockchain info and block template in one round trip
+            info, result = await self.rpc.batch([
+                ("get_info", None),
+                ("get_block_template", {
+                    "wallet_address": self.config['pool_address'],
+                    "reserve_size": 60
+                })
+            ])
+            
+            return BlockTemplate(
+                height=result['height'],
+                difficulty=result['difficulty'],
+                target=bytes.fromhex(result['target']),
+                block_header=bytes.fromhex(result['blocktemplate_blob']),
+                coinbase_tx=bytes.fromhex(result['coinbase_tx']),
+                merkle_root=bytes.fromhex(result['merkle_root']),
+                timestamp=int(time.time()),
+                prev_hash=result.get('prev_hash', ''),
+                reserved_offset=result.get('reserved_offset', 0),
+                reward=result.get('expected_reward', 0)
+            )
         except Exception as e:
             logger.error(f"Error getting block template: {e}")
         return None
@@ -174,30 +1636,62 @@ class RSDTMiningPool:
     def validate_share(self, miner_address: str, nonce: int, block_template: BlockTemplate) -> bool:
         """Validate a mining share"""
         try:
-            # Create block header with nonce
-            header = block_template.block_header[:76] + struct.pack('<I', nonce)
-            
-            # Calculate hash
-            hash_result = hashlib.sha256(hashlib.sha256(header).digest()).digest()
-            
-            # Check if hash meets difficulty
-            hash_int = int.from_bytes(hash_result, 'little')
-            target_int = int.from_bytes(block_template.target, 'little')
-            
-            return hash_int < target_int
+            return validate_nonces(block_template.block_header[:76], block_template.target, [nonce])[0]
         except Exception as e:
             logger.error(f"Error validating share: {e}")
             return False
     
-    async def submit_share(self, miner_address: str, worker_name: str, nonce: int) -> bool:
-        """Submit and validate a mining share"""
-        if not self.current_block:
-            return False
+    def check_share_fast(self, conn: MinerConnection, job_id: Optional[str],
+                         nonce: int) -> Tuple[Optional[MiningJob], Optional[str]]:
+        """Cheap in-loop checks run before a share reaches the validator
+
+        Returns the share's job, or the rejection reason if the share
+        should not be hashed.
+        """
+        if not 0 <= nonce <= 0xFFFFFFFF:
+            self.fast_rejects["malformed"] += 1
+            return None, "Malformed nonce"
+        
+        job = self.jobs.get(str(job_id)) if job_id else conn.current_job
+        if not job or job.connection_id != conn.id:
+            self.fast_rejects["unknown_job"] += 1
+            return None, "Unknown job"
+        
+        # Templates only change when the chain tip does, so a job on any
+        # template but the current one is stale, even at the same height
+        block = self.current_block
+        if block and job.template is not block:
+            self.fast_rejects["stale"] += 1
+            return None, "Stale job"
+        
+        if nonce in job.submitted:
+            self.fast_rejects["duplicate"] += 1
+            return None, "Duplicate share"
+        job.submitted.add(nonce)
+        return job, None
+    
+    async def submit_share(self, miner_address: str, worker_name: str, nonce: int,
+                           job: MiningJob, received: Optional[float] = None) -> bool:
+        """Submit and validate a mining share for a job
+
+        ``received`` is the perf_counter time the share arrived, used for
+        share-to-submit latency of block candidates.
+        """
+        block = job.template
         
-        # Validate share
-        if not self.validate_share(miner_address, nonce, self.current_block):
+        # Validate share against the job's target
+        hash_value = await self.validator.hash_share(job.header_prefix, nonce)
+        if hash_value >= difficulty_to_target(job.difficulty):
             return False
         
+        # Block candidates go to the daemon before any bookkeeping
+        if hash_value < int.from_bytes(block.target, 'little'):
+            task = asyncio.create_task(self.handle_block_candidate(
+                miner_address, worker_name, nonce, job, hash_value,
+                received if received is not None else time.perf_counter()))
+            self.block_tasks.add(task)
+            task.add_done_callback(self.block_tasks.discard)
+        
         # Update miner stats
         miner_key = f"{miner_address}.{worker_name}"
         if miner_key not in self.miners:
@@ -213,48 +1707,128 @@ class RSDTMiningPool:
         miner.shares_accepted += 1
         miner.last_share_time = time.time()
         
-        # Save to database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO miners 
-            (address, worker_name, total_shares, accepted_shares, last_seen)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (miner_address, worker_name, miner.shares_submitted, miner.shares_accepted, datetime.now()))
-        
-        cursor.execute('''
-            INSERT INTO shares 
-            (miner_address, worker_name, share_data, difficulty, is_valid)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (miner_address, worker_name, f"nonce:{nonce}", self.current_block.difficulty, True))
-        
-        conn.commit()
-        conn.close()
+        await self.account_share(ShareRecord(
+            miner_address=miner_address,
+            worker_name=worker_name,
+            nonce=nonce,
+            difficulty=job.difficulty,
+            total_shares=miner.shares_submitted,
+            accepted_shares=miner.shares_accepted,
+            timestamp=miner.last_share_time
+        ), block.difficulty)
         
         logger.info(f"Valid share from {miner_address}.{worker_name}")
         return True
     
+    async def account_share(self, record: ShareRecord, network_difficulty: int):
+        """Feed an accepted share to hashrate, the PPLNS window and the share writer"""
+        self.hashrate.record(record.miner_address, record.worker_name, record.difficulty,
+                             record.timestamp)
+        
+        # PPLNS window spans a multiple of the network difficulty
+        window = int(network_difficulty * self.pplns_window_factor)
+        if window != self.pplns.window_difficulty:
+            self.pplns.resize(window)
+        self.pplns.add(record.miner_address, record.difficulty)
+        
+        # Queue for the batched writer
+        await self.database.submit(record)
+    
+    async def handle_block_candidate(self, miner_address: str, worker_name: str,
+                                     nonce: int, job: MiningJob, hash_value: int,
+                                     received: float):
+        """Submit a share that also meets the network target, then credit it
+
+        Runs as its own task so the miner's reply is not held up; by the
+        time the daemon answers, the share itself is in the PPLNS window.
+        """
+        block = job.template
+        self.block_candidates += 1
+        accepted = await self.block_submitter.submit(
+            block.solved_blob(job.extranonce, nonce).hex(), received)
+        if not accepted:
+            logger.error(f"Block candidate at height {block.height} from "
+                         f"{miner_address}.{worker_name} was not accepted (nonce {nonce})")
+            return
+        logger.info(f"Block found at height {block.height} by {miner_address}.{worker_name} "
+                    f"(nonce {nonce}, {(time.perf_counter() - received) * 1000:.1f} ms after the share)")
+        await self.credit_block(block, hash_value.to_bytes(32, 'little').hex())
+    
+    async def restore_pplns_window(self, template: BlockTemplate):
+        """Refill the PPLNS window from stored work after a restart"""
+        window = int(template.difficulty * self.pplns_window_factor)
+        try:
+            work = await self.database.recent_work(window)
+        except Exception as e:
+            logger.error(f"Error restoring PPLNS window: {e}")
+            return
+        self.pplns.resize(window)
+        for address, difficulty in work:
+            self.pplns.add(address, difficulty)
+        self.pplns_restored = True
+        logger.info(f"Restored PPLNS window: {len(self.pplns.totals)} miners, "
+                    f"difficulty {self.pplns.total_difficulty}")
+    
+    async def credit_block(self, block: BlockTemplate, block_hash: str):
+        """Split a block reward over the PPLNS window and credit balances"""
+        payouts, fee = self.pplns.split(block.reward, self.pool_fee)
+        try:
+            credited = await self.database.credit_block(
+                block.height, block_hash, block.reward / COIN, fee / COIN,
+                {address: amount / COIN for address, amount in payouts.items() if amount > 0}
+            )
+        except Exception as e:
+            logger.error(f"Error crediting block {block.height}: {e}")
+            return
+        if credited:
+            self.blocks_credited += 1
+            logger.info(f"Block {block.height}: credited {block.reward / COIN:.12f} RSDT "
+                        f"to {len(payouts)} miners (fee {fee / COIN:.12f} RSDT)")
+    
+    def open_connection(self, writer) -> MinerConnection:
+        """Register a new miner connection"""
+        conn = MinerConnection(self.next_connection_id, writer,
+                               self.config.get('send_queue_size', 256))
+        self.next_connection_id += 1
+        self.connections[conn.id] = conn
+        logger.info(f"Miner connected from {writer.get_extra_info('peername')}")
+        return conn
+    
+    async def close_connection(self, conn: MinerConnection):
+        """Unregister a miner connection and close its socket"""
+        del self.connections[conn.id]
+        if conn.overflowed:
+            self.slow_consumer_disconnects += 1
+        addr = conn.writer.get_extra_info('peername')
+        await conn.close()
+        logger.info(f"Miner disconnected from {addr}")
+    
+    async def dispatch_message(self, message, conn: MinerConnection):
+        """Handle one decoded message, replying with an error if it fails"""
+        try:
+            await self.process_miner_message(message, conn)
+        except Exception as e:
+            logger.error(f"Error processing message: {e}")
+            await self.send_error(conn, "Internal error")
+    
     async def handle_miner_connection(self, reader, writer):
         """Handle incoming miner connections"""
         addr = writer.get_extra_info('peername')
-        logger.info(f"Miner connected from {addr}")
+        conn = self.open_connection(writer)
         
         try:
-            while True:
+            while not conn.closed:
                 try:
                     data = await reader.readline()
                     if not data:
                         break
                     
                     try:
-                        message = json.loads(data.decode().strip())
-                        await self.process_miner_message(message, writer)
-                    except json.JSONDecodeError:
-                        await self.send_error(writer, "Invalid JSON")
-                    except Exception as e:
-                        logger.error(f"Error processing message: {e}")
-                        await self.send_error(writer, "Internal error")
+                        message = decode_message(data)
+                    except ValueError:
+                        await self.send_error(conn, "Invalid JSON")
+                        continue
+                    await self.dispatch_message(message, conn)
                         
                 except ConnectionResetError:
                     logger.info(f"Miner {addr} disconnected (connection reset)")
@@ -266,152 +1840,511 @@ class RSDTMiningPool:
         except Exception as e:
             logger.error(f"Connection error: {e}")
         finally:
-            try:
-                if not writer.is_closing():
-                    writer.close()
-                    await writer.wait_closed()
-            except Exception:
-                pass
-            logger.info(f"Miner disconnected from {addr}")
+            await self.close_connection(conn)
+    
+    async def serve_protocol(self, conn: MinerConnection, protocol: StratumProtocol):
+        """Handle messages framed by a StratumProtocol, in order"""
+        try:
+            while not conn.closed:
+                message = await protocol.next_message()
+                if message is None:
+                    break
+                if message is StratumProtocol.INVALID:
+                    await self.send_error(conn, "Invalid JSON")
+                    continue
+                await self.dispatch_message(message, conn)
+        except Exception as e:
+            logger.error(f"Connection error: {e}")
+        finally:
+            await self.close_connection(conn)
     
-    async def process_miner_message(self, message: Dict, writer):
+    async def process_miner_message(self, message: Dict, conn):
         """Process messages from miners"""
         method = message.get('method')
         
         if method == 'login':
-            await self.handle_login(message, writer)
+            await self.handle_login(message, conn)
         elif method == 'submit':
-            await self.handle_submit(message, writer)
+            await self.handle_submit(message, conn)
         elif method == 'getjob':
-            await self.handle_getjob(message, writer)
+            await self.handle_getjob(message, conn)
         else:
-            await self.send_error(writer, f"Unknown method: {method}")
+            await self.send_error(conn, f"Unknown method: {method}")
     
-    async def handle_login(self, message: Dict, writer):
+    async def handle_login(self, message: Dict, conn):
         """Handle miner login"""
         params = message.get('params', {})
         address = params.get('login')
         worker = params.get('pass', 'default')
         
         if not address:
-            await self.send_error(writer, "Missing login address")
+            await self.send_error(conn, "Missing login address")
             return
         
+        conn.address = address
+        conn.worker_name = worker
+        conn.vardiff = self.new_vardiff()
+        
         # Send login success
         response = {
             "id": message.get('id'),
             "result": {
                 "status": "OK",
-                "job": await self.get_job_data()
+                "job": await self.get_job_data(conn)
             }
         }
         
-        await self.send_response(writer, response)
+        conn.logged_in = True
+        await self.send_response(conn, response)
         logger.info(f"Miner logged in: {address}.{worker}")
     
-    async def handle_submit(self, message: Dict, writer):
+    async def handle_submit(self, message: Dict, conn):
         """Handle share submission"""
+        start = time.perf_counter()
         params = message.get('params', {})
         address = params.get('login')
         worker = params.get('pass', 'default')
         nonce = params.get('nonce')
         
         if not all([address, nonce]):
-            await self.send_error(writer, "Missing required parameters")
+            await self.send_error(conn, "Missing required parameters", message.get('id'))
+            return
+        
+        try:
+            nonce = int(nonce)
+        except (TypeError, ValueError):
+            nonce = -1
+        
+        job, reject_reason = self.check_share_fast(conn, params.get('job_id'), nonce)
+        if reject_reason:
+            await self.send_error(conn, reject_reason, message.get('id'))
+            self.submit_latency.record(time.perf_counter() - start)
             return
         
         # Submit share
-        success = await self.submit_share(address, worker, int(nonce))
+        success = await self.submit_share(address, worker, nonce, job, start)
         
-        response = {
-            "id": message.get('id'),
-            "result": {
-                "status": "OK" if success else "ERROR"
-            }
-        }
+        if success:
+            conn.send(ok_reply(message.get('id')))
+        else:
+            await self.send_response(conn, {"id": message.get('id'), "result": {"status": "ERROR"}})
+        self.submit_latency.record(time.perf_counter() - start)
         
-        await self.send_response(writer, response)
+        # Retarget and hand out a job if the share difficulty changed
+        if (success and conn.vardiff and
+                conn.vardiff.record_share(time.time(), job.template.difficulty) and
+                self.difficulty_changed(conn)):
+            await self.send_job(conn)
     
-    async def handle_getjob(self, message: Dict, writer):
+    async def handle_getjob(self, message: Dict, conn):
         """Handle job request"""
         response = {
             "id": message.get('id'),
-            "result": await self.get_job_data()
+            "result": await self.get_job_data(conn)
         }
         
-        await self.send_response(writer, response)
+        await self.send_response(conn, response)
+    
+    def new_vardiff(self) -> VardiffController:
+        """Create a vardiff controller from the pool configuration"""
+        return VardiffController(
+            difficulty=self.config.get('vardiff_start_difficulty', 1000),
+            target_spm=self.config.get('vardiff_target_spm', 6),
+            retarget_interval=self.config.get('vardiff_retarget_interval', 30),
+            variance=self.config.get('vardiff_variance', 0.3),
+            min_difficulty=self.config.get('vardiff_min_difficulty', 100),
+            max_difficulty=self.config.get('vardiff_max_difficulty')
+        )
+    
+    def share_difficulty(self, conn: MinerConnection) -> int:
+        """Difficulty of the next job for a connection, capped at the network's"""
+        network_difficulty = self.current_block.difficulty
+        if conn.vardiff:
+            return min(conn.vardiff.difficulty, network_difficulty)
+        return network_difficulty
     
-    async def get_job_data(self) -> Dict:
+    def difficulty_changed(self, conn: MinerConnection) -> bool:
+        """Whether a connection's current job is not at its share difficulty"""
+        return not conn.current_job or conn.current_job.difficulty != self.share_difficulty(conn)
+    
+    def new_job(self, conn: MinerConnection, difficulty: int) -> MiningJob:
+        """Register a job on the current template for a connection
+
+        Each job gets a fresh extranonce, so a miner that restarts its
+        nonce range on a new job hashes new work instead of repeating
+        shares it already submitted.
+        """
+        extranonce = self.next_extranonce
+        self.next_extranonce = (self.next_extranonce + self.extranonce_step) & 0xFFFFFFFF
+        job = self.jobs.create(self.current_block, conn.id, extranonce, difficulty)
+        conn.current_job = job
+        return job
+    
+    async def get_job_data(self, conn: MinerConnection) -> Dict:
         """Get current job data for miners"""
         if not self.current_block:
-            self.current_block = await self.get_block_template()
+            template = await self.get_block_template()
+            if template and not self.pplns_restored:
+                await self.restore_pplns_window(template)
+            self.current_block = self.current_block or template
         
         if self.current_block:
+            job = self.new_job(conn, self.share_difficulty(conn))
             return {
-                "job_id": f"job_{self.current_block.height}_{int(time.time())}",
-                "blob": self.current_block.block_header.hex(),
-                "target": self.current_block.target.hex(),
+                "job_id": job.job_id,
+                "blob": self.jobs.blob_hex(job),
+                "target": difficulty_to_target(job.difficulty).to_bytes(32, 'little').hex(),
                 "height": self.current_block.height,
-                "difficulty": self.current_block.difficulty
+                "difficulty": job.difficulty
             }
         else:
             return {"error": "No block template available"}
     
-    async def send_response(self, writer, response: Dict):
-        """Send response to miner"""
-        try:
-            data = json.dumps(response) + '\n'
-            writer.write(data.encode())
-            await writer.drain()
-        except (ConnectionResetError, BrokenPipeError):
-            logger.info("Connection lost while sending response")
-        except Exception as e:
-            logger.error(f"Error sending response: {e}")
+    async def send_job(self, conn: MinerConnection):
+        """Push a fresh job to one miner"""
+        notification = {
+            "jsonrpc": "2.0",
+            "method": "job",
+            "params": await self.get_job_data(conn)
+        }
+        await self.send_response(conn, notification)
+    
+    async def send_response(self, conn: 'MinerConnection', response: Dict):
+        """Queue a response for the miner's writer task"""
+        conn.send(encode_line(response))
     
-    async def send_error(self, writer, error: str):
+    async def send_error(self, conn, error: str, request_id=None):
         """Send error to miner"""
         response = {
             "error": error,
             "result": None
         }
-        await self.send_response(writer, response)
+        if request_id is not None:
+            response["id"] = request_id
+        await self.send_response(conn, response)
+    
+    def connected_miners(self) -> int:
+        """Number of logged-in miner connections"""
+        return sum(1 for c in self.connections.values() if c.logged_in)
+    
+    def get_metrics(self) -> Dict:
+        """Collect internal performance metrics"""
+        return {
+            "share_writer": self.database.metrics(),
+            "validator": self.validator.metrics(),
+            "daemon_rpc": self.rpc.metrics(),
+            "block_submit": self.block_submitter.metrics(),
+            "template_updates": dict(self.template_updates),
+            "block_to_job": {source: histogram.snapshot()
+                             for source, histogram in self.block_to_job.items()},
+            "zmq_healthy": self.zmq_healthy(),
+            "fast_rejects": dict(self.fast_rejects),
+            "submit_latency": self.submit_latency.snapshot(),
+            "loop_lag": self.loop_lag.snapshot(),
+            "connections": len(self.connections),
+            "connected_miners": self.connected_miners(),
+            "send_queue_high_water": max((c.queue_high_water for c in self.connections.values()), default=0),
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+            "block_candidates": self.block_candidates,
+            "blocks_credited": self.blocks_credited,
+            "pplns": self.pplns.metrics(),
+            "jobs_tracked": len(self.jobs.jobs),
+            "jobs_created": self.jobs.jobs_created
+        }
+    
+    def template_changed(self, template: BlockTemplate) -> bool:
+        """Whether a fetched template builds on a different chain tip"""
+        if not self.current_block:
+            return True
+        if template.height != self.current_block.height:
+            return True
+        return bool(template.prev_hash) and template.prev_hash != self.current_block.prev_hash
+    
+    async def refresh_template(self, source: str, started: float) -> bool:
+        """Fetch a template and push it to every miner if the chain moved"""
+        async with self.template_lock:
+            new_template = await self.get_block_template()
+            if not new_template or not self.template_changed(new_template):
+                return False
+            
+            if not self.pplns_restored:
+                await self.restore_pplns_window(new_template)
+            self.current_block = new_template
+            await self.publish_template(new_template)
+            
+            self.template_updates[source] += 1
+            self.block_to_job[source].record(time.perf_counter() - started)
+            logger.info(f"Updated block template: height {new_template.height} ({source})")
+            return True
+    
+    async def publish_template(self, template: BlockTemplate):
+        """Hand a new current template to miners"""
+        await self.broadcast_job()
+    
+    async def broadcast_job(self):
+        """Push the current job to all logged-in miners at once
+
+        Every miner gets its own job id and extranonce, so the notification
+        is serialized once per difficulty group around those two fields and
+        each miner's copy is spliced together from the pre-encoded pieces.
+        """
+        block = self.current_block
+        groups: Dict[int, List[MinerConnection]] = {}
+        for conn in self.connections.values():
+            if conn.logged_in:
+                groups.setdefault(self.share_difficulty(conn), []).append(conn)
+        
+        for difficulty, connections in groups.items():
+            target = difficulty_to_target(difficulty).to_bytes(32, 'little').hex()
+            head = b'{"jsonrpc": "2.0", "method": "job", "params": {"job_id": "'
+            tail = (f'", "target": "{target}", "height": {block.height}, '
+                    f'"difficulty": {difficulty}}}}}\n').encode()
+            for conn in connections:
+                job = self.new_job(conn, difficulty)
+                conn.send(b''.join((head, job.job_id.encode(), b'", "blob": "',
+                                    self.jobs.blob_hex(job).encode(), tail)))
+    
+    async def vardiff_sweep(self):
+        """Retarget miners that have gone quiet and send them easier jobs"""
+        interval = min(5, self.config.get('vardiff_retarget_interval', 30))
+        while True:
+            await asyncio.sleep(interval)
+            block = self.current_block
+            if not block:
+                continue
+            now = time.time()
+            for conn in list(self.connections.values()):
+                if (conn.logged_in and conn.vardiff and
+                        conn.vardiff.retarget(now, block.difficulty) and
+                        self.difficulty_changed(conn)):
+                    await self.send_job(conn)
+    
+    def zmq_healthy(self) -> bool:
+        """Whether ZMQ notifications can be relied on instead of fast polling"""
+        return (self.zmq_connected and
+                time.time() - self.zmq_last_event < self.config.get('zmq_silence_timeout', 600))
+    
+    def zmq_event_is_new(self, topic: str, event: Dict) -> bool:
+        """Whether a ZMQ event announces a tip the current template does not build on"""
+        block = self.current_block
+        if not block:
+            return True
+        if topic == 'json-minimal-chain_main':
+            ids = event.get('ids') or []
+            height = event.get('first_height', 0) + len(ids)
+            prev_hash = ids[-1] if ids else ''
+        else:
+            height = event.get('height', 0)
+            prev_hash = event.get('prev_id', '')
+        if height != block.height:
+            return True
+        return bool(prev_hash) and bool(block.prev_hash) and prev_hash != block.prev_hash
+    
+    async def zmq_listener(self):
+        """Refresh the template as soon as the daemon announces a new block"""
+        url = self.config.get('zmq_pub')
+        if not url:
+            return
+        if zmq is None:
+            logger.warning("pyzmq not installed, using polling for block templates")
+            return
+        
+        topics = ('json-minimal-chain_main', 'json-full-miner_data')
+        while True:
+            socket = zmq.asyncio.Context.instance().socket(zmq.SUB)
+            try:
+                socket.connect(url)
+                for topic in topics:
+                    socket.setsockopt_string(zmq.SUBSCRIBE, topic)
+                self.zmq_connected = True
+                logger.info(f"Subscribed to daemon ZMQ notifications at {url}")
+                
+                while True:
+                    message = await socket.recv()
+                    started = time.perf_counter()
+                    self.zmq_last_event = time.time()
+                    topic, _, payload = message.decode().partition(':')
+                    if self.zmq_event_is_new(topic, json.loads(payload)):
+                        await self.refresh_template("zmq", started)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"ZMQ listener error: {e}")
+            finally:
+                self.zmq_connected = False
+                self.poll_wakeup.set()
+                socket.close(linger=0)
+            
+            await asyncio.sleep(5)
     
     async def update_block_template(self):
-        """Periodically update block template"""
+        """Poll for templates: slowly while ZMQ is healthy, adaptively otherwise"""
+        poll_min = self.config.get('fallback_poll_min', 1)
+        poll_max = self.config.get('fallback_poll_max', 5)
+        interval = poll_min
         while True:
+            changed = False
             try:
-                new_template = await self.get_block_template()
-                if new_template and (not self.current_block or new_template.height > self.current_block.height):
-                    self.current_block = new_template
-                    logger.info(f"Updated block template: height {new_template.height}")
+                changed = await self.refresh_template("poll", time.perf_counter())
             except Exception as e:
                 logger.error(f"Error updating block template: {e}")
             
-            await asyncio.sleep(30)  # Update every 30 seconds
+            if self.zmq_healthy():
+                interval = self.config.get('poll_interval', 30)
+            elif changed:
+                interval = poll_min
+            else:
+                interval = min(interval * 1.5, poll_max)
+            
+            # A dropped ZMQ subscription wakes the poller early
+            self.poll_wakeup.clear()
+            try:
+                await asyncio.wait_for(self.poll_wakeup.wait(), interval)
+                interval = poll_min
+            except asyncio.TimeoutError:
+                pass
+    
+    async def hashrate_sweep(self):
+        """Refresh Miner.hashrate and drop idle series once per bucket"""
+        while True:
+            await asyncio.sleep(self.hashrate.bucket_seconds)
+            now = time.time()
+            self.hashrate.prune(now)
+            for miner in self.miners.values():
+                workers = self.hashrate.workers.get(miner.address, {})
+                series = workers.get(miner.worker_name)
+                miner.hashrate = series.rate(600, now) if series else 0.0
+    
+    async def monitor_loop_lag(self, interval: float = 0.1):
+        """Record how late the event loop wakes up a periodic timer"""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(interval)
+            self.loop_lag.record(max(0.0, loop.time() - start - interval))
+    
+    async def storage_maintenance(self):
+        """Periodically roll up, prune and optimise the pool database"""
+        while True:
+            await asyncio.sleep(self.config.get('db_maintenance_interval', 60))
+            await self.database.maintain()
+    
+    async def api_stats(self, request):
+        """GET /stats - pool-wide statistics"""
+        now = time.time()
+        block = self.current_block
+        stats = self.hashrate.pool_stats(now)
+        stats.update({
+            "pool_name": "RSDT Mining Pool",
+            "connected_miners": self.connected_miners(),
+            "height": block.height if block else None,
+            "network_difficulty": block.difficulty if block else None,
+            "block_candidates": self.block_candidates,
+            "pool_fee": self.pool_fee
+        })
+        return web.json_response(stats)
+    
+    async def api_miner_stats(self, request):
+        """GET /stats/miner/{address} - hashrate and 24 h hourly history of one address"""
+        address = request.match_info['address']
+        now = time.time()
+        history = await self.database.miner_history(address, now - 86400)
+        stats = self.hashrate.address_stats(address, now)
+        if stats is None:
+            if not history:
+                return web.json_response({"error": "Miner not found"}, status=404)
+            stats = {"address": address, "hashrate": self.hashrate.rates(None, now), "workers": {}}
+        stats["history"] = history
+        return web.json_response(stats)
+    
+    async def api_metrics(self, request):
+        """GET /metrics - internal performance counters"""
+        return web.json_response(self.get_metrics())
+    
+    async def start_api(self) -> web.AppRunner:
+        """Serve the stats API on api_port"""
+        app = web.Application()
+        app.router.add_get('/stats', self.api_stats)
+        app.router.add_get('/stats/miner/{address}', self.api_miner_stats)
+        app.router.add_get('/metrics', self.api_metrics)
+        
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, '0.0.0.0', self.config['api_port'])
+        await site.start()
+        logger.info(f"Stats API listening on port {self.config['api_port']}")
+        return runner
+    
+    async def start_stratum_server(self, reuse_port: bool = False):
+        """Listen for miners on pool_port with the configured transport"""
+        if self.config.get('stratum_transport') == 'protocol':
+            server = await asyncio.get_running_loop().create_server(
+                lambda: StratumProtocol(self),
+                '0.0.0.0',
+                self.config['pool_port'],
+                reuse_port=reuse_port
+            )
+        else:
+            server = await asyncio.start_server(
+                self.handle_miner_connection,
+                '0.0.0.0',
+                self.config['pool_port'],
+                reuse_port=reuse_port
+            )
+        
+        logger.info(f"Pool server listening on port {self.config['pool_port']} "
+                    f"({self.config.get('stratum_transport', 'streams')} transport, {json_codec} JSON)")
+        return server
     
     async def run_pool(self):
         """Run the mining pool server"""
         logger.info("Starting RSDT Mining Pool Server")
         
-        # Start block template updater
+        # Start validator, share writer and block template updater
+        await self.validator.start()
+        await self.database.start()
         asyncio.create_task(self.update_block_template())
+        asyncio.create_task(self.zmq_listener())
+        asyncio.create_task(self.vardiff_sweep())
+        asyncio.create_task(self.hashrate_sweep())
+        asyncio.create_task(self.storage_maintenance())
+        asyncio.create_task(self.monitor_loop_lag())
+        asyncio.create_task(self.block_submitter.keep_warm())
+        api_runner = await self.start_api()
         
-        # Start pool server
-        server = await asyncio.start_server(
-            self.handle_miner_connection,
-            '0.0.0.0',
-            self.config['pool_port']
-        )
+        server = await self.start_stratum_server()
         
-        logger.info(f"Pool server listening on port {self.config['pool_port']}")
+        # SIGTERM shuts down cleanly so queued shares and validator processes are not lost
+        stop = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
         
-        async with server:
-            await server.serve_forever()
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            await api_runner.cleanup()
+            # Let in-flight block submits finish and credit before the writer closes
+            await asyncio.gather(*self.block_tasks, return_exceptions=True)
+            await self.block_submitter.close()
+            await self.database.close()
+            await self.validator.close()
+            await self.rpc.close()
 
 def main():
     """Main entry point"""
     pool = RSDTMiningPool()
     
+    workers = pool.config.get('stratum_workers', 1)
+    if workers != 1:
+        # Multi-process front end: fetcher, accounting and K SO_REUSEPORT workers
+        from rsdt_pool_supervisor import PoolSupervisor
+        PoolSupervisor("pool_config.json", workers or os.cpu_count() or 1).run()
+        return
+    
+    if pool.config.get('use_uvloop', True) and uvloop is not None:
+        uvloop.install()
+        logger.info("Using uvloop event loop")
+    
     try:
         asyncio.run(pool.run_pool())
     except KeyboardInterrupt:
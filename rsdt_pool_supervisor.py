@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+RSDT Mining Pool Supervisor
+Multi-process front end for rsdt_mining_pool.py
+
+With ``stratum_workers`` set above 1 the pool runs as a supervisor that
+forks:
+
+* one template fetcher, which follows the daemon (ZMQ and polling) and
+  pushes every new template down a pipe to each worker and to accounting
+* K Stratum workers, each binding pool_port with SO_REUSEPORT so the
+  kernel spreads miners over them; a worker validates its own miners'
+  shares, submits block candidates to the daemon itself and forwards
+  accepted shares to accounting in batches
+* one accounting process, which owns the share writer, the PPLNS window,
+  hashrate tracking, block crediting, storage maintenance and the API
+
+Children that die are restarted. The pipes are created by the supervisor,
+which keeps its copies, so a restarted child picks up the same channels.
+"""
+
+import asyncio
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from rsdt_mining_pool import (BlockTemplate, Miner, RSDTMiningPool, ShareRecord, ShareValidator,
+                              logger, uvloop)
+
+
+async def pipe_messages(conn, stop: Optional[asyncio.Event] = None):
+    """Objects received on a multiprocessing pipe, without blocking the loop
+
+    Once ``stop`` is set, whatever is still buffered in the pipe is
+    yielded before the iteration ends.
+    """
+    loop = asyncio.get_running_loop()
+    ready = asyncio.Event()
+    loop.add_reader(conn.fileno(), ready.set)
+    stopped = asyncio.ensure_future(stop.wait()) if stop else None
+    try:
+        while True:
+            while conn.poll():
+                yield conn.recv()
+            if stop is not None and stop.is_set():
+                return
+            ready.clear()
+            if stopped is None:
+                await ready.wait()
+            else:
+                waiter = asyncio.ensure_future(ready.wait())
+                await asyncio.wait((waiter, stopped), return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+    except (EOFError, OSError):
+        return
+    finally:
+        loop.remove_reader(conn.fileno())
+        if stopped:
+            stopped.cancel()
+
+
+def termination_event() -> asyncio.Event:
+    """Event set when the process receives SIGTERM"""
+    stop = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    return stop
+
+
+class TemplateFetcher(RSDTMiningPool):
+    """Follows the daemon and pushes each new template to every subscriber"""
+
+    def __init__(self, config_file: str, subscribers: List):
+        super().__init__(config_file)
+        self.subscribers = subscribers
+        # Shares are accounted in another process, there is no window to restore
+        self.pplns_restored = True
+
+    async def publish_template(self, template: BlockTemplate):
+        for conn in self.subscribers:
+            try:
+                conn.send(template)
+            except OSError as e:
+                logger.warning(f"Could not push template {template.height}: {e}")
+
+    async def serve(self):
+        stop = termination_event()
+        tasks = [asyncio.create_task(self.update_block_template()),
+                 asyncio.create_task(self.zmq_listener())]
+        logger.info(f"Template fetcher started for {len(self.subscribers)} subscribers")
+        await stop.wait()
+        for task in tasks:
+            task.cancel()
+        await self.rpc.close()
+
+
+class StratumWorker(RSDTMiningPool):
+    """One SO_REUSEPORT Stratum front end
+
+    Accepted shares are batched and sent to accounting every
+    ``FLUSH_INTERVAL`` seconds or ``FLUSH_SIZE`` shares. Block candidates
+    flush the batch first, so accounting sees every share before the block.
+    """
+
+    FLUSH_INTERVAL = 0.05
+    FLUSH_SIZE = 256
+    METRICS_INTERVAL = 5
+
+    def __init__(self, config_file: str, worker_id: int, workers: int, templates, accounting):
+        super().__init__(config_file)
+        self.worker_id = worker_id
+        self.templates = templates
+        self.accounting = accounting
+        self.outbox: List = []
+        self.outbox_ready = asyncio.Event()
+        self.ipc = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rsdt-ipc')
+        self.pplns_restored = True
+        self.template_updates["pipe"] = 0
+
+        # Disjoint extranonce sequences, so no two workers hand out the same blob
+        self.next_extranonce = worker_id + 1
+        self.extranonce_step = workers
+
+        # Workers already spread over the cores; hash inline unless configured
+        if self.config.get('validation_workers') is None:
+            self.validator = ShareValidator(
+                workers=0,
+                batch_window=self.config.get('validation_batch_ms', 2) / 1000
+            )
+
+    async def account_share(self, record: ShareRecord, network_difficulty: int):
+        self.outbox.append((record, network_difficulty))
+        if len(self.outbox) >= self.FLUSH_SIZE:
+            self.outbox_ready.set()
+
+    async def credit_block(self, block: BlockTemplate, block_hash: str):
+        await self.flush_outbox()
+        await self.send_to_accounting(("block", self.worker_id, block, block_hash))
+
+    async def send_to_accounting(self, message):
+        # A single IPC thread keeps messages in order and the loop unblocked
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.ipc, self.accounting.send, message)
+
+    async def flush_outbox(self):
+        if self.outbox:
+            batch, self.outbox = self.outbox, []
+            await self.send_to_accounting(("shares", self.worker_id, batch))
+
+    async def forward_shares(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.outbox_ready.wait(), self.FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self.outbox_ready.clear()
+            try:
+                await self.flush_outbox()
+            except OSError as e:
+                logger.error(f"Worker {self.worker_id} lost the accounting pipe: {e}")
+
+    async def report_metrics(self):
+        while True:
+            await asyncio.sleep(self.METRICS_INTERVAL)
+            try:
+                await self.send_to_accounting(("metrics", self.worker_id, self.get_metrics()))
+            except OSError:
+                pass
+
+    async def follow_templates(self):
+        """Switch to templates pushed by the fetcher"""
+        async for template in pipe_messages(self.templates):
+            started = time.perf_counter()
+            async with self.template_lock:
+                current = self.current_block
+                # A restarted worker may find older templates queued in its pipe
+                if current and template.height < current.height:
+                    continue
+                if not self.template_changed(template):
+                    continue
+                self.current_block = template
+                await self.publish_template(template)
+                self.template_updates["pipe"] += 1
+            logger.info(f"Worker {self.worker_id} switched to height {template.height} "
+                        f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    async def serve(self):
+        stop = termination_event()
+        await self.validator.start()
+        tasks = [asyncio.create_task(coro) for coro in (
+            self.follow_templates(), self.forward_shares(), self.report_metrics(),
+            self.vardiff_sweep(), self.monitor_loop_lag(), self.block_submitter.keep_warm())]
+        server = await self.start_stratum_server(reuse_port=True)
+        logger.info(f"Stratum worker {self.worker_id} started (pid {os.getpid()})")
+
+        await stop.wait()
+        server.close()
+        for conn in list(self.connections.values()):
+            conn.abort()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*self.block_tasks, return_exceptions=True)
+        await self.flush_outbox()
+        await self.validator.close()
+        await self.block_submitter.close()
+        await self.rpc.close()
+        self.ipc.shutdown(wait=True)
+
+
+class AccountingPool(RSDTMiningPool):
+    """Single owner of shares, balances and statistics for all workers"""
+
+    def __init__(self, config_file: str, templates, workers: List):
+        super().__init__(config_file)
+        self.templates = templates
+        self.worker_pipes = workers
+        self.worker_metrics: Dict[int, Dict] = {}
+
+    async def account_share(self, record: ShareRecord, network_difficulty: int):
+        # Workers count per process; per-miner totals are kept here
+        key = f"{record.miner_address}.{record.worker_name}"
+        miner = self.miners.get(key)
+        if miner is None:
+            miner = self.miners[key] = Miner(
+                address=record.miner_address,
+                worker_name=record.worker_name,
+                connection_time=record.timestamp,
+                last_share_time=record.timestamp
+            )
+        miner.shares_submitted += 1
+        miner.shares_accepted += 1
+        miner.last_share_time = record.timestamp
+        record.total_shares = miner.shares_submitted
+        record.accepted_shares = miner.shares_accepted
+        await super().account_share(record, network_difficulty)
+
+    def connected_miners(self) -> int:
+        return sum(metrics.get("connected_miners", 0) for metrics in self.worker_metrics.values())
+
+    def get_metrics(self) -> Dict:
+        metrics = super().get_metrics()
+        metrics["workers"] = self.worker_metrics
+        return metrics
+
+    async def follow_templates(self):
+        async for template in pipe_messages(self.templates):
+            if not self.pplns_restored:
+                await self.restore_pplns_window(template)
+            self.current_block = template
+
+    async def consume_worker(self, conn, stop: asyncio.Event):
+        async for kind, worker_id, *payload in pipe_messages(conn, stop):
+            if kind == "shares":
+                for record, network_difficulty in payload[0]:
+                    await self.account_share(record, network_difficulty)
+            elif kind == "block":
+                block, block_hash = payload
+                self.block_candidates += 1
+                await self.credit_block(block, block_hash)
+            elif kind == "metrics":
+                self.worker_metrics[worker_id] = payload[0]
+
+    async def serve(self):
+        stop = termination_event()
+        await self.database.start()
+        tasks = [asyncio.create_task(coro) for coro in (
+            self.follow_templates(), self.hashrate_sweep(), self.storage_maintenance(),
+            self.monitor_loop_lag())]
+        consumers = [asyncio.create_task(self.consume_worker(conn, stop))
+                     for conn in self.worker_pipes]
+        api_runner = await self.start_api()
+        logger.info(f"Accounting started for {len(self.worker_pipes)} workers")
+
+        await stop.wait()
+        # Workers are stopped first; take in everything they flushed
+        await asyncio.gather(*consumers)
+        for task in tasks:
+            task.cancel()
+        await api_runner.cleanup()
+        await self.database.close()
+        await self.rpc.close()
+
+
+def run_child(role, *args):
+    """Process entry point for one pool role"""
+    # Ctrl-C reaches the whole process group; only the supervisor acts on it
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    pool = role(*args)
+    if pool.config.get('use_uvloop', True) and uvloop is not None:
+        uvloop.install()
+    asyncio.run(pool.serve())
+
+
+class PoolSupervisor:
+    """Forks and babysits the fetcher, the accounting process and K workers"""
+
+    RESTART_DELAY = 1.0
+
+    def __init__(self, config_file: str, workers: int):
+        self.config_file = config_file
+        self.workers = workers
+        self.ctx = multiprocessing.get_context('fork')
+        self.stopping = False
+
+        # Fetcher -> every worker and accounting; every worker -> accounting
+        self.template_pipes = [self.ctx.Pipe(duplex=False) for _ in range(workers + 1)]
+        self.share_pipes = [self.ctx.Pipe(duplex=False) for _ in range(workers)]
+        self.processes: Dict[str, multiprocessing.Process] = {}
+
+    def spawn(self, name: str) -> multiprocessing.Process:
+        if name == 'fetcher':
+            args = (TemplateFetcher, self.config_file, [send for _, send in self.template_pipes])
+        elif name == 'accounting':
+            args = (AccountingPool, self.config_file, self.template_pipes[-1][0],
+                    [recv for recv, _ in self.share_pipes])
+        else:
+            worker_id = int(name.split('-')[1])
+            args = (StratumWorker, self.config_file, worker_id, self.workers,
+                    self.template_pipes[worker_id][0], self.share_pipes[worker_id][1])
+        process = self.ctx.Process(target=run_child, args=args, name=f"rsdt-{name}")
+        process.start()
+        self.processes[name] = process
+        logger.info(f"Started {name} (pid {process.pid})")
+        return process
+
+    def stop(self, signum=None, frame=None):
+        self.stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        self.spawn('accounting')
+        self.spawn('fetcher')
+        for worker_id in range(self.workers):
+            self.spawn(f"worker-{worker_id}")
+        logger.info(f"Supervisor running {self.workers} Stratum workers")
+
+        while not self.stopping:
+            sentinels = {p.sentinel: name for name, p in self.processes.items()}
+            for sentinel in multiprocessing.connection.wait(list(sentinels), timeout=1):
+                if self.stopping:
+                    break
+                name = sentinels[sentinel]
+                logger.error(f"{name} exited with code {self.processes[name].exitcode}, restarting")
+                time.sleep(self.RESTART_DELAY)
+                self.spawn(name)
+
+        self.shutdown()
+
+    def shutdown(self):
+        """Stop workers first, then the fetcher, then accounting once it has drained"""
+        logger.info("Supervisor shutting down")
+        order = ([name for name in self.processes if name.startswith('worker-')] +
+                 ['fetcher', 'accounting'])
+        for group in (order[:-2], order[-2:-1], order[-1:]):
+            for name in group:
+                self.processes[name].terminate()
+            for name in group:
+                self.processes[name].join(30)
+                if self.processes[name].is_alive():
+                    logger.warning(f"{name} did not stop, killing it")
+                    self.processes[name].kill()
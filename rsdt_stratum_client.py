@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+RSDT Stratum Client
+Asyncio client for the pool's Stratum protocol (newline-delimited JSON
+over TCP), shared by the Python miners
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import logging
+import random
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger('RSDT_Stratum')
+
+DEFAULT_PORT = 3333
+
+class StratumError(Exception):
+    """The pool answered a request with an error"""
+
+def parse_pool_url(url: str) -> Tuple[str, int]:
+    """Host and port of a stratum+tcp://host:port, http://host:port or host:port pool URL"""
+    if '://' not in url:
+        url = f"stratum+tcp://{url}"
+    parts = urlsplit(url)
+    return parts.hostname or '127.0.0.1', parts.port or DEFAULT_PORT
+
+def is_stratum_url(url: str) -> bool:
+    return url.startswith(('stratum+tcp://', 'tcp://'))
+
+class StratumClient:
+    """Persistent Stratum connection to one pool
+
+    ``run`` keeps one TCP connection open and logs in again after every
+    reconnect, backing off exponentially (with jitter, up to
+    ``max_backoff`` seconds) while the pool is unreachable. Requests are
+    written as soon as they are made and matched to replies by ``id``, so
+    any number of submits can be in flight on the connection. The job in
+    each login reply and every job the pool pushes go to ``on_job``.
+
+    Jobs belong to the connection they were issued on, so requests still
+    waiting when the connection drops fail with ConnectionError rather
+    than being resent on the next one.
+    """
+
+    def __init__(self, host: str, port: int, login: str, password: str = 'default',
+                 on_job: Optional[Callable[[Dict], None]] = None, min_backoff: float = 1.0,
+                 max_backoff: float = 60.0, request_timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.login = login
+        self.password = password
+        self.on_job = on_job
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.request_timeout = request_timeout
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.next_id = 1
+        self.job: Optional[Dict] = None
+        self.connected = asyncio.Event()
+        self.closing = False
+        self.task: Optional[asyncio.Task] = None
+        self.connects = 0
+        self.disconnects = 0
+        self.jobs_received = 0
+        self.submitted = 0
+        self.accepted = 0
+        self.rejects: Dict[str, int] = {}
+
+    async def run(self):
+        """Connect, log in and read until ``close``, reconnecting with backoff"""
+        self.task = asyncio.current_task()
+        backoff = self.min_backoff
+        while not self.closing:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as e:
+                logger.warning(f"Cannot connect to pool {self.host}:{self.port}: {e}")
+            else:
+                try:
+                    if await self._session(reader, writer):
+                        backoff = self.min_backoff
+                finally:
+                    self._disconnected(writer)
+            if self.closing:
+                break
+            delay = backoff * random.uniform(0.5, 1.0)
+            logger.info(f"Reconnecting to pool in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """Log in and read replies until the connection closes; False if login failed"""
+        self.writer = writer
+        read_task = asyncio.create_task(self._read_loop(reader))
+        try:
+            result = await self.request('login', {"login": self.login, "pass": self.password,
+                                                  "agent": "rsdt-python-miner/1.0"})
+        except (StratumError, ConnectionError, asyncio.TimeoutError) as e:
+            logger.warning(f"Pool login failed: {e}")
+            read_task.cancel()
+            return False
+        self.connects += 1
+        self.connected.set()
+        logger.info(f"Logged in to pool {self.host}:{self.port}")
+        if isinstance(result.get('job'), dict):
+            self._job(result['job'])
+        await read_task
+        return True
+
+    async def _read_loop(self, reader: asyncio.StreamReader):
+        while True:
+            try:
+                line = await reader.readline()
+            except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+                logger.warning(f"Pool connection error: {e}")
+                return
+            if not line:
+                return
+            try:
+                message = json.loads(line)
+            except ValueError:
+                logger.warning(f"Invalid JSON from pool: {line[:80]!r}")
+                continue
+            if message.get('method') == 'job':
+                self._job(message.get('params') or {})
+                continue
+
+            future = self.pending.pop(message.get('id'), None)
+            if future is None:
+                if message.get('error'):
+                    logger.warning(f"Pool error: {message['error']}")
+                continue
+            if future.done():
+                continue
+            if message.get('error'):
+                future.set_exception(StratumError(message['error']))
+            else:
+                future.set_result(message.get('result') or {})
+
+    def _job(self, job: Dict):
+        if 'job_id' not in job:
+            logger.warning(f"Pool sent no job: {job.get('error', job)}")
+            return
+        self.job = job
+        self.jobs_received += 1
+        if self.on_job:
+            self.on_job(job)
+
+    def _disconnected(self, writer: asyncio.StreamWriter):
+        if self.connected.is_set():
+            self.disconnects += 1
+        self.connected.clear()
+        self.writer = None
+        self.job = None
+        writer.close()
+        pending, self.pending = self.pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Pool connection lost"))
+
+    async def request(self, method: str, params: Dict) -> Dict:
+        """Send one request and wait for its reply's ``result``
+
+        Raises StratumError if the pool replies with an error and
+        ConnectionError if there is no connection or it drops first.
+        """
+        if self.writer is None or self.writer.is_closing():
+            raise ConnectionError("Not connected to pool")
+        request_id = self.next_id
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write((json.dumps({"id": request_id, "method": method, "params": params})
+                           + '\n').encode())
+        try:
+            await self.writer.drain()
+            return await asyncio.wait_for(future, self.request_timeout)
+        finally:
+            self.pending.pop(request_id, None)
+
+    async def submit(self, job_id: str, nonce: int) -> bool:
+        """Submit a share; True if the pool accepted it
+
+        Rejections are counted by reason in ``rejects``. Connection
+        errors and timeouts are counted too, then propagate, since the
+        share cannot be resent.
+        """
+        self.submitted += 1
+        try:
+            # The pool treats a falsy nonce as missing, so it goes as a string
+            result = await self.request('submit', {"login": self.login, "pass": self.password,
+                                                   "job_id": job_id, "nonce": str(nonce)})
+        except StratumError as e:
+            reason = str(e)
+        except (ConnectionError, asyncio.TimeoutError) as e:
+            self._reject(str(e) or type(e).__name__)
+            raise
+        else:
+            if result.get('status') == 'OK':
+                self.accepted += 1
+                return True
+            reason = result.get('status', 'ERROR')
+        self._reject(reason)
+        return False
+
+    def _reject(self, reason: str):
+        self.rejects[reason] = self.rejects.get(reason, 0) + 1
+
+    async def close(self):
+        """Stop reconnecting and drop the connection"""
+        self.closing = True
+        if self.writer is not None:
+            self.writer.close()
+        if self.task is not None and self.task is not asyncio.current_task():
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected.is_set(),
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "jobs_received": self.jobs_received,
+            "submitted": self.submitted,
+            "accepted": self.accepted,
+            "rejects": dict(self.rejects),
+            "in_flight": len(self.pending)
+        }
+
+class StratumClientThread:
+    """A StratumClient on its own event loop thread, for threaded miners
+
+    ``submit`` can be called from any thread and returns at once with a
+    concurrent.futures.Future, so hashing threads never wait on the
+    network. ``on_job`` runs on the client's thread.
+    """
+
+    def __init__(self, pool_url: str, login: str, password: str = 'default',
+                 on_job: Optional[Callable[[Dict], None]] = None, **options):
+        host, port = parse_pool_url(pool_url)
+        self.loop = asyncio.new_event_loop()
+        self.client = StratumClient(host, port, login, password, on_job=on_job, **options)
+        self.thread = threading.Thread(target=self._run, name='rsdt-stratum', daemon=True)
+        self.stopping = asyncio.Event()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._main())
+        finally:
+            self.loop.close()
+
+    async def _main(self):
+        task = asyncio.create_task(self.client.run())
+        await self.stopping.wait()
+        await self.client.close()
+        await asyncio.gather(task, return_exceptions=True)
+
+    def start(self):
+        self.thread.start()
+
+    def wait_connected(self, timeout: float) -> bool:
+        """Wait until the client is logged in; False after ``timeout`` seconds"""
+        waiter = asyncio.run_coroutine_threadsafe(self.client.connected.wait(), self.loop)
+        try:
+            waiter.result(timeout)
+            return True
+        except concurrent.futures.TimeoutError:
+            waiter.cancel()
+            return False
+
+    def submit(self, job_id: str, nonce: int) -> concurrent.futures.Future:
+        """Queue a share; the future resolves to whether the pool accepted it"""
+        return asyncio.run_coroutine_threadsafe(self.client.submit(job_id, nonce), self.loop)
+
+    def stop(self):
+        if self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.stopping.set)
+            self.thread.join(timeout=5)